@@ -0,0 +1,163 @@
+"""
+Per-user, per-day activity counts behind /activity/heatmap and the windowed
+/leaderboard, kept in the ActivityRollup table.
+
+Each (day, roll_number, user_name, action) row counts the AuditLog entries
+written that day and sums the XP they announce ("... (+50 XP)" on MOVE
+entries, which is also the only XP history older than the XP ledger). Users
+are told apart by roll number, since display names aren't unique; entries
+logged before the audit log recorded it have an empty roll_number. Rows are
+added to in the transaction that writes the log, so reading a range never
+touches the audit table:
+
+- ORM-added AuditLog objects are counted in the flush hooks below.
+- Core multi-row inserts into auditlog are counted from their parameters.
+- Anything else (deletes, restores) marks the rollup stale, and it is
+  rebuilt from the audit table before the transaction commits.
+
+The first start after deploying fills an empty rollup from the existing log.
+
+CLI:  python activity_rollup.py check | rebuild
+"""
+import re
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select
+
+from database import increment_statement
+from derived import DerivedTable
+from models import ActivityRollup, AuditLog
+
+XP_PATTERN = re.compile(r"\(\+(\d+) XP\)")
+REBUILD_BATCH = 10000  # audit rows fetched per round trip when rebuilding
+
+def _add(deltas: dict, row: dict, sign: int = 1):
+    timestamp = row.get("timestamp") or datetime.now()
+    match = XP_PATTERN.search(row.get("details") or "")
+    key = (timestamp.date(), row.get("roll_number") or "", row.get("user_name") or "Unknown", row.get("action") or "UNKNOWN")
+    delta = deltas.setdefault(key, [0, 0])
+    delta[0] += sign
+    delta[1] += sign * (int(match.group(1)) if match else 0)
+
+def mark_stale(session):
+    """This transaction changed the audit log in ways the rollup can't follow: rebuild before commit"""
+    rollup.mark_stale(session)
+
+def apply_deltas(connection, deltas: dict):
+    rows = [
+        {"day": day, "roll_number": roll_number, "user_name": user_name, "action": action, "count": count, "xp": xp}
+        for (day, roll_number, user_name, action), (count, xp) in deltas.items()
+        if count or xp
+    ]
+    if rows:
+        connection.execute(
+            increment_statement(connection.dialect.name, ActivityRollup.__table__, ["day", "roll_number", "user_name", "action"], ["count", "xp"]),
+            rows
+        )
+
+def compute(connection) -> dict:
+    """Fresh rollup from the audit table, streamed in batches"""
+    totals = {}
+    result = connection.execution_options(stream_results=True, yield_per=REBUILD_BATCH).execute(
+        select(AuditLog.timestamp, AuditLog.roll_number, AuditLog.user_name, AuditLog.action, AuditLog.details)
+    )
+    for row in result:
+        _add(totals, row._mapping)
+    return totals
+
+def stored(connection) -> dict:
+    return {
+        (r.day, r.roll_number, r.user_name, r.action): [r.count, r.xp]
+        for r in connection.execute(select(ActivityRollup.__table__)) if r.count or r.xp
+    }
+
+def ensure_filled(engine):
+    """Startup: fill the rollup from an existing audit log the first time"""
+    with engine.begin() as conn:
+        if conn.execute(select(ActivityRollup.id).limit(1)).first() is None and \
+                conn.execute(select(AuditLog.id).limit(1)).first() is not None:
+            print(f"📅 Activity rollup filled with {rebuild(conn)} rows from the audit log")
+
+def _window(days: int):
+    today = date.today()
+    return today - timedelta(days=days - 1), today
+
+def heatmap(connection, days: int, roll_number: str = None, user_name: str = None, action: str = None) -> dict:
+    """
+    Actions and XP per day for the last `days` days (today included), zeros
+    filled in. One user's cells are their roll number's, plus the older
+    entries logged without one under their `user_name`.
+    """
+    start, end = _window(days)
+    query = (
+        select(ActivityRollup.day, func.sum(ActivityRollup.count), func.sum(ActivityRollup.xp))
+        .where(ActivityRollup.day >= start)
+        .group_by(ActivityRollup.day)
+    )
+    if roll_number:
+        mine = ActivityRollup.roll_number == roll_number
+        if user_name:
+            mine = or_(mine, and_(ActivityRollup.roll_number == "", ActivityRollup.user_name == user_name))
+        query = query.where(mine)
+    if action:
+        query = query.where(ActivityRollup.action == action)
+    found = {day: (count, xp) for day, count, xp in connection.execute(query)}
+    cells = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        count, xp = found.get(day, (0, 0))
+        cells.append({"date": day.isoformat(), "count": count, "xp": xp})
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "days": cells,
+        "total": sum(c["count"] for c in cells),
+        "max": max((c["count"] for c in cells), default=0),
+    }
+
+def leaders(connection, days: int) -> list:
+    """[(roll_number, user_name, xp, actions)] over the last `days` days, best first ("" roll: older entries)"""
+    start, _ = _window(days)
+    xp, actions = func.sum(ActivityRollup.xp), func.sum(ActivityRollup.count)
+    return [
+        tuple(row) for row in connection.execute(
+            select(ActivityRollup.roll_number, ActivityRollup.user_name, xp, actions)
+            .where(ActivityRollup.day >= start)
+            .group_by(ActivityRollup.roll_number, ActivityRollup.user_name)
+            .order_by(xp.desc(), actions.desc(), ActivityRollup.user_name, ActivityRollup.roll_number)
+        )
+    ]
+
+# --- Session hooks ---
+
+def _entry(obj) -> dict:
+    return {"timestamp": obj.timestamp, "roll_number": obj.roll_number, "user_name": obj.user_name,
+            "action": obj.action, "details": obj.details}
+
+def collect(session, deltas):
+    for obj in session.new:
+        if isinstance(obj, AuditLog):
+            _add(deltas, _entry(obj))
+    for obj in session.deleted:
+        if isinstance(obj, AuditLog):
+            _add(deltas, _entry(obj), -1)
+
+def bulk_write(orm_execute_state, deltas) -> bool:
+    """Multi-row inserts are counted from their parameters; updates and deletes can't be"""
+    if not orm_execute_state.is_insert:
+        return False
+    rows = orm_execute_state.parameters
+    for row in rows if isinstance(rows, list) else [rows] if rows else []:
+        _add(deltas, row)
+    return True
+
+rollup = DerivedTable(
+    "activity", "activity rollup", ActivityRollup.__table__, [AuditLog.__tablename__],
+    ("day", "roll_number", "user_name", "action"), [0, 0],
+    compute=compute, stored=stored, apply=apply_deltas, collect=collect, bulk_write=bulk_write,
+)
+rebuild = rollup.rebuild
+check = rollup.check
+
+if __name__ == "__main__":
+    rollup.main("Check or rebuild the activity rollup behind /activity/heatmap")
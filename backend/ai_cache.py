@@ -0,0 +1,136 @@
+"""
+Content-addressed cache for Perplexity responses.
+
+Keys are a SHA-256 of (model, system prompt, prompt, temperature). Lookups hit
+an in-memory LRU first, then a small SQLite file that survives restarts and is
+shared by every worker process. Entries carry their own expiry so each call
+site can choose a TTL.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", "ai_cache.db")
+AI_CACHE_MEMORY_ENTRIES = int(os.getenv("AI_CACHE_MEMORY_ENTRIES", "512"))
+AI_CACHE_DISK_ENTRIES = int(os.getenv("AI_CACHE_DISK_ENTRIES", "20000"))
+
+def make_key(model: str, system_prompt: str, prompt: str, temperature: float) -> str:
+    raw = json.dumps([model, system_prompt, prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class AICache:
+    def __init__(self, path: Optional[str] = AI_CACHE_PATH, memory_entries: int = AI_CACHE_MEMORY_ENTRIES,
+                 disk_entries: int = AI_CACHE_DISK_ENTRIES):
+        self.memory = OrderedDict()  # key -> (expires_at, value), most recently used last
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0,
+                         "stores": 0, "evictions": 0, "expired": 0}
+        self.db = None
+        if path:
+            try:
+                self.db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self.db.execute(
+                    "CREATE TABLE IF NOT EXISTS ai_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+                )
+                self.db.execute("CREATE INDEX IF NOT EXISTS ix_ai_cache_expires_at ON ai_cache (expires_at)")
+                self.db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ AI disk cache disabled: {e}")
+                self.db = None
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        self.memory[key] = (expires_at, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry:
+                expires_at, value = entry
+                if expires_at > now:
+                    self.memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return value
+                del self.memory[key]
+                self.counters["expired"] += 1
+
+            if self.db is not None:
+                try:
+                    row = self.db.execute("SELECT value, expires_at FROM ai_cache WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row and row[1] > now:
+                    self._remember(key, row[1], row[0])
+                    self.counters["disk_hits"] += 1
+                    return row[0]
+                if row:
+                    self.counters["expired"] += 1
+
+            self.counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str, ttl: int):
+        now = time.time()
+        expires_at = now + ttl
+        with self.lock:
+            self._remember(key, expires_at, value)
+            self.counters["stores"] += 1
+            if self.db is None:
+                return
+            try:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO ai_cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now)
+                )
+                # Keep the file bounded: drop expired rows, then the oldest beyond the cap
+                if self.counters["stores"] % 100 == 0:
+                    self.db.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (now,))
+                    self.db.execute(
+                        "DELETE FROM ai_cache WHERE key IN ("
+                        "SELECT key FROM ai_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                        (self.disk_entries,)
+                    )
+                self.db.commit()
+            except sqlite3.Error as e:
+                print(f"AI cache write failed: {e}")
+
+    def note_bypass(self):
+        with self.lock:
+            self.counters["bypassed"] += 1
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM ai_cache")
+                self.db.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            disk_entries = None
+            if self.db is not None:
+                try:
+                    disk_entries = self.db.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                **self.counters,
+                "hit_rate": round((lookups - self.counters["misses"]) / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "disk_entries": disk_entries,
+            }
+
+cache = AICache()
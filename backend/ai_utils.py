@@ -1,20 +1,163 @@
 import os
+import re
+import json
+import time
+import random
+import asyncio
+import threading
 import requests
+import httpx
 from fastapi import HTTPException
+from typing import Optional
+from ai_cache import cache as ai_cache, make_key
 
-PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
+PERPLEXITY_API_URL = os.getenv("PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions")
 MODEL = "sonar"
+DEFAULT_SYSTEM_PROMPT = "You are a professional outreach assistant for TEDxXLRI."
+HUNT_SYSTEM_PROMPT = "You are a specialized lead generation agent. Your goal is to find valid email addresses for outreach. NO INTRO, NO OUTRO."
 
-def call_ai(prompt: str, system_prompt: str = "You are a professional outreach assistant for TEDxXLRI."):
+# Async client settings (bulk operations fan out through one pooled client)
+AI_TIMEOUT = 45
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "3"))
+
+# Client-side rate limiting, shared by every call in this process
+AI_REQUESTS_PER_MINUTE = float(os.getenv("AI_REQUESTS_PER_MINUTE", "50"))
+AI_BURST = int(os.getenv("AI_BURST", "5"))
+AI_RETRY_BASE_DELAY = 1.0
+AI_RETRY_MAX_DELAY = 30.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Priority lanes: interactive clicks jump ahead of bulk hunts/ingestion
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+
+# Batched hunts pack this many speakers into one prompt (1 = one call per speaker)
+HUNT_BATCH_SIZE = int(os.getenv("HUNT_BATCH_SIZE", "10"))
+HUNT_MAX_BATCH_SIZE = 25
+EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+'-]+@[A-Za-z0-9-]+(\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}$")
+
+# Response cache TTLs per call site (seconds); None disables caching
+HUNT_CACHE_TTL = 7 * 24 * 3600   # public emails rarely change
+DRAFT_CACHE_TTL = 24 * 3600      # re-clicking "Generate" the same day reuses the draft
+INGEST_CACHE_TTL = 3600          # re-submitting the same research dump
+
+_async_client = None
+_async_client_loop = None
+
+class TokenBucket:
+    """
+    Process-wide token bucket (thread and asyncio safe). Bulk callers only take a
+    token while no interactive caller is waiting, so interactive requests go first.
+    """
+
+    def __init__(self, requests_per_minute: float = AI_REQUESTS_PER_MINUTE, burst: int = AI_BURST):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.waiting = {PRIORITY_INTERACTIVE: 0, PRIORITY_BULK: 0}
+        self.counters = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0,
+                         "retries_429": 0, "retries_5xx": 0, "rate_limited": 0}
+
+    def _try_take(self, priority: str) -> float:
+        """Takes a token and returns 0, or returns how long to wait before trying again"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if priority == PRIORITY_BULK and self.waiting[PRIORITY_INTERACTIVE]:
+                return max(0.01, (1 - self.tokens) / self.rate)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def _enter(self, priority: str):
+        with self.lock:
+            self.waiting[priority] += 1
+
+    def _leave(self, priority: str, started: float, took: bool):
+        waited = time.monotonic() - started
+        with self.lock:
+            self.waiting[priority] -= 1
+            if not took:
+                return
+            self.counters["acquired"] += 1
+            if waited > 0.001:
+                self.counters["waited"] += 1
+                self.counters["wait_seconds"] += waited
+                self.counters["max_wait_seconds"] = max(self.counters["max_wait_seconds"], waited)
+
+    def acquire(self, priority: str = PRIORITY_INTERACTIVE):
+        started, took = time.monotonic(), False
+        self._enter(priority)
+        try:
+            while (wait := self._try_take(priority)) > 0:
+                time.sleep(wait)
+            took = True
+        finally:
+            self._leave(priority, started, took)
+
+    async def acquire_async(self, priority: str = PRIORITY_INTERACTIVE):
+        started, took = time.monotonic(), False
+        self._enter(priority)
+        try:
+            while (wait := self._try_take(priority)) > 0:
+                await asyncio.sleep(wait)
+            took = True
+        finally:
+            self._leave(priority, started, took)
+
+    def note(self, counter: str):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            tokens = min(self.capacity, self.tokens + (time.monotonic() - self.updated) * self.rate)
+            waited = self.counters["waited"]
+            return {
+                **self.counters,
+                "wait_seconds": round(self.counters["wait_seconds"], 3),
+                "max_wait_seconds": round(self.counters["max_wait_seconds"], 3),
+                "avg_wait_seconds": round(self.counters["wait_seconds"] / waited, 3) if waited else 0.0,
+                "queue_depth": dict(self.waiting),
+                "tokens_available": round(tokens, 2),
+                "requests_per_minute": self.rate * 60,
+                "burst": self.capacity,
+            }
+
+rate_limiter = TokenBucket()
+
+# Single-flight: identical prompts already in flight share one upstream call
+_flights = {}  # key -> _Flight (threads: sync call_ai from job workers)
+_async_flights = {}  # key -> _AsyncFlight (tasks on the API event loop)
+_flights_lock = threading.Lock()
+flight_counters = {"leaders": 0, "coalesced": 0}
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class _AsyncFlight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+def _build_request(prompt: str, system_prompt: str):
     api_key = os.getenv("PERPLEXITY_API_KEY")
     if not api_key:
         raise HTTPException(status_code=500, detail="Perplexity API key not configured")
-        
+
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
     }
-    
+
     payload = {
         "model": MODEL,
         "messages": [
@@ -23,41 +166,296 @@ def call_ai(prompt: str, system_prompt: str = "You are a professional outreach a
         ],
         "temperature": 0.2
     }
+    return headers, payload
+
+def _cache_key(payload: dict) -> str:
+    messages = payload["messages"]
+    return make_key(payload["model"], messages[0]["content"], messages[1]["content"], payload["temperature"])
+
+def _cached(payload: dict, cache_ttl: Optional[int], refresh: bool):
+    """Returns (key, cached_value); key is None when this call is not cacheable"""
+    if not cache_ttl:
+        return None, None
+    key = _cache_key(payload)
+    if refresh:
+        ai_cache.note_bypass()
+        return key, None
+    return key, ai_cache.get(key)
+
+def _single_flight(key: str, fn):
+    """Runs fn() once per key; threads asking for the same key meanwhile wait for that result"""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+            flight_counters["leaders"] += 1
+        else:
+            flight_counters["coalesced"] += 1
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
 
     try:
-        response = requests.post(PERPLEXITY_API_URL, headers=headers, json=payload, timeout=45)
-        if response.status_code == 429:
-            raise HTTPException(status_code=429, detail="AI Rate Limit exceeded. Please wait a moment.")
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
-    except requests.exceptions.Timeout:
-        raise HTTPException(status_code=504, detail="AI Service Timeout. The search took too long.")
-    except Exception as e:
-        detail = str(e)
-        if hasattr(e, 'response') and e.response is not None:
-            try:
-                error_json = e.response.json()
-                detail = error_json.get('error', {}).get('message', str(e))
-            except:
-                pass
+        flight.result = fn()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+async def _single_flight_async(key: str, fn):
+    """
+    Async single-flight: the first caller starts fn() as a task and later callers
+    await the same task. The upstream call is cancelled only once every waiter has gone.
+    """
+    loop = asyncio.get_running_loop()
+    flight = _async_flights.get(key)
+    if flight is None or flight.task.done() or flight.task.get_loop() is not loop:
+        flight = _AsyncFlight(asyncio.ensure_future(fn()))
+        _async_flights[key] = flight
+        flight_counters["leaders"] += 1
+
+        def forget(_task, flight=flight):
+            if _async_flights.get(key) is flight:
+                del _async_flights[key]
+        flight.task.add_done_callback(forget)
+    else:
+        flight_counters["coalesced"] += 1
+
+    flight.waiters += 1
+    try:
+        return await asyncio.shield(flight.task)
+    finally:
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done():
+            flight.task.cancel()
+
+def flight_stats() -> dict:
+    return {**flight_counters, "in_flight": len(_flights) + len(_async_flights)}
+
+def call_ai(prompt: str, system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+            cache_ttl: Optional[int] = None, refresh: bool = False,
+            priority: str = PRIORITY_INTERACTIVE):
+    """
+    Blocking Perplexity completion. With `cache_ttl` identical requests are served
+    from the response cache; `refresh=True` skips the lookup but stores the new answer.
+    Concurrent identical requests share a single upstream call.
+    """
+    headers, payload = _build_request(prompt, system_prompt)
+    key, cached = _cached(payload, cache_ttl, refresh)
+    if cached is not None:
+        return cached
+
+    def fetch():
+        content = _post_sync(headers, payload, priority)
+        if key:
+            ai_cache.set(key, content, cache_ttl)
+        return content
+
+    return _single_flight(key or _cache_key(payload), fetch)
+
+def _read_completion(response):
+    """Turns a Perplexity response (requests or httpx) into content or an HTTPException"""
+    if response.status_code == 429:
+        rate_limiter.note("rate_limited")
+        raise HTTPException(status_code=429, detail="AI Rate Limit exceeded. Please wait a moment.")
+    if response.status_code >= 400:
+        detail = response.text
+        try:
+            detail = response.json().get('error', {}).get('message', detail)
+        except Exception:
+            pass
         print(f"AI Error: {detail}")
         raise HTTPException(status_code=502, detail=f"AI Service Error: {detail}")
+    return response.json()["choices"][0]["message"]["content"]
+
+def _should_retry(response, attempt: int) -> bool:
+    if response.status_code not in RETRYABLE_STATUS or attempt >= AI_MAX_RETRIES:
+        return False
+    rate_limiter.note("retries_429" if response.status_code == 429 else "retries_5xx")
+    return True
+
+def _post_sync(headers: dict, payload: dict, priority: str = PRIORITY_INTERACTIVE):
+    for attempt in range(AI_MAX_RETRIES + 1):
+        rate_limiter.acquire(priority)
+        try:
+            response = requests.post(PERPLEXITY_API_URL, headers=headers, json=payload, timeout=AI_TIMEOUT)
+        except requests.exceptions.Timeout:
+            raise HTTPException(status_code=504, detail="AI Service Timeout. The search took too long.")
+        except requests.exceptions.RequestException as e:
+            print(f"AI Error: {e}")
+            raise HTTPException(status_code=502, detail=f"AI Service Error: {e}")
+
+        if _should_retry(response, attempt):
+            time.sleep(_retry_delay(response, attempt))
+            continue
+        return _read_completion(response)
+
+def get_async_client() -> httpx.AsyncClient:
+    """Returns the shared pooled client, recreating it if the event loop changed"""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(AI_TIMEOUT, connect=10.0),
+            limits=httpx.Limits(max_connections=AI_MAX_CONCURRENCY * 2, max_keepalive_connections=AI_MAX_CONCURRENCY)
+        )
+        _async_client_loop = loop
+    return _async_client
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
 
-def hunt_email(name: str, domain: str = "", location: str = ""):
+def _retry_delay(response, attempt: int) -> float:
     """
-    Uses AI with search to find a public email address.
+    Honours Retry-After when Perplexity sends it, otherwise exponential backoff with
+    full jitter so concurrent workers don't retry in lockstep.
     """
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(AI_RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return random.uniform(0, min(AI_RETRY_MAX_DELAY, AI_RETRY_BASE_DELAY * 2 ** attempt))
+
+async def call_ai_async(prompt: str, system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                        cache_ttl: Optional[int] = None, refresh: bool = False,
+                        priority: str = PRIORITY_INTERACTIVE):
+    """Non-blocking variant of call_ai; retries 429/5xx responses before giving up"""
+    headers, payload = _build_request(prompt, system_prompt)
+    key, cached = _cached(payload, cache_ttl, refresh)
+    if cached is not None:
+        return cached
+
+    async def fetch():
+        content = await _post_async(headers, payload, priority)
+        if key:
+            ai_cache.set(key, content, cache_ttl)
+        return content
+
+    return await _single_flight_async(key or _cache_key(payload), fetch)
+
+async def _post_async(headers: dict, payload: dict, priority: str = PRIORITY_INTERACTIVE):
+    client = get_async_client()
+
+    for attempt in range(AI_MAX_RETRIES + 1):
+        await rate_limiter.acquire_async(priority)
+        try:
+            response = await client.post(PERPLEXITY_API_URL, headers=headers, json=payload)
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="AI Service Timeout. The search took too long.")
+        except httpx.HTTPError as e:
+            print(f"AI Error: {e}")
+            raise HTTPException(status_code=502, detail=f"AI Service Error: {e}")
+
+        if _should_retry(response, attempt):
+            await asyncio.sleep(_retry_delay(response, attempt))
+            continue
+        return _read_completion(response)
+
+def _hunt_prompt(name: str, domain: str = "", location: str = ""):
     prompt = f"Find the public professional email address for {name}"
     if domain: prompt += f", who works in {domain}"
     if location: prompt += f" based in {location}"
-    
+
     prompt += """
-    . Search LinkedIn, personal websites, company directories, and press releases. 
-    Return ONLY the email address. 
-    If you find multiple, return the most official looking one. 
+    . Search LinkedIn, personal websites, company directories, and press releases.
+    Return ONLY the email address.
+    If you find multiple, return the most official looking one.
     If absolutely no email is found, return 'NOT_FOUND'.
     Do not include any conversational filler.
     """
-    
-    return call_ai(prompt, system_prompt="You are a specialized lead generation agent. Your goal is to find valid email addresses for outreach. NO INTRO, NO OUTRO.")
+    return prompt
 
+def hunt_email(name: str, domain: str = "", location: str = "", refresh: bool = False):
+    """
+    Uses AI with search to find a public email address.
+    """
+    return call_ai(_hunt_prompt(name, domain, location), system_prompt=HUNT_SYSTEM_PROMPT,
+                   cache_ttl=HUNT_CACHE_TTL, refresh=refresh)
+
+async def hunt_email_async(name: str, domain: str = "", location: str = "", refresh: bool = False,
+                           priority: str = PRIORITY_BULK):
+    """Async hunt_email for concurrent bulk runs (bulk lane by default)"""
+    return await call_ai_async(_hunt_prompt(name, domain, location), system_prompt=HUNT_SYSTEM_PROMPT,
+                               cache_ttl=HUNT_CACHE_TTL, refresh=refresh, priority=priority)
+
+def is_valid_email(value) -> bool:
+    return isinstance(value, str) and bool(EMAIL_RE.match(value.strip()))
+
+def _batch_hunt_prompt(rows):
+    lines = "\n".join(
+        f"{sid} | {name} | {domain or '-'} | {location or '-'}" for sid, name, domain, location in rows
+    )
+    return f"""
+    Find the public professional email address of each speaker listed below.
+    Search LinkedIn, personal websites, company directories, and press releases.
+
+    Speakers (id | name | domain | location):
+{lines}
+
+    Return ONLY a JSON array with exactly one object per id, in the form
+    [{{"id": <id>, "email": "<address>"}}]. Use null for email when no address is found.
+    If you find multiple, use the most official looking one.
+    Do not include any conversational filler.
+    """
+
+def parse_batch_hunt(raw: str, ids) -> dict:
+    """
+    Maps speaker id -> email from a batched hunt reply; None means searched but not found.
+    Ids that are missing, duplicated or hold an invalid address are left out so the
+    caller can hunt them individually.
+    """
+    text = (raw or "").strip()
+    if "```" in text:
+        text = text.split("```json")[-1] if "```json" in text else text.split("```")[1]
+        text = text.split("```")[0]
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        items = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+
+    wanted = set(ids)
+    found, seen = {}, set()
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            sid = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if sid not in wanted:
+            continue
+        if sid in seen:
+            found.pop(sid, None)  # conflicting answers: hunt it on its own
+            continue
+        seen.add(sid)
+        email = item.get("email")
+        if email in (None, "", "NOT_FOUND"):
+            found[sid] = None
+        elif is_valid_email(email):
+            found[sid] = email.strip()
+    return found
+
+async def hunt_emails_batch_async(rows, refresh: bool = False, priority: str = PRIORITY_BULK) -> dict:
+    """
+    Hunts several (id, name, domain, location) rows with one search completion.
+    Returns parse_batch_hunt's id -> email map.
+    """
+    raw = await call_ai_async(_batch_hunt_prompt(rows), system_prompt=HUNT_SYSTEM_PROMPT,
+                              cache_ttl=HUNT_CACHE_TTL, refresh=refresh, priority=priority)
+    return parse_batch_hunt(raw, [row[0] for row in rows])
@@ -0,0 +1,154 @@
+"""
+Audit log writes.
+
+Routes call `record` (one entry) or `record_many` (Core multi-row insert)
+before their single commit. What happens next depends on AUDIT_DURABILITY:
+
+- "transaction" (default): the entries are written in the caller's
+  transaction, so the log is exactly as durable as the change it describes.
+- "buffered": the entries are handed to `writer` when the caller commits
+  (and dropped if it rolls back). A background task flushes them every
+  AUDIT_FLUSH_SECONDS in multi-row inserts, taking audit writes off the
+  request path. A crash can lose up to one flush interval of log entries,
+  never the changes themselves. The buffer is bounded: a request that finds
+  it full flushes it inline. The lifespan hook flushes what is left on
+  shutdown.
+
+  Buffering needs the flusher task, which the API lifespan hook and the
+  standalone job worker (`python jobs.py`) start. Anywhere it isn't running
+  (scripts, tests) entries are written in the caller's transaction, as in
+  "transaction" mode, rather than in a second commit of their own.
+
+Flushes go through a Session, so the change feed, table versions and the
+activity rollup see buffered entries like any other audit insert.
+"""
+import asyncio
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from derived import TransactionState
+from models import AuditLog
+
+AUDIT_DURABILITY = os.getenv("AUDIT_DURABILITY", "transaction")  # transaction | buffered
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "1.0"))
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "1000"))
+
+if AUDIT_DURABILITY not in ("transaction", "buffered"):
+    raise ValueError(f"AUDIT_DURABILITY must be 'transaction' or 'buffered', not {AUDIT_DURABILITY!r}")
+
+def record(session: Session, user_name: str, action: str, details: str, speaker_id: Optional[int] = None,
+           roll_number: Optional[str] = None):
+    """Logs one action as part of the session's transaction; commit as usual"""
+    entry = {"user_name": user_name, "roll_number": roll_number, "action": action, "details": details, "speaker_id": speaker_id}
+    if not writer.buffering:
+        session.add(AuditLog(**entry))
+    else:
+        record_many(session, [entry])
+
+def record_many(session: Session, entries: list):
+    """Logs several actions (dicts of AuditLog fields) in one multi-row insert"""
+    if not entries:
+        return
+    now = datetime.now()
+    entries = [{"speaker_id": None, "roll_number": None, "timestamp": now, **entry} for entry in entries]
+    if not writer.buffering:
+        session.exec(insert(AuditLog), params=entries)
+    else:
+        pending_entries.get(session).extend(entries)
+
+class AuditWriter:
+    def __init__(self, durability: str = AUDIT_DURABILITY, interval: float = AUDIT_FLUSH_SECONDS,
+                 buffer_size: int = AUDIT_BUFFER_SIZE):
+        self.durability = durability
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.buffer = []  # (engine, entry)
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # one flush at a time keeps entries in order
+        self.stop_event = None
+        self.task = None
+        self.stats = {"buffered": 0, "flushed": 0, "flushes": 0, "inline_flushes": 0, "errors": 0, "dropped": 0}
+
+    @property
+    def buffering(self) -> bool:
+        """Whether `record` hands entries to this writer: buffered mode with the flusher running"""
+        return self.durability == "buffered" and self.task is not None
+
+    def submit(self, engine, entries: list):
+        with self.lock:
+            self.buffer.extend((engine, entry) for entry in entries)
+            self.stats["buffered"] += len(entries)
+            full = len(self.buffer) >= self.buffer_size
+        if full or self.task is None:
+            # The buffer is full, or the flusher stopped after these were recorded: write now
+            self.stats["inline_flushes"] += 1
+            self.flush()
+
+    def flush(self) -> int:
+        """Writes everything buffered, one multi-row insert per database"""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.buffer = self.buffer, []
+            by_engine = {}
+            for engine, entry in batch:
+                by_engine.setdefault(engine, []).append(entry)
+            for engine, entries in by_engine.items():
+                try:
+                    with Session(engine) as session:
+                        session.exec(insert(AuditLog), params=entries)
+                        session.commit()
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"⚠️ Audit flush failed, {len(entries)} entries requeued: {e}")
+                    with self.lock:
+                        self.buffer[:0] = [(engine, entry) for entry in entries]
+                        # Still bounded while the database is unreachable: shed the newest
+                        dropped = len(self.buffer) - self.buffer_size
+                        if dropped > 0:
+                            del self.buffer[self.buffer_size:]
+                            self.stats["dropped"] += dropped
+                            print(f"⚠️ Audit buffer full, {dropped} entries dropped")
+                    continue
+                self.stats["flushed"] += len(entries)
+            if batch:
+                self.stats["flushes"] += 1
+            return len(batch)
+
+    async def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            if self.buffer:
+                await asyncio.to_thread(self.flush)
+
+    def start(self):
+        if self.durability != "buffered":
+            return
+        self.stop_event = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+        print(f"📝 Buffered audit writer started (every {self.interval}s)")
+
+    async def stop(self):
+        """Stops the background task and writes what is still buffered"""
+        if self.task:
+            self.stop_event.set()
+            await self.task
+            self.task = None
+        await asyncio.to_thread(self.flush)
+
+    def metrics(self) -> dict:
+        return {**self.stats, "durability": self.durability, "buffering": self.buffering, "pending": len(self.buffer)}
+
+writer = AuditWriter()
+
+def submit_entries(session, entries):
+    writer.submit(session.get_bind(), entries)
+
+pending_entries = TransactionState("audit_entries", list, on_commit=submit_entries)
@@ -4,6 +4,11 @@ from typing import Optional
 from jose import JWTError, jwt
 from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import bindparam, select, update
+from sqlmodel import Session
+from database import get_session
+from models import AuthorizedUser, first_name_key
+from user_cache import user_cache, CachedUser
 
 # Admin roll number (hardcoded for bootstrap)
 ADMIN_ROLL = "b25349"
@@ -22,21 +27,47 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
+def backfill_first_name_keys(connection) -> int:
+    """Fills first_name_key for rows written without the ORM hook (migrations, restores of old backups)"""
+    table = AuthorizedUser.__table__
+    rows = [
+        {"_id": row.id, "key": first_name_key(row.name)}
+        for row in connection.execute(select(table.c.id, table.c.name).where(table.c.first_name_key.is_(None)))
+    ]
+    rows = [row for row in rows if row["key"]]
+    if rows:
+        connection.execute(update(table).where(table.c.id == bindparam("_id")).values(first_name_key=bindparam("key")), rows)
+    return len(rows)
+
+def verify_token(
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    session: Session = Depends(get_session)
+):
     token = credentials.credentials
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         roll_number: str = payload.get("sub")
-        name: str = payload.get("name")
-        is_admin: bool = payload.get("is_admin", False)
         if roll_number is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-        # Ensure username is never null for AuditLog requirements
-        display_name = name if name else roll_number
-        return {"roll_number": roll_number, "username": display_name, "is_admin": is_admin}
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+    # Tokens live 30 days: check the user is still authorized (cached, see user_cache.py)
+    user = user_cache.get(session, roll_number)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Access revoked")
+    return {"roll_number": user.roll_number, "username": user.display_name, "is_admin": user.is_admin}
+
+def get_current_user(
+    token_data: dict = Depends(verify_token),
+    session: Session = Depends(get_session)
+) -> CachedUser:
+    """The authenticated AuthorizedUser (identity fields), resolved from the user cache"""
+    user = user_cache.get(session, token_data["roll_number"])
+    if user is None:
+        raise HTTPException(status_code=401, detail="Access revoked")
+    return user
+
 def get_current_user_name(token_data: dict = Security(verify_token)):
     return token_data["username"]
 
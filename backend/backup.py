@@ -0,0 +1,481 @@
+"""
+Streaming database backups.
+
+A backup is gzip-compressed NDJSON, one JSON object per line:
+
+    {"type": "header", "format": "tedx-backup", "version": 1, "created_at": ..., "tables": [...]}
+    {"row": {...}, "table": "speaker"}
+    ...
+    {"type": "manifest", "tables": {"speaker": {"rows": 273, "sha256": "..."}, ...}, "finished_at": ...}
+
+Tables are read in primary-key order through server-side cursors, a batch at
+a time, so memory stays flat however long the audit log gets. Row lines are
+written canonically (sorted keys, no spaces) and each table's sha256 is taken
+over its row lines, so a reader can verify a file without re-serialising it.
+Jobs are left out: they are transient queue state.
+
+Restores read the file line by line and bulk-insert each table in batches.
+By default the whole restore is one transaction (existing rows are deleted
+first, and any error or checksum mismatch rolls everything back). With
+`resume`, every batch commits together with a RestoreProgress marker, so an
+interrupted restore can simply be run again: it continues each table after
+its highest id. A resumable restore only starts on an empty database, and
+only continues where the marker shows an unfinished restore of the same
+file; otherwise it is refused rather than mixing old and restored rows.
+Either way tombstones are cleared, since they describe deletes from the data
+being replaced; the RESTORE_BACKUP audit entry (written with the restore when
+`user_name` is given) tells /sync clients to refetch instead.
+
+Delta backups (`since`) hold only rows changed since a watermark, using each
+table's timestamp column (DELTA_COLUMNS); the small tables without one are
+included in full. Deletes are carried as Tombstone rows, written first.
+Every header records a `watermark` to pass as the next delta's `since`; it
+is taken a few minutes before the export started, so rows committed while
+it ran are picked up again next time (replaying them is harmless). A delta
+is replayed onto the restored base with upserts, in one transaction.
+
+CLI:  python backup.py dump backup.ndjson.gz [--since ISO | --after previous.ndjson.gz]
+      python backup.py restore backup.ndjson.gz [--resume] [--verify-only]
+      python backup.py replay base.ndjson.gz delta1.ndjson.gz delta2.ndjson.gz ...
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, delete, func, insert, select, text, update
+
+from models import (
+    AuthorizedUser, Speaker, Sponsor, CreativeAsset, CreativeRequest, SprintDeadline, AuditLog, Tombstone, RestoreProgress
+)
+from database import upsert_statement
+from changes import bump_versions
+
+BACKUP_FORMAT = "tedx-backup"
+BACKUP_VERSION = 1
+BACKUP_BATCH_SIZE = int(os.getenv("BACKUP_BATCH_SIZE", "2000"))
+RESTORE_BATCH_SIZE = int(os.getenv("RESTORE_BATCH_SIZE", "5000"))
+RESTORE_MAX_BYTES = 500 * 1024 * 1024  # request body limit for the restore upload
+CHUNK_BYTES = 64 * 1024  # uncompressed bytes buffered before each gzip flush
+
+# Restore order; the audit log is by far the largest, so it goes last
+BACKUP_MODELS = [AuthorizedUser, Speaker, Sponsor, CreativeAsset, CreativeRequest, SprintDeadline, AuditLog]
+BACKUP_TABLES = {model.__tablename__: model for model in BACKUP_MODELS}
+# Change timestamps for delta backups; other tables are small and go in full
+DELTA_COLUMNS = {"speaker": "last_updated", "sponsor": "last_updated", "creativeasset": "last_updated", "auditlog": "timestamp"}
+DELTA_OVERLAP = timedelta(minutes=5)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Can't serialise {type(value).__name__}")
+
+def dumps(obj) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=_json_default)
+
+def _snapshot_connection(engine):
+    conn = engine.connect()
+    if engine.dialect.name == "postgresql":
+        # One consistent snapshot across every table
+        conn = conn.execution_options(isolation_level="REPEATABLE READ", postgresql_readonly=True)
+    return conn
+
+def _sections(since: Optional[datetime]):
+    """(table name, SELECT) pairs in file order"""
+    if since:
+        yield "tombstone", select(Tombstone.__table__).where(Tombstone.deleted_at >= since).order_by(Tombstone.id)
+    for name, model in BACKUP_TABLES.items():
+        table = model.__table__
+        stmt = select(table).order_by(*table.primary_key.columns)
+        if since and name in DELTA_COLUMNS:
+            stmt = stmt.where(table.c[DELTA_COLUMNS[name]] >= since)
+        yield name, stmt
+
+def backup_lines(engine, batch_size: int = BACKUP_BATCH_SIZE, since: Optional[datetime] = None):
+    """Yields the backup (a delta when `since` is given) as text lines, each ending in a newline"""
+    manifest = {}
+    started = datetime.now()
+    header = {
+        "type": "header",
+        "format": BACKUP_FORMAT,
+        "version": BACKUP_VERSION,
+        "kind": "delta" if since else "full",
+        "created_at": started,
+        "watermark": started - DELTA_OVERLAP,
+        "tables": list(BACKUP_TABLES),
+    }
+    if since:
+        header["since"] = since
+        header["full_tables"] = [name for name in BACKUP_TABLES if name not in DELTA_COLUMNS]
+    yield dumps(header) + "\n"
+
+    with _snapshot_connection(engine) as conn:
+        for name, stmt in _sections(since):
+            digest, count = hashlib.sha256(), 0
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+            for partition in result.mappings().partitions():
+                for row in partition:
+                    line = dumps({"table": name, "row": dict(row)}) + "\n"
+                    digest.update(line.encode())
+                    count += 1
+                    yield line
+            manifest[name] = {"rows": count, "sha256": digest.hexdigest()}
+
+    yield dumps({"type": "manifest", "tables": manifest, "finished_at": datetime.now()}) + "\n"
+
+def gzip_stream(lines):
+    """gzip-compresses an iterable of text lines into ~64KB byte chunks"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line.encode())
+        size += len(buffer[-1])
+        if size >= CHUNK_BYTES:
+            chunk = compressor.compress(b"".join(buffer))
+            buffer, size = [], 0
+            if chunk:
+                yield chunk
+    yield compressor.compress(b"".join(buffer)) + compressor.flush()
+
+def stream_backup(engine, batch_size: int = BACKUP_BATCH_SIZE, since: Optional[datetime] = None):
+    return gzip_stream(backup_lines(engine, batch_size, since))
+
+def write_backup(engine, path: str, since: Optional[datetime] = None) -> dict:
+    """Writes a backup file; returns its manifest"""
+    last = []
+
+    def tap(lines):
+        for line in lines:
+            last[:] = [line]
+            yield line
+
+    with open(path, "wb") as f:
+        for chunk in gzip_stream(tap(backup_lines(engine, since=since))):
+            f.write(chunk)
+    return json.loads(last[0])
+
+def backup_filename(now: Optional[datetime] = None, delta: bool = False) -> str:
+    kind = "delta" if delta else "backup"
+    return f"tedx_{kind}_{(now or datetime.now()).strftime('%Y-%m-%d_%H%M')}.ndjson.gz"
+
+class BackupReader:
+    """
+    Iterates (table, row) pairs of a backup file (gzip or plain NDJSON),
+    recomputing the per-table checksums as it goes; `problems()` compares
+    them with the manifest once the file has been read.
+    """
+    def __init__(self, fileobj):
+        magic = fileobj.read(2)
+        fileobj.seek(0)
+        self.file = gzip.GzipFile(fileobj=fileobj, mode="rb") if magic == b"\x1f\x8b" else fileobj
+        self.manifest = None
+        self.counts, self.digests = {}, {}
+        try:
+            self.header = json.loads(self.file.readline() or b"{}")
+        except (ValueError, OSError, EOFError) as e:
+            raise HTTPException(status_code=400, detail=f"Could not read backup: {e}")
+        if not isinstance(self.header, dict) or self.header.get("format") != BACKUP_FORMAT:
+            raise HTTPException(status_code=400, detail="Not a backup file (missing header line)")
+        if self.header.get("version", 0) > BACKUP_VERSION:
+            raise HTTPException(status_code=400, detail=f"Backup version {self.header['version']} is newer than this server")
+
+    @property
+    def kind(self) -> str:
+        return self.header.get("kind", "full")
+
+    def __iter__(self):
+        try:
+            for number, line in enumerate(self.file, start=2):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if self.manifest is not None:
+                    raise HTTPException(status_code=400, detail=f"Line {number}: data after the manifest")
+                elif entry.get("type") == "manifest":
+                    self.manifest = entry
+                else:
+                    table = entry["table"]
+                    self.counts[table] = self.counts.get(table, 0) + 1
+                    self.digests.setdefault(table, hashlib.sha256()).update(line.rstrip(b"\r\n") + b"\n")
+                    yield table, entry["row"]
+        except (ValueError, KeyError, OSError, EOFError) as e:
+            raise HTTPException(status_code=400, detail=f"Could not read backup: {e}")
+
+    def problems(self) -> list:
+        if self.manifest is None:
+            return ["Manifest missing (file is truncated?)"]
+        problems = []
+        for table in sorted(set(self.manifest["tables"]) | set(self.counts)):
+            expected = self.manifest["tables"].get(table, {"rows": 0, "sha256": hashlib.sha256().hexdigest()})
+            count = self.counts.get(table, 0)
+            digest = self.digests.get(table, hashlib.sha256()).hexdigest()
+            if count != expected["rows"]:
+                problems.append(f"{table}: {count} rows, manifest says {expected['rows']}")
+            elif digest != expected["sha256"]:
+                problems.append(f"{table}: checksum mismatch")
+        return problems
+
+def _converter(table):
+    """Turns a JSON row back into insert parameters (ISO strings -> datetimes)"""
+    dates = {c.name for c in table.columns if isinstance(c.type, DateTime)}
+    known = set(table.columns.keys())
+
+    def convert(row: dict) -> dict:
+        out = {k: v for k, v in row.items() if k in known}
+        for name in dates & out.keys():
+            if out[name]:
+                out[name] = datetime.fromisoformat(out[name])
+        return out
+    return convert
+
+def reset_sequences(conn):
+    """Points Postgres id sequences past the restored rows (explicit ids don't advance them)"""
+    if conn.dialect.name != "postgresql":
+        return
+    for name in BACKUP_TABLES:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE((SELECT MAX(id) FROM {name}), 0) + 1, false)"
+        ))
+
+def verify_backup(fileobj) -> dict:
+    """Reads a backup without touching the database and checks it against its manifest"""
+    reader = BackupReader(fileobj)
+    for _ in reader:
+        pass
+    problems = reader.problems()
+    return {"ok": not problems, "problems": problems, "tables": reader.counts, "created_at": reader.header["created_at"]}
+
+def _start_resumable(conn, created_at: str):
+    """Checks a resume is safe and records the marker; returns the row counts to skip past"""
+    marker = conn.execute(select(RestoreProgress.__table__)).first()
+    if marker is None:
+        if any(conn.execute(select(model.__table__.c.id).limit(1)).first() for model in BACKUP_MODELS):
+            raise HTTPException(status_code=409, detail="The database already has data and no interrupted restore to "
+                                                        "resume; restore without resume to replace it")
+        conn.execute(delete(Tombstone.__table__))
+        conn.execute(insert(RestoreProgress.__table__).values(backup_created_at=created_at, rows_restored=0))
+        conn.commit()
+    elif marker.backup_created_at != created_at:
+        raise HTTPException(status_code=409, detail=f"The interrupted restore was of the backup created at "
+                                                    f"{marker.backup_created_at}; resume it with that file")
+    return {name: conn.execute(select(func.max(model.__table__.c.id))).scalar() or 0
+            for name, model in BACKUP_TABLES.items()}
+
+def restore_backup(engine, fileobj, batch_size: int = RESTORE_BATCH_SIZE, resume: bool = False,
+                   user_name: Optional[str] = None, source: str = "", roll_number: Optional[str] = None) -> dict:
+    started = time.perf_counter()
+    reader = BackupReader(fileobj)
+    if reader.kind != "full":
+        raise HTTPException(status_code=400, detail="This is a delta backup; replay it onto its base backup")
+    tables = {name: {"restored": 0, "skipped": 0} for name in BACKUP_TABLES}
+    ignored = set()
+
+    with engine.connect() as conn:
+        try:
+            if resume:
+                after = _start_resumable(conn, reader.header["created_at"])
+            else:
+                for model in reversed(BACKUP_MODELS):
+                    conn.execute(delete(model.__table__))
+                conn.execute(delete(Tombstone.__table__))
+                conn.execute(delete(RestoreProgress.__table__))
+
+            batch, current, convert = [], None, None
+
+            def flush():
+                if batch:
+                    conn.execute(insert(BACKUP_TABLES[current].__table__), batch)
+                    tables[current]["restored"] += len(batch)
+                    if resume:
+                        conn.execute(update(RestoreProgress.__table__).values(
+                            rows_restored=RestoreProgress.rows_restored + len(batch), updated_at=datetime.now()
+                        ))
+                        bump_versions(conn, [current])
+                    batch.clear()
+                if resume:
+                    conn.commit()
+
+            for name, row in reader:
+                if name not in BACKUP_TABLES:
+                    ignored.add(name)
+                    continue
+                if name != current or len(batch) >= batch_size:
+                    flush()
+                    current, convert = name, _converter(BACKUP_TABLES[name].__table__)
+                if resume and row["id"] <= after[name]:
+                    tables[name]["skipped"] += 1
+                    continue
+                batch.append(convert(row))
+            flush()
+
+            problems = reader.problems()
+            if problems:
+                raise HTTPException(status_code=400, detail="Backup failed verification: " + "; ".join(problems))
+            reset_sequences(conn)
+            bump_versions(conn, BACKUP_TABLES)
+            if resume:
+                conn.execute(delete(RestoreProgress.__table__))
+            if user_name:
+                restored = sum(t["restored"] for t in tables.values())
+                conn.execute(insert(AuditLog.__table__).values(
+                    user_name=user_name, roll_number=roll_number, action="RESTORE_BACKUP", timestamp=datetime.now(),
+                    details=f"Restored {restored} rows from {source or 'a backup'}" + (" (resumed)" if resume else "")
+                ))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return {
+        "tables": tables,
+        "ignored_tables": sorted(ignored),
+        "resume": resume,
+        "backup_created_at": reader.header["created_at"],
+        "watermark": reader.header.get("watermark"),
+        "duration_ms": round((time.perf_counter() - started) * 1000),
+    }
+
+def apply_delta(engine, fileobj, batch_size: int = RESTORE_BATCH_SIZE) -> dict:
+    """
+    Replays a delta backup in one transaction: tombstoned rows are deleted,
+    tables listed in full are replaced, changed rows are upserted by id.
+    """
+    started = time.perf_counter()
+    reader = BackupReader(fileobj)
+    if reader.kind != "delta":
+        raise HTTPException(status_code=400, detail="Not a delta backup")
+    dialect = engine.dialect.name
+    tables = {name: {"upserted": 0, "deleted": 0} for name in BACKUP_TABLES}
+
+    with engine.connect() as conn:
+        try:
+            for name in reader.header["full_tables"]:
+                conn.execute(delete(BACKUP_TABLES[name].__table__))
+
+            batch, current = [], None
+
+            def flush():
+                if not batch:
+                    return
+                if current == "tombstone":
+                    by_table = {}
+                    for row in batch:
+                        by_table.setdefault(row["table_name"], []).append(row["row_id"])
+                    for name, ids in by_table.items():
+                        if name in BACKUP_TABLES:
+                            table = BACKUP_TABLES[name].__table__
+                            tables[name]["deleted"] += conn.execute(delete(table).where(table.c.id.in_(ids))).rowcount
+                else:
+                    table = BACKUP_TABLES[current].__table__
+                    conn.execute(upsert_statement(dialect, table, list(batch[0])), batch)
+                    tables[current]["upserted"] += len(batch)
+                batch.clear()
+
+            convert = None
+            for name, row in reader:
+                if name != "tombstone" and name not in BACKUP_TABLES:
+                    continue
+                if name != current or len(batch) >= batch_size:
+                    flush()
+                    current = name
+                    convert = (lambda r: r) if name == "tombstone" else _converter(BACKUP_TABLES[name].__table__)
+                batch.append(convert(row))
+            flush()
+
+            problems = reader.problems()
+            if problems:
+                raise HTTPException(status_code=400, detail="Delta failed verification: " + "; ".join(problems))
+            reset_sequences(conn)
+            bump_versions(conn, BACKUP_TABLES)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return {
+        "tables": tables,
+        "since": reader.header["since"],
+        "watermark": reader.header["watermark"],
+        "duration_ms": round((time.perf_counter() - started) * 1000),
+    }
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        return BackupReader(f).header
+
+def replay(engine, base_path: str, delta_paths: list, batch_size: int = RESTORE_BATCH_SIZE) -> list:
+    """Restores a full backup, then applies deltas in order, checking each continues the chain"""
+    reports = []
+    with open(base_path, "rb") as f:
+        reports.append(restore_backup(engine, f, batch_size))
+    watermark = reports[-1]["watermark"]
+    for path in delta_paths:
+        with open(path, "rb") as f:
+            header = BackupReader(f).header
+            if watermark and datetime.fromisoformat(header["since"]) > datetime.fromisoformat(watermark):
+                raise HTTPException(status_code=400, detail=f"{path} starts at {header['since']}, "
+                                                            f"after the previous watermark {watermark}: a delta is missing")
+            f.seek(0)
+            reports.append(apply_delta(engine, f, batch_size))
+        watermark = reports[-1]["watermark"]
+    return reports
+
+if __name__ == "__main__":
+    import argparse
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Dump the database to a gzip NDJSON backup")
+    commands = parser.add_subparsers(dest="command", required=True)
+    dump = commands.add_parser("dump", help="Write a backup file")
+    dump.add_argument("path", nargs="?")
+    dump.add_argument("--since", type=datetime.fromisoformat, help="Delta: only rows changed since this time")
+    dump.add_argument("--after", metavar="PREVIOUS", help="Delta continuing from a previous backup file")
+    restore = commands.add_parser("restore", help="Restore a backup file (replaces current data)")
+    restore.add_argument("path")
+    restore.add_argument("--resume", action="store_true", help="Commit per batch; rerun to continue an interrupted restore")
+    restore.add_argument("--verify-only", action="store_true", help="Check the file against its manifest only")
+    restore.add_argument("--batch-size", type=int, default=RESTORE_BATCH_SIZE)
+    replay_cmd = commands.add_parser("replay", help="Restore a full backup plus a chain of deltas")
+    replay_cmd.add_argument("base")
+    replay_cmd.add_argument("deltas", nargs="*")
+    args = parser.parse_args()
+
+    if args.command == "dump":
+        since = args.since
+        if args.after:
+            since = datetime.fromisoformat(read_header(args.after)["watermark"])
+        path = args.path or backup_filename(delta=since is not None)
+        manifest = write_backup(engine, path, since)
+        print(f"💾 {'Delta' if since else 'Backup'} written to {path}" + (f" (since {since})" if since else ""))
+        for name, entry in manifest["tables"].items():
+            print(f"  {name:<18}{entry['rows']:>10,} rows  sha256 {entry['sha256'][:12]}")
+    elif args.command == "replay":
+        try:
+            reports = replay(engine, args.base, args.deltas)
+        except HTTPException as e:
+            raise SystemExit(f"❌ {e.detail}")
+        print(f"♻️ Restored {args.base} and replayed {len(args.deltas)} deltas (watermark {reports[-1]['watermark']})")
+    else:
+        with open(args.path, "rb") as f:
+            try:
+                if args.verify_only:
+                    report = verify_backup(f)
+                    print("✅ Backup verified" if report["ok"] else "❌ Backup failed verification")
+                    for problem in report["problems"]:
+                        print(f"  {problem}")
+                else:
+                    report = restore_backup(engine, f, args.batch_size, args.resume,
+                                            user_name="backup.py", source=os.path.basename(args.path))
+                    print(f"♻️ Restored {args.path} in {report['duration_ms'] / 1000:.1f}s")
+                    for name, counts in report["tables"].items():
+                        print(f"  {name:<18}{counts['restored']:>10,} restored{counts['skipped']:>10,} skipped")
+            except HTTPException as e:
+                raise SystemExit(f"❌ {e.detail}")
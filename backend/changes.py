@@ -0,0 +1,134 @@
+"""
+Row change tracking.
+
+Deleting a row through the ORM (`session.delete`) leaves a Tombstone in the
+same flush, so incremental backups can replay deletes. Core bulk deletes
+bypass the ORM and call `record_tombstones` with the ids they removed.
+
+Every flush also collects compact per-row changes (inserted rows, changed
+columns of updated rows, deleted ids) for the board change feed; they are
+published through the events hub once the transaction commits and dropped
+on rollback. Core bulk writes either note their changes (`note_update`,
+`record_tombstones`) or ask clients to refetch (`note_resync`); multi-row
+audit inserts are picked up automatically.
+
+Writes also bump a per-table version counter in the TableVersion table, in
+the same transaction, which list endpoints turn into ETags (etags.py) with
+one primary-key read instead of querying the rows. Any session-executed
+INSERT/UPDATE/DELETE on a tracked table counts, whichever process makes it
+(API workers, the standalone job worker, CLI scripts); writers on a bare
+connection, like backup restores, call `bump_versions` themselves.
+"""
+from datetime import datetime
+
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from database import increment_statement
+from derived import TransactionState
+from models import (
+    Tombstone, TableVersion, AuthorizedUser, Speaker, Sponsor, CreativeAsset, CreativeRequest, SprintDeadline, AuditLog
+)
+from events import hub
+
+TRACKED_TABLES = {
+    model.__tablename__
+    for model in (AuthorizedUser, Speaker, Sponsor, CreativeAsset, CreativeRequest, SprintDeadline, AuditLog)
+}
+FEED_TABLES = TRACKED_TABLES - {AuthorizedUser.__tablename__}
+MAX_EVENT_CHANGES = 500  # bigger commits (restores, mass edits) become a single resync
+
+def bump_versions(connection, tables):
+    """Adds one to each table's write counter, in the caller's transaction"""
+    rows = [{"table_name": name, "version": 1} for name in sorted(tables) if name in TRACKED_TABLES]
+    if rows:
+        connection.execute(
+            increment_statement(connection.dialect.name, TableVersion.__table__, ["table_name"], ["version"]), rows
+        )
+
+def read_versions(connection, tables) -> str:
+    """The tables' write counters as one token, e.g. "12.3" (unwritten tables count 0)"""
+    found = dict(connection.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+    ).all())
+    return ".".join(str(found.get(name, 0)) for name in tables)
+
+def publish(session, pending):
+    if len(pending) > MAX_EVENT_CHANGES or any(c["op"] == "resync" for c in pending):
+        pending = [{"op": "resync"}]
+    hub.publish(pending)
+
+# Feed entries are published once the transaction commits; touched tables
+# have their versions bumped just before it does
+feed = TransactionState("pending_changes", list, on_commit=publish)
+touched = TransactionState("touched_tables", set)
+
+def _pending(session) -> list:
+    return feed.get(session)
+
+def _touch(session, *tables):
+    touched.get(session).update(t for t in tables if t in TRACKED_TABLES)
+
+def note_update(session, model, ids, values: dict):
+    _touch(session, model.__tablename__)
+    _pending(session).extend({"op": "update", "table": model.__tablename__, "id": i, "values": values} for i in ids)
+
+def note_resync(session):
+    """For bulk writes whose rows aren't known here (imports, ingestion, restores): clients refetch"""
+    _touch(session, *TRACKED_TABLES)
+    _pending(session).append({"op": "resync"})
+
+def record_tombstones(session, model, ids):
+    now = datetime.now()
+    rows = [{"table_name": model.__tablename__, "row_id": row_id, "deleted_at": now} for row_id in ids]
+    if rows:
+        session.exec(insert(Tombstone), params=rows)
+        _touch(session, model.__tablename__)
+        _pending(session).extend({"op": "delete", "table": model.__tablename__, "id": i} for i in ids)
+
+@event.listens_for(Session, "before_flush")
+def tombstone_orm_deletes(session, flush_context, instances):
+    now = datetime.now()
+    for obj in session.deleted:
+        name = getattr(obj, "__tablename__", None)
+        if name in TRACKED_TABLES and obj.id is not None:
+            session.add(Tombstone(table_name=name, row_id=obj.id, deleted_at=now))
+
+@event.listens_for(Session, "after_flush")
+def collect_changes(session, flush_context):
+    # Attribute history still holds the pre-flush changes here
+    pending = _pending(session)
+    _touch(session, *(getattr(obj, "__tablename__", None) for obj in (*session.new, *session.dirty, *session.deleted)))
+    for obj in session.new:
+        if getattr(obj, "__tablename__", None) in FEED_TABLES:
+            pending.append({"op": "insert", "table": obj.__tablename__, "id": obj.id, "row": obj.model_dump()})
+    for obj in session.dirty:
+        if getattr(obj, "__tablename__", None) in FEED_TABLES:
+            state = inspect(obj)
+            values = {attr.key: attr.value for attr in state.attrs if attr.history.has_changes()}
+            if values:
+                pending.append({"op": "update", "table": obj.__tablename__, "id": obj.id, "values": values})
+    for obj in session.deleted:
+        if getattr(obj, "__tablename__", None) in FEED_TABLES:
+            pending.append({"op": "delete", "table": obj.__tablename__, "id": obj.id})
+
+@event.listens_for(Session, "do_orm_execute")
+def collect_bulk_writes(orm_execute_state):
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(statement, "table", None)
+        _touch(orm_execute_state.session, getattr(table, "name", None))
+    if orm_execute_state.is_insert and getattr(getattr(statement, "table", None), "name", None) == AuditLog.__tablename__:
+        rows = orm_execute_state.parameters
+        rows = rows if isinstance(rows, list) else [rows] if rows else []
+        _pending(orm_execute_state.session).extend(
+            {"op": "insert", "table": AuditLog.__tablename__, "id": None, "row": row} for row in rows
+        )
+
+@event.listens_for(Session, "before_commit")
+def persist_versions(session):
+    # commit flushes after this hook; flush now so the objects it writes count too
+    session.flush()
+    tables = touched.pop(session)
+    if tables:
+        bump_versions(session.connection(), tables)
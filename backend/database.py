@@ -35,3 +35,27 @@ def create_db_and_tables():
 def get_session():
     with Session(engine) as session:
         yield session
+
+def upsert_statement(dialect_name: str, table, columns, key: str = "id"):
+    """INSERT ... ON CONFLICT (key) DO UPDATE for SQLite and Postgres; bind with executemany rows"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={c: stmt.excluded[c] for c in columns if c != key}
+    )
+
+def increment_statement(dialect_name: str, table, keys, counters):
+    """INSERT ... ON CONFLICT (keys) DO UPDATE that adds the inserted `counters` to the existing row"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={c: table.c[c] + stmt.excluded[c] for c in counters}
+    )
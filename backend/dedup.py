@@ -0,0 +1,191 @@
+"""
+Near-duplicate detection for speakers.
+
+Names are normalised (case, diacritics, honorifics, punctuation, token order)
+and every record is filed under a handful of blocking keys: each pair of
+phonetic (Soundex) name tokens, the exact email and the LinkedIn handle. A
+lookup only scores the records sharing a key with the candidate, so it stays
+close to O(1) per candidate instead of comparing against the whole table.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from models import Speaker
+
+MATCH_THRESHOLD = 0.85
+# Phonetic buckets bigger than this (e.g. very common name pairs) are skipped when
+# scanning the whole table; exact email/LinkedIn/name keys are always checked
+MAX_BUCKET_SCAN = 200
+
+HONORIFICS = {
+    "dr", "mr", "mrs", "ms", "miss", "mx", "prof", "professor", "sir", "shri", "sri", "smt",
+    "kumari", "er", "adv", "ca", "capt", "col", "maj", "gen", "lt", "hon", "rev",
+    "jr", "sr", "phd", "md", "ii", "iii",
+}
+_SOUNDEX = {c: str(d) for d, letters in enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for c in letters}
+_LINKEDIN_RE = re.compile(r"linkedin\.com/(?:in|pub)/([^/?#\s]+)", re.I)
+
+def name_tokens(name: Optional[str]) -> list:
+    """'Dr. Shítal  MAHAJAN' -> ['mahajan', 'shital'] (sorted, honorifics dropped)"""
+    if not name:
+        return []
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    tokens = re.findall(r"[a-z0-9]+", text)
+    return sorted(t for t in tokens if t not in HONORIFICS)
+
+def normalize_name(name: Optional[str]) -> str:
+    return " ".join(name_tokens(name))
+
+def soundex(token: str) -> str:
+    if not token.isalpha():
+        return token
+    codes = [_SOUNDEX.get(c, "") for c in token]
+    out, last = token[0], codes[0]
+    for c, code in zip(token[1:], codes[1:]):
+        if code not in ("0", last) and code:
+            out += code
+        if c not in "hw":
+            last = code
+    return (out + "000")[:4]
+
+def linkedin_handle(url: Optional[str]) -> Optional[str]:
+    match = _LINKEDIN_RE.search(url or "")
+    return match.group(1).lower().rstrip("-") if match else None
+
+def blocking_keys(tokens: list, email: Optional[str], linkedin: Optional[str]) -> list:
+    keys = []
+    codes = sorted({soundex(t) for t in tokens if len(t) > 1})
+    if len(codes) == 1:
+        keys.append("p:" + codes[0])
+    keys.extend(f"p:{a}|{b}" for a, b in combinations(codes, 2))
+    if tokens:
+        keys.append("n:" + " ".join(tokens))
+    if email:
+        keys.append("e:" + email.strip().lower())
+    if linkedin:
+        keys.append("l:" + linkedin)
+    return keys
+
+def name_similarity(a: list, b: list, threshold: float = 0.0) -> float:
+    """
+    Token-order independent score in [0, 1]; a 2+ token name contained in the
+    other scores 0.9, names with different numbers score 0. Scores that can't
+    reach `threshold` may come back as a cheaper lower bound.
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    set_a, set_b = set(a), set(b)
+    if {t for t in set_a if t.isdigit()} != {t for t in set_b if t.isdigit()}:
+        return 0.0  # numbers identify (e.g. "Speaker 3" vs "Speaker 4")
+    smaller = min(len(set_a), len(set_b))
+    if smaller >= 2 and (set_a <= set_b or set_b <= set_a):
+        return 0.9
+    jaccard = len(set_a & set_b) / len(set_a | set_b)
+    if jaccard >= threshold > 0:
+        return jaccard
+    matcher = SequenceMatcher(None, " ".join(a), " ".join(b))
+    # real_quick_ratio/quick_ratio are cheap upper bounds of ratio()
+    if threshold and (matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold):
+        return jaccard
+    return max(jaccard, matcher.ratio())
+
+class DedupIndex:
+    def __init__(self):
+        self.records = {}  # id -> (name, tokens, email, linkedin handle)
+        self.buckets = {}  # blocking key -> [ids]
+
+    @classmethod
+    def from_session(cls, session: Session) -> "DedupIndex":
+        index = cls()
+        rows = session.exec(select(Speaker.id, Speaker.name, Speaker.email, Speaker.linkedin_url))
+        for speaker_id, name, email, linkedin_url in rows:
+            index.add(speaker_id, name, email, linkedin_url)
+        return index
+
+    def add(self, record_id, name: str, email: Optional[str] = None, linkedin_url: Optional[str] = None):
+        tokens = name_tokens(name)
+        handle = linkedin_handle(linkedin_url)
+        email = email.strip().lower() if email else None
+        self.records[record_id] = (name, tokens, email, handle)
+        for key in blocking_keys(tokens, email, handle):
+            self.buckets.setdefault(key, []).append(record_id)
+
+    def _score(self, tokens, email, handle, other, threshold):
+        _, other_tokens, other_email, other_handle = other
+        if email and email == other_email:
+            return 1.0, "email"
+        if handle and handle == other_handle:
+            return 1.0, "linkedin"
+        score = name_similarity(tokens, other_tokens, threshold)
+        return score, "name" if score == 1.0 else "similar name"
+
+    def _candidates(self, keys, max_bucket: Optional[int] = None):
+        seen = set()
+        for key in keys:
+            bucket = self.buckets.get(key, ())
+            if max_bucket and key.startswith("p:") and len(bucket) > max_bucket:
+                continue
+            for record_id in bucket:
+                if record_id not in seen:
+                    seen.add(record_id)
+                    yield record_id
+
+    def match(self, name: str, email: Optional[str] = None, linkedin_url: Optional[str] = None,
+              threshold: float = MATCH_THRESHOLD, exclude=None) -> list:
+        """Records that look like the same person, best first: [(id, score, reason)]"""
+        tokens = name_tokens(name)
+        handle = linkedin_handle(linkedin_url)
+        email = email.strip().lower() if email else None
+        found = []
+        for record_id in self._candidates(blocking_keys(tokens, email, handle)):
+            if record_id == exclude:
+                continue
+            score, reason = self._score(tokens, email, handle, self.records[record_id], threshold)
+            if score >= threshold:
+                found.append((record_id, round(score, 3), reason))
+        return sorted(found, key=lambda m: -m[1])
+
+    def duplicate_groups(self, threshold: float = MATCH_THRESHOLD) -> list:
+        """Clusters of records that match each other (union-find over matching pairs)"""
+        parent = {}
+
+        def find(x):
+            while parent.get(x, x) != x:
+                parent[x] = parent.get(parent[x], parent[x])
+                x = parent[x]
+            return x
+
+        pairs, done = {}, set()
+        for record_id, record in self.records.items():
+            done.add(record_id)
+            _, tokens, email, handle = record
+            for other_id in self._candidates(blocking_keys(tokens, email, handle), MAX_BUCKET_SCAN):
+                if other_id in done:
+                    continue
+                score, reason = self._score(tokens, email, handle, self.records[other_id], threshold)
+                if score >= threshold:
+                    pairs[(record_id, other_id)] = (score, reason)
+                    parent[find(record_id)] = find(other_id)
+
+        groups = {}
+        for (a, b), (score, reason) in pairs.items():
+            group = groups.setdefault(find(a), {"ids": set(), "score": 1.0, "reasons": set()})
+            group["ids"].update((a, b))
+            group["score"] = min(group["score"], score)
+            group["reasons"].add(reason)
+        return [
+            {
+                "speakers": [{"id": i, "name": self.records[i][0]} for i in sorted(g["ids"])],
+                "score": round(g["score"], 3),
+                "reasons": sorted(g["reasons"]),
+            }
+            for g in sorted(groups.values(), key=lambda g: (-len(g["ids"]), min(g["ids"])))
+        ]
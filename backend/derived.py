@@ -0,0 +1,166 @@
+"""
+Session-hook plumbing for state that follows a transaction's writes.
+
+- `TransactionState` keeps one value per transaction in `session.info`,
+  hands it to a callback once the session commits and drops it on rollback.
+  The change feed (changes.py), XP awards (xp.py) and buffered audit entries
+  (audit.py) are built on it.
+- `DerivedTable` keeps a counter table in step with the tables it is derived
+  from, inside the writing transaction (pipeline_stats.py,
+  activity_rollup.py). A feature supplies how to compute the table from
+  scratch, read it back, add deltas to it and find the deltas of ORM and
+  Core writes; the hooks, staleness handling, rebuild, consistency check
+  and `check | rebuild` CLI are shared.
+"""
+from sqlalchemy import event, delete
+from sqlalchemy.orm import Session
+
+
+class TransactionState:
+    def __init__(self, key: str, factory, on_commit=None):
+        self.key = key
+        self.factory = factory  # builds the empty value: list, set, dict
+        self.on_commit = on_commit  # on_commit(session, value) after a commit, when value is non-empty
+        event.listen(Session, "after_commit", self._committed)
+        event.listen(Session, "after_rollback", self.discard)
+
+    def get(self, session):
+        """This transaction's value, created on first use"""
+        value = session.info.get(self.key)
+        if value is None:
+            value = session.info[self.key] = self.factory()
+        return value
+
+    def pop(self, session):
+        return session.info.pop(self.key, None)
+
+    def discard(self, session):
+        session.info.pop(self.key, None)
+
+    def _committed(self, session):
+        value = self.pop(session)
+        if value and self.on_commit is not None:
+            self.on_commit(session, value)
+
+
+class DerivedTable:
+    """
+    A table of counters derived from `sources`, moved by deltas in the
+    transaction that writes the sources. Deltas are {key: counters} dicts,
+    the same shape `compute` returns for the whole table. The feature supplies:
+
+    compute(connection)          every row, fresh from the sources
+    stored(connection)           what the table holds now
+    apply(connection, deltas)    adds deltas to the table
+    collect(session, deltas)     before_flush: adds the deltas of the session's new/dirty/deleted objects
+    bulk_write(state, deltas)    a Core write on a source table: add its deltas and return True,
+                                 or return False if they can't be told (the table goes stale)
+
+    A Core write whose deltas were noted beforehand (`note`) is accounted for
+    without asking `bulk_write`. A stale table is rebuilt before commit.
+    """
+    def __init__(self, name: str, label: str, table, sources, key_fields: tuple, zero: list,
+                 compute, stored, apply, collect=None, bulk_write=None, matches=None):
+        self.label = label
+        self.table = table
+        self.sources = set(sources)
+        self.key_fields = key_fields  # names of the key's parts in `check` results
+        self.zero = zero  # counters of a missing row
+        self.compute = compute
+        self.stored = stored
+        self.apply = apply
+        self.collect = collect
+        self.bulk_write = bulk_write
+        self.matches = matches or (lambda expected, found: expected == found)
+        self.deltas_key, self.stale_key, self.noted_key = f"{name}_deltas", f"{name}_stale", f"{name}_noted"
+        event.listen(Session, "before_flush", self._before_flush)
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "do_orm_execute", self._watch)
+        event.listen(Session, "before_commit", self._before_commit)
+        event.listen(Session, "after_rollback", self.discard)
+
+    def pending(self, session) -> dict:
+        return session.info.setdefault(self.deltas_key, {})
+
+    def note(self, session):
+        """The deltas of the next Core write on a source table are already pending"""
+        session.info[self.noted_key] = True
+
+    def mark_stale(self, session):
+        """The deltas of this transaction's writes can't be told: rebuild the table before commit"""
+        session.info[self.stale_key] = True
+
+    def apply_pending(self, session):
+        deltas = session.info.pop(self.deltas_key, None)
+        if deltas:
+            self.apply(session.connection(), deltas)
+
+    def discard(self, session):
+        for key in (self.deltas_key, self.stale_key, self.noted_key):
+            session.info.pop(key, None)
+
+    def rebuild(self, connection) -> int:
+        """Replaces every row with a fresh computation; returns the number of rows"""
+        fresh = self.compute(connection)
+        connection.execute(delete(self.table))
+        self.apply(connection, fresh)
+        return len(fresh)
+
+    def check(self, connection) -> list:
+        """Rows whose stored counters disagree with the sources (empty when consistent)"""
+        fresh, current = self.compute(connection), self.stored(connection)
+        problems = []
+        for key in sorted(set(fresh) | set(current)):
+            expected, found = fresh.get(key, self.zero), current.get(key, self.zero)
+            if not self.matches(expected, found):
+                problems.append({**dict(zip(self.key_fields, key)), "stored": found, "actual": expected})
+        return problems
+
+    def _before_flush(self, session, flush_context, instances):
+        if self.collect is not None:
+            self.collect(session, self.pending(session))
+
+    def _after_flush(self, session, flush_context):
+        self.apply_pending(session)
+
+    def _watch(self, orm_execute_state):
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        # ORM statements carry an annotated copy of the table, so compare names
+        if getattr(getattr(orm_execute_state.statement, "table", None), "name", None) not in self.sources:
+            return
+        session = orm_execute_state.session
+        accounted = session.info.pop(self.noted_key, False) or (
+            self.bulk_write is not None and self.bulk_write(orm_execute_state, self.pending(session))
+        )
+        if accounted:
+            # The statement's deltas go out with it, not at the next flush
+            self.apply_pending(session)
+        else:
+            self.mark_stale(session)
+
+    def _before_commit(self, session):
+        if session.info.pop(self.stale_key, False):
+            session.info.pop(self.deltas_key, None)
+            self.rebuild(session.connection())
+
+    def main(self, description: str):
+        """CLI entry point: check | rebuild"""
+        import argparse
+        from database import engine, create_db_and_tables
+
+        parser = argparse.ArgumentParser(description=description)
+        parser.add_argument("command", choices=["check", "rebuild"])
+        args = parser.parse_args()
+        create_db_and_tables()
+
+        with engine.begin() as conn:
+            if args.command == "rebuild":
+                print(f"🔁 Rebuilt {self.rebuild(conn)} {self.label} rows")
+            else:
+                problems = self.check(conn)
+                for p in problems[:50]:
+                    key = "/".join(str(p[field]) for field in self.key_fields)
+                    print(f"  {key}: stored {p['stored']} vs actual {p['actual']}")
+                print(f"✅ {self.label.capitalize()} consistent" if not problems else f"❌ {len(problems)} {self.label} rows out of sync")
+                raise SystemExit(1 if problems else 0)
@@ -0,0 +1,45 @@
+"""
+Conditional GETs for the list endpoints.
+
+The ETag is built from the tables' persisted write counters (changes.py), so
+answering a revalidation costs one primary-key read instead of the list
+query: if the client's If-None-Match still matches, the route returns 304
+before its body runs. The tag also covers the query string and the caller's
+Authorization header, since the same table can produce different lists per
+filter/user.
+
+The counters are bumped in the writing transaction, so writes from any
+process (other API workers, `python jobs.py`, backup restores) change the
+tag. Only hand-written SQL against the database goes unnoticed.
+
+The dependency doesn't authenticate: who may read a list is up to its route.
+Protected routes list their auth dependency first
+(`dependencies=[Depends(verify_token), Depends(conditional_get(Speaker))]`),
+so callers without a valid token get their 401 before the version read.
+"""
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlmodel import Session
+
+from changes import read_versions
+from database import get_session
+
+CACHE_CONTROL = "private, no-cache"  # browsers may keep it, but must revalidate every time
+
+def conditional_get(*models):
+    """Route dependency: `dependencies=[Depends(conditional_get(Speaker))]`, after the route's auth dependency"""
+    tables = [model.__tablename__ for model in models]
+
+    def check(request: Request, response: Response, session: Session = Depends(get_session)):
+        scope = f"{request.url.query}|{request.headers.get('authorization', '')}"
+        digest = hashlib.blake2b(scope.encode(), digest_size=6).hexdigest()
+        etag = f'W/"{read_versions(session.connection(), tables)}-{digest}"'
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return check
@@ -0,0 +1,103 @@
+"""
+In-process broadcast hub for the board change feed (GET /events/stream).
+
+Committed changes (collected by changes.py) are published as one event per
+commit, JSON-encoded once and fanned out to every subscriber's bounded queue.
+Publishing is thread-safe: sync endpoints run in the threadpool, so fan-out
+is handed to the event loop with call_soon_threadsafe.
+
+Backpressure: a client that falls EVENT_QUEUE_SIZE events behind has its
+queue dropped and gets a single `resync` event instead, telling it to
+refetch. A short history lets a reconnecting client (Last-Event-ID) catch up
+without refetching, as long as it wasn't gone for too long.
+"""
+import asyncio
+import json
+import os
+import threading
+import uuid
+from collections import deque
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+EVENT_HISTORY = int(os.getenv("EVENT_HISTORY", "1000"))
+RESYNC = json.dumps({"changes": [{"op": "resync"}]})
+
+class Subscriber:
+    def __init__(self, hub, queue_size: int):
+        self.hub = hub
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.last_seq = 0
+
+    def offer(self, seq: int, data: str):
+        if seq <= self.last_seq:
+            return  # already delivered from history
+        self.last_seq = seq
+        try:
+            self.queue.put_nowait((seq, data))
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop what's queued and tell it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((seq, RESYNC))
+            self.hub.stats["overflows"] += 1
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.hub.epoch}:{seq}"
+
+class ChangeHub:
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE, history: int = EVENT_HISTORY):
+        self.queue_size = queue_size
+        self.epoch = uuid.uuid4().hex[:8]  # event ids from a previous process can't be replayed
+        self.seq = 0
+        self.history = deque(maxlen=history)
+        self.subscribers = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.lock = threading.Lock()
+        self.stats = {"published": 0, "overflows": 0}
+
+    def publish(self, changes: list):
+        data = json.dumps({"changes": jsonable_encoder(changes)})
+        with self.lock:
+            self.seq += 1
+            event = (self.seq, data)
+            self.history.append(event)
+            self.stats["published"] += 1
+            loop = self.loop if self.subscribers else None
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event):
+        for subscriber in list(self.subscribers):
+            subscriber.offer(*event)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        self.loop = asyncio.get_running_loop()
+        subscriber = Subscriber(self, self.queue_size)
+        with self.lock:
+            if last_event_id:
+                epoch, _, seq = last_event_id.partition(":")
+                seq = int(seq) if seq.isdigit() else -1
+                oldest = self.history[0][0] if self.history else self.seq + 1
+                if epoch != self.epoch or seq > self.seq or seq < oldest - 1:
+                    subscriber.last_seq = self.seq
+                    subscriber.queue.put_nowait((self.seq, RESYNC))
+                else:
+                    subscriber.last_seq = seq
+                    for event in self.history:
+                        subscriber.offer(*event)
+            else:
+                subscriber.last_seq = self.seq
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def metrics(self) -> dict:
+        return {**self.stats, "subscribers": len(self.subscribers), "last_id": f"{self.epoch}:{self.seq}"}
+
+hub = ChangeHub()
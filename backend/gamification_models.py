@@ -2,6 +2,6 @@ from pydantic import BaseModel
 from typing import Optional
 
 class GamificationUpdate(BaseModel):
-    xp: Optional[int] = None
-    streak: Optional[int] = None
+    # XP only comes from the server-side ledger and the streak is derived from
+    # the login date; clients can't set either (extra fields are ignored)
     last_login_date: Optional[str] = None
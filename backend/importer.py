@@ -0,0 +1,227 @@
+"""
+Bulk speaker import from CSV/Excel.
+
+Columns are matched by header aliases (the master list's `ID` column is the
+speaker's original_id), values are cleaned and validated with vectorized
+pandas operations, and rows are upserted on the speaker name (case and
+whitespace insensitive): new names go in with batched executemany INSERTs,
+existing speakers get their imported columns refreshed with batched UPDATEs
+(blank cells never overwrite data). Rows that fail validation are skipped and
+reported with their line number.
+
+CLI:  python importer.py path/to/file.csv [--dry-run]
+"""
+import io
+import os
+import re
+import time
+from datetime import datetime
+from typing import Optional, Union
+
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import bindparam, func, insert, update
+from sqlmodel import Session, select
+
+from models import Speaker, OutreachStatus
+from ingest import name_key
+from changes import note_resync
+from pipeline_stats import mark_stale
+import audit
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+IMPORT_MAX_BYTES = 50 * 1024 * 1024  # request body limit for the upload endpoint
+MAX_REPORTED_ERRORS = 500
+
+# Speaker field -> accepted headers (compared lowercased, without punctuation)
+COLUMN_ALIASES = {
+    "original_id": ["id", "s no", "sno", "serial", "serial no", "sr no"],
+    "batch": ["batch", "category"],
+    "name": ["name", "speaker", "speaker name", "full name"],
+    "primary_domain": ["primary domain", "domain"],
+    "blurring_line_angle": ["blurring line angle", "angle"],
+    "location": ["location", "city"],
+    "outreach_priority": ["outreach priority", "tier"],
+    "contact_method": ["contact method"],
+    "email": ["email", "email address"],
+    "phone": ["phone", "phone number", "mobile"],
+    "linkedin_url": ["linkedin", "linkedin url"],
+    "tags": ["tags"],
+    "remarks": ["remarks", "notes"],
+}
+DEFAULTS = {"outreach_priority": "Tier 3"}
+EMAIL_PATTERN = r"^[A-Za-z0-9._%+'-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}$"
+NULL_STRINGS = {"", "nan", "none", "null", "n/a", "na", "-"}
+
+def _header_key(header) -> str:
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(header).lower()).split())
+
+def read_table(source: Union[str, bytes], filename: str = "") -> pd.DataFrame:
+    """Reads a CSV or Excel file (path or uploaded bytes) with every cell as text"""
+    name = (filename or (source if isinstance(source, str) else "")).lower()
+    data = io.BytesIO(source) if isinstance(source, bytes) else source
+    try:
+        if name.endswith((".xlsx", ".xls")):
+            return pd.read_excel(data, dtype=str, keep_default_na=False)
+        return pd.read_csv(data, dtype=str, keep_default_na=False, encoding_errors="replace")
+    except ImportError as e:
+        raise HTTPException(status_code=400, detail=f"Excel import needs an extra package: {e}")
+    except (ValueError, pd.errors.ParserError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read file: {e}")
+
+def map_columns(df: pd.DataFrame):
+    """Renames known headers to Speaker fields; returns (frame, unknown headers)"""
+    lookup = {alias: field for field, aliases in COLUMN_ALIASES.items() for alias in aliases}
+    renames, unknown = {}, []
+    for header in df.columns:
+        field = lookup.get(_header_key(header))
+        if field and field not in renames.values():
+            renames[header] = field
+        else:
+            unknown.append(str(header))
+    if "name" not in renames.values():
+        raise HTTPException(status_code=400, detail="File has no name column (expected a 'Name' header)")
+    return df[list(renames)].rename(columns=renames), unknown
+
+def clean(df: pd.DataFrame) -> pd.DataFrame:
+    """Strips whitespace and turns placeholder strings into nulls, column by column"""
+    df = df.apply(lambda col: col.astype(str).str.strip())
+    df = df.apply(lambda col: col.mask(col.str.lower().isin(NULL_STRINGS)))
+    df["name"] = df["name"].str.replace(r"\s+", " ", regex=True)
+    return df
+
+def validate(df: pd.DataFrame):
+    """Returns (valid rows, errors). Row numbers are file lines (header = line 1)."""
+    line = pd.Series(df.index + 2, index=df.index)
+    blank = df.isna().all(axis=1)
+    df, line = df[~blank], line[~blank]
+
+    problems = pd.Series("", index=df.index)
+    problems = problems.mask(df["name"].isna(), "Missing name")
+    if "email" in df:
+        bad_email = df["email"].notna() & ~df["email"].str.match(EMAIL_PATTERN, na=False)
+        problems = problems.mask((problems == "") & bad_email, "Invalid email")
+        dup_email = df["email"].str.lower().duplicated(keep="first") & df["email"].notna()
+        problems = problems.mask((problems == "") & dup_email, "Email repeated in file")
+
+    keys = df["name"].fillna("").map(name_key)
+    dup_name = keys.duplicated(keep="first") & (keys != "")
+    first_line = line.groupby(keys).transform("first")
+    problems = problems.mask((problems == "") & dup_name, "Duplicate of line " + first_line.astype(str))
+
+    bad = problems != ""
+    errors = [
+        {"row": int(r), "name": None if pd.isna(n) else n, "error": e}
+        for r, n, e in zip(line[bad], df.loc[bad, "name"], problems[bad])
+    ]
+    valid = df[~bad].copy()
+    valid["_key"] = keys[~bad]
+    valid["_line"] = line[~bad]
+    return valid, errors, int(blank.sum())
+
+def _batches(rows: list):
+    for i in range(0, len(rows), IMPORT_BATCH_SIZE):
+        yield rows[i:i + IMPORT_BATCH_SIZE]
+
+def import_frame(session: Session, df: pd.DataFrame, user: Optional[dict] = None, dry_run: bool = False,
+                 filename: str = "") -> dict:
+    """Validates and upserts `df`; with a `user`, the import is audit-logged in the same commit"""
+    started = time.perf_counter()
+    total = len(df)
+    df, unknown = map_columns(df)
+    valid, errors, blank = validate(clean(df))
+    for field, default in DEFAULTS.items():
+        valid[field] = valid[field].fillna(default) if field in valid else default
+    fields = [c for c in valid.columns if not c.startswith("_")]
+
+    # Upsert targets and emails already taken, one query each
+    existing = {name_key(name): sid for sid, name in session.exec(select(Speaker.id, Speaker.name))}
+    valid["_id"] = valid["_key"].map(existing)
+    if "email" in valid:
+        emails = [e for e in valid["email"].dropna().unique()]
+        taken = {}
+        for chunk in _batches(emails):
+            taken.update({e.lower(): sid for sid, e in session.exec(
+                select(Speaker.id, Speaker.email).where(func.lower(Speaker.email).in_([c.lower() for c in chunk]))
+            )})
+        owner = valid["email"].str.lower().map(taken)
+        clash = owner.notna() & (owner != valid["_id"])
+        errors.extend(
+            {"row": int(r), "name": n, "error": "Email belongs to another speaker"}
+            for r, n in zip(valid.loc[clash, "_line"], valid.loc[clash, "name"])
+        )
+        valid = valid[~clash]
+
+    # NaN -> None so the driver binds NULL
+    records = valid[fields].astype(object).where(valid[fields].notna(), None)
+    is_new = valid["_id"].isna().to_numpy()
+    now = datetime.now()
+    new_rows = [
+        {**row, "status": OutreachStatus.SCOUTED, "is_bounty": False, "priority": "MEDIUM",
+         "last_updated": now, "last_activity": now, "assigned_by": (user or {}).get("roll_number")}
+        for row in records[is_new].to_dict("records")
+    ]
+    updates = [
+        {**{f"v_{k}": v for k, v in row.items()}, "_sid": int(sid)}
+        for row, sid in zip(records[~is_new].to_dict("records"), valid.loc[~is_new, "_id"])
+    ]
+
+    if not dry_run:
+        for batch in _batches(new_rows):
+            session.exec(insert(Speaker), params=batch)
+        if updates:
+            # Blank cells keep the current value
+            stmt = (
+                update(Speaker)
+                .where(Speaker.id == bindparam("_sid"))
+                .values({f: func.coalesce(bindparam(f"v_{f}"), getattr(Speaker, f)) for f in fields} | {"last_updated": now})
+            )
+            for batch in _batches(updates):
+                session.connection().execute(stmt, batch)
+        if new_rows or updates:
+            note_resync(session)
+            mark_stale(session)
+        if user:
+            audit.record(
+                session,
+                user.get("username") or user.get("roll_number") or "Unknown",
+                "IMPORT_SPEAKERS",
+                f"Imported {filename}: {len(new_rows)} new, {len(updates)} updated, {len(errors)} skipped",
+                roll_number=user.get("roll_number")
+            )
+        session.commit()
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "total_rows": total,
+        "inserted": len(new_rows),
+        "updated": len(updates),
+        "blank_rows": blank,
+        "skipped": len(errors),
+        "errors": errors[:MAX_REPORTED_ERRORS],
+        "unknown_columns": unknown,
+        "dry_run": dry_run,
+        "duration_ms": round((time.perf_counter() - started) * 1000),
+    }
+
+def import_file(session: Session, source: Union[str, bytes], filename: str = "",
+                user: Optional[dict] = None, dry_run: bool = False) -> dict:
+    return import_frame(session, read_table(source, filename), user, dry_run, filename)
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from database import engine, create_db_and_tables
+
+    parser = argparse.ArgumentParser(description="Import speakers from a CSV/Excel file")
+    parser.add_argument("path")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without writing")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        report = import_file(session, args.path, dry_run=args.dry_run)
+    errors = report.pop("errors")
+    print(json.dumps(report, indent=2))
+    for error in errors:
+        print(f"  line {error['row']}: {error['error']} ({error['name']})")
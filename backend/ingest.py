@@ -0,0 +1,219 @@
+"""
+Chunked AI ingestion of pasted research dumps.
+
+The raw text is split into overlapping chunks that fit comfortably in one
+prompt, chunks are extracted concurrently, and the profiles are merged by name
+in memory (the overlap means a person cut at a chunk edge is seen twice).
+Profiles are then checked against the fuzzy dedup index (dedup.py) built from
+one query over the speaker table, and the new ones are inserted in a single
+statement.
+"""
+import os
+import json
+import asyncio
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from ai_utils import call_ai_async, AI_MAX_CONCURRENCY, INGEST_CACHE_TTL, PRIORITY_BULK
+from models import Speaker, OutreachStatus
+from dedup import DedupIndex
+from changes import note_resync
+from pipeline_stats import note_bulk_insert
+
+INGEST_CHUNK_CHARS = int(os.getenv("INGEST_CHUNK_CHARS", "12000"))
+INGEST_CHUNK_OVERLAP = int(os.getenv("INGEST_CHUNK_OVERLAP", "800"))
+INGEST_MAX_BYTES = 10 * 1024 * 1024  # request body limit for the ingest endpoints
+
+PROFILE_FIELDS = ["primary_domain", "location", "linkedin_url", "email", "phone", "search_details"]
+
+EXTRACTION_SYSTEM_PROMPT = "You are a data extraction assistant for TEDxXLRI. Output ONLY a valid JSON array of objects. No intro text, no conversational filler."
+
+def extraction_prompt(raw_text: str) -> str:
+    return f"""
+    Extract a list of potential speakers from the following text.
+    The text may be one excerpt of a longer document; only include people named in it.
+    Format the output as a JSON array of objects with these fields:
+    - name: Full name (be precise)
+    - primary_domain: Their main field or occupation
+    - location: City or country
+    - linkedin_url: URL if found
+    - email: Email if found
+    - phone: Phone if found
+    - search_details: A short 2-3 sentence summary of why they are relevant to TEDxXLRI's theme 'The Blurring Line'.
+
+    Raw Text:
+    {raw_text}
+
+    Return ONLY the raw JSON array. If no speakers are found, return [].
+    """
+
+def split_chunks(text: str, size: Optional[int] = None, overlap: Optional[int] = None) -> list:
+    """
+    Splits text into chunks of at most `size` characters, cut at paragraph, line
+    or sentence breaks where possible, each repeating the last ~`overlap`
+    characters of the previous chunk.
+    """
+    size = size or INGEST_CHUNK_CHARS
+    overlap = INGEST_CHUNK_OVERLAP if overlap is None else overlap
+    text = text.strip()
+    if len(text) <= size:
+        return [text] if text else []
+    overlap = min(overlap, size // 2)
+
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            floor = start + size * 3 // 4
+            for sep in ("\n\n", "\n", ". ", " "):
+                cut = text.rfind(sep, floor, end)
+                if cut != -1:
+                    end = cut + len(sep)
+                    break
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        # Start the overlap on a line or word boundary so names aren't split
+        next_start = end - overlap
+        boundary = text.find("\n", next_start, end)
+        if boundary == -1:
+            boundary = text.find(" ", next_start, end)
+        start = boundary + 1 if boundary != -1 else next_start
+    return [c for c in chunks if c]
+
+def parse_profiles(raw: str) -> list:
+    """Pulls the JSON array out of an extraction reply; raises ValueError if there is none"""
+    clean_json = (raw or "").strip()
+    if "```json" in clean_json:
+        clean_json = clean_json.split("```json")[1].split("```")[0].strip()
+    elif "```" in clean_json:
+        clean_json = clean_json.split("```")[1].split("```")[0].strip()
+
+    start_idx = clean_json.find('[')
+    end_idx = clean_json.rfind(']')
+    if start_idx != -1 and end_idx != -1:
+        clean_json = clean_json[start_idx: end_idx + 1]
+    profiles = json.loads(clean_json)
+    if not isinstance(profiles, list):
+        raise ValueError("Extraction reply is not a JSON array")
+    return [p for p in profiles if isinstance(p, dict)]
+
+def name_key(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+def merge_profiles(batches) -> list:
+    """Merges extracted profiles by name; first non-empty value wins, longest summary wins"""
+    merged = {}
+    for profiles in batches:
+        for data in profiles:
+            name = " ".join(str(data.get("name") or "").split())
+            if not name or name.lower() == "unknown":
+                continue
+            current = merged.setdefault(name_key(name), {"name": name})
+            for field in PROFILE_FIELDS:
+                value = data.get(field)
+                if value is None:
+                    continue
+                value = str(value).strip()
+                if not value:
+                    continue
+                if field == "search_details":
+                    if len(value) > len(current.get(field) or ""):
+                        current[field] = value
+                elif not current.get(field):
+                    current[field] = value
+    return list(merged.values())
+
+def save_profiles(session: Session, profiles: list, user: dict) -> dict:
+    """
+    Inserts profiles that don't match a speaker already on the board (or an
+    earlier profile in this batch) in one statement.
+    """
+    index = DedupIndex.from_session(session)
+    rows, duplicates = [], []
+    for i, data in enumerate(profiles):
+        matches = index.match(data["name"], data.get("email"), data.get("linkedin_url"))
+        if matches:
+            match_id, score, reason = matches[0]
+            duplicates.append({
+                "name": data["name"],
+                "reason": reason,
+                "matched": index.records[match_id][0],
+                "score": score,
+            })
+            continue
+        index.add(("new", i), data["name"], data.get("email"), data.get("linkedin_url"))
+        speaker = Speaker(
+            name=data["name"],
+            **{field: data.get(field) for field in PROFILE_FIELDS},
+            status=OutreachStatus.SCOUTED,
+            assigned_by=user.get("roll_number")
+        )
+        rows.append(speaker.model_dump(exclude={"id"}))
+
+    if rows:
+        note_bulk_insert(session, Speaker, rows)
+        session.exec(insert(Speaker), params=rows)
+        note_resync(session)
+        session.commit()
+    return {"count": len(rows), "duplicates": duplicates}
+
+async def run_ingest(session: Session, raw_text: str, user: dict,
+                     progress: Optional[Callable] = None, concurrency: int = AI_MAX_CONCURRENCY) -> dict:
+    chunks = split_chunks(raw_text)
+    state = {"stage": "extracting", "chunks_done": 0, "chunks_total": len(chunks), "extracted": 0, "failed_chunks": 0}
+
+    async def report():
+        if progress:
+            await asyncio.to_thread(progress, dict(state))
+
+    async def extract(semaphore, chunk):
+        async with semaphore:
+            raw = await call_ai_async(extraction_prompt(chunk), system_prompt=EXTRACTION_SYSTEM_PROMPT,
+                                      cache_ttl=INGEST_CACHE_TTL, priority=PRIORITY_BULK)
+        return parse_profiles(raw)
+
+    await report()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tasks = [asyncio.create_task(extract(semaphore, chunk)) for chunk in chunks]
+    batches, errors = [], []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                profiles = await next_done
+                batches.append(profiles)
+                state["extracted"] += len(profiles)
+            except HTTPException as e:
+                errors.append(str(e.detail))
+                state["failed_chunks"] += 1
+            except ValueError as e:
+                print(f"Ingestion chunk parse error: {e}")
+                errors.append("Failed to parse AI output into valid speaker data.")
+                state["failed_chunks"] += 1
+            state["chunks_done"] += 1
+            await report()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if chunks and len(errors) == len(chunks):
+        raise HTTPException(status_code=502, detail=errors[0])
+
+    profiles = merge_profiles(batches)
+    state.update(stage="saving", unique=len(profiles))
+    await report()
+    saved = await asyncio.to_thread(save_profiles, session, profiles, user)
+
+    duplicates = saved["duplicates"]
+    return {
+        "message": f"Successfully ingested {saved['count']} new speakers.",
+        "count": saved["count"],
+        "duplicates": duplicates,
+        "skipped_duplicates": [d["name"] for d in duplicates],
+        "skipped_count": len(duplicates),
+        "chunks": len(chunks),
+        "failed_chunks": state["failed_chunks"],
+    }
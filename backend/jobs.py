@@ -0,0 +1,271 @@
+"""
+Background jobs for long-running AI work.
+
+Jobs live in the `job` table, so queued work survives restarts and needs no
+broker. A small asyncio worker pool claims jobs with a compare-and-set UPDATE
+(safe across processes) and runs the registered handler. The pool runs inside
+the API process by default (JOB_WORKERS); set JOB_WORKERS=0 and run
+`python jobs.py` to process the queue in a separate worker process instead.
+"""
+import os
+import json
+import asyncio
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from database import engine as default_engine
+from models import Job, JobStatus
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+# Running jobs heartbeat; one silent for longer than the lease was orphaned by a dead worker
+JOB_HEARTBEAT_SECONDS = 15
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# kind -> handler(session, payload, user, progress) -> dict
+JOB_HANDLERS: Dict[str, Callable] = {}
+# kind -> (payload model, dedupe(payload) -> key); applied by enqueue whichever route queues the job
+JOB_PAYLOADS: Dict[str, tuple] = {}
+
+def job_handler(kind: str, payload: Optional[Type[BaseModel]] = None, dedupe: Optional[Callable] = None):
+    """
+    Registers a function as the handler for a job kind (sync or async).
+    `payload` validates the payload of every enqueue; `dedupe` derives the
+    dedupe key from it, so POST /jobs gets the same one-active-job guard as
+    the kind's own route.
+    """
+    def register(fn):
+        JOB_HANDLERS[kind] = fn
+        JOB_PAYLOADS[kind] = (payload, dedupe)
+        return fn
+    return register
+
+def find_active(session: Session, dedupe_key: str) -> Optional[Job]:
+    """The QUEUED/RUNNING job holding `dedupe_key`, if any"""
+    return session.exec(
+        select(Job)
+        .where(Job.dedupe_key == dedupe_key, Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]))
+        .order_by(Job.id)
+        .limit(1)
+    ).first()
+
+def enqueue(session: Session, kind: str, payload: dict, user: dict, dedupe_key: Optional[str] = None) -> Job:
+    """
+    Queues a job. With `dedupe_key` (given, or derived from the payload by the
+    kind's `dedupe`), an already active job for the same key is
+    returned instead, so repeated clicks all poll one job. The partial unique
+    index on active dedupe keys settles concurrent clicks: the losing insert
+    fails and gets the winner's job.
+    """
+    if kind not in JOB_HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {kind}")
+    model, dedupe = JOB_PAYLOADS[kind]
+    if model is not None:
+        try:
+            payload = model(**payload).model_dump()
+        except ValidationError as e:
+            problems = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            raise HTTPException(status_code=400, detail=f"Invalid {kind} payload: {problems}")
+    if dedupe_key is None and dedupe is not None:
+        dedupe_key = dedupe(payload)
+    if dedupe_key:
+        active = find_active(session, dedupe_key)
+        if active:
+            return active
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        user=json.dumps(user),
+        dedupe_key=dedupe_key,
+        created_by=user.get("roll_number")
+    )
+    session.add(job)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        active = find_active(session, dedupe_key) if dedupe_key else None
+        if not active:
+            raise
+        return active
+    session.refresh(job)
+    return job
+
+def job_to_dict(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": json.loads(job.result) if job.result else None,
+        "progress": json.loads(job.progress) if job.progress else None,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_by": job.created_by,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+def _set(engine, job_id: int, **values):
+    with Session(engine) as session:
+        session.exec(update(Job).where(Job.id == job_id).values(**values))
+        session.commit()
+
+def claim_next(engine=default_engine) -> Optional[Job]:
+    """Atomically moves the oldest QUEUED job to RUNNING; returns None if another worker won"""
+    with Session(engine) as session:
+        job = session.exec(
+            select(Job).where(Job.status == JobStatus.QUEUED).order_by(Job.id).limit(1)
+        ).first()
+        if not job:
+            return None
+        claimed = session.exec(
+            update(Job)
+            .where(Job.id == job.id, Job.status == JobStatus.QUEUED)
+            .values(status=JobStatus.RUNNING, started_at=datetime.now(), heartbeat_at=datetime.now(),
+                    attempts=Job.attempts + 1)
+        )
+        session.commit()
+        if claimed.rowcount != 1:
+            return None
+        session.refresh(job)
+        return job
+
+def requeue_orphans(engine=default_engine) -> int:
+    """Requeues RUNNING jobs whose worker stopped heartbeating; gives up after JOB_MAX_ATTEMPTS"""
+    cutoff = datetime.now() - timedelta(seconds=JOB_LEASE_SECONDS)
+    with Session(engine) as session:
+        failed = session.exec(
+            update(Job)
+            .where(Job.status == JobStatus.RUNNING, Job.heartbeat_at < cutoff, Job.attempts >= JOB_MAX_ATTEMPTS)
+            .values(status=JobStatus.FAILED, error="Worker lost too many times", finished_at=datetime.now())
+        ).rowcount
+        requeued = session.exec(
+            update(Job)
+            .where(Job.status == JobStatus.RUNNING, Job.heartbeat_at < cutoff)
+            .values(status=JobStatus.QUEUED)
+        ).rowcount
+        session.commit()
+    if requeued or failed:
+        print(f"♻️ Jobs: requeued {requeued} orphaned, failed {failed}")
+    return requeued
+
+async def run_job(job: Job, engine=default_engine):
+    handler = JOB_HANDLERS.get(job.kind)
+    if handler is None:
+        _set(engine, job.id, status=JobStatus.FAILED, error=f"No handler for {job.kind}", finished_at=datetime.now())
+        return
+
+    payload = json.loads(job.payload or "{}")
+    user = json.loads(job.user or "{}")
+
+    def progress(data: dict):
+        _set(engine, job.id, progress=json.dumps(data))
+
+    def run_sync():
+        with Session(engine) as session:
+            return handler(session, payload, user, progress)
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            await asyncio.to_thread(_set, engine, job.id, heartbeat_at=datetime.now())
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        if asyncio.iscoroutinefunction(handler):
+            with Session(engine) as session:
+                result = await handler(session, payload, user, progress)
+        else:
+            result = await asyncio.to_thread(run_sync)
+        _set(engine, job.id, status=JobStatus.SUCCEEDED, result=json.dumps(result, default=str), finished_at=datetime.now())
+    except HTTPException as e:
+        _set(engine, job.id, status=JobStatus.FAILED, error=str(e.detail), finished_at=datetime.now())
+    except Exception as e:
+        traceback.print_exc()
+        _set(engine, job.id, status=JobStatus.FAILED, error=str(e), finished_at=datetime.now())
+    finally:
+        beat.cancel()
+
+async def worker_loop(stop: asyncio.Event, engine=default_engine):
+    while not stop.is_set():
+        try:
+            job = await asyncio.to_thread(claim_next, engine)
+        except Exception as e:
+            print(f"Job claim error: {e}")
+            job = None
+        if job:
+            await run_job(job, engine)
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+class WorkerPool:
+    """N asyncio workers polling the job table, plus a periodic orphan reaper"""
+
+    def __init__(self, workers: int = JOB_WORKERS, engine=default_engine):
+        self.workers = workers
+        self.engine = engine
+        self.stop_event = None
+        self.tasks = []
+
+    async def _reaper(self):
+        while not self.stop_event.is_set():
+            try:
+                await asyncio.to_thread(requeue_orphans, self.engine)
+            except Exception as e:
+                print(f"Job reaper error: {e}")
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=JOB_LEASE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self.workers <= 0:
+            return
+        self.stop_event = asyncio.Event()
+        self.tasks = [asyncio.create_task(worker_loop(self.stop_event, self.engine)) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self._reaper()))
+        print(f"⚙️ Job workers started ({self.workers})")
+
+    async def stop(self, timeout: float = 10):
+        if not self.tasks:
+            return
+        self.stop_event.set()
+        done, pending = await asyncio.wait(self.tasks, timeout=timeout)
+        for task in pending:
+            # Cancelled jobs stay RUNNING and are requeued once their heartbeat lease expires
+            task.cancel()
+        self.tasks = []
+
+pool = WorkerPool()
+
+if __name__ == "__main__":
+    # Standalone worker process: python jobs.py
+    # Handlers register on the importable `jobs` module, not on this __main__ copy
+    import jobs
+    import audit
+    import routers.ai  # noqa: F401
+    from database import create_db_and_tables
+
+    async def main():
+        create_db_and_tables()
+        standalone = jobs.WorkerPool(workers=max(JOB_WORKERS, 1))
+        standalone.start()
+        audit.writer.start()  # buffered audit entries get flushed here too, like in the API process
+        try:
+            await asyncio.gather(*standalone.tasks)
+        finally:
+            await audit.writer.stop()
+
+    asyncio.run(main())
@@ -1,10 +1,21 @@
 from fastapi import FastAPI, Depends, HTTPException, Query, Response, Header
 from sqlmodel import Session, select
-from models import Speaker, Sponsor, SponsorStatus, AuthorizedUser, AuditLog
+from models import Speaker, Sponsor, SponsorStatus, AuthorizedUser, AuditLog, ActivityRollup, ACTIVE_JOB_PREDICATE
 from database import create_db_and_tables, engine, get_session
-from auth_utils import verify_token
+from auth_utils import verify_token, backfill_first_name_keys
+from search import setup_search_index
+from ai_utils import close_async_client
+from ingest import INGEST_MAX_BYTES
+from importer import import_file, IMPORT_MAX_BYTES
+from backup import RESTORE_MAX_BYTES
+from etags import conditional_get
+import changes  # registers the Session hooks that record deletes and feed /events/stream
+import pipeline_stats  # registers the Session hooks that keep /stats current
+import xp  # XP ledger rollup and the in-memory leaderboard
+import activity_rollup  # registers the Session hooks that keep /activity/heatmap current
+import audit  # audit log writes, buffered when AUDIT_DURABILITY=buffered
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
@@ -13,7 +24,10 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 # Import Routers
-from routers import auth, admin, speakers, gamification, sponsors, creatives, ai, meta
+from routers import auth, admin, speakers, gamification, sponsors, creatives, ai, meta, jobs as jobs_router, events as events_router, sync, stats as stats_router, activity as activity_router
+from jobs import pool as job_pool
+
+xp_rollup = xp.RollupLoop(engine)
 
 # Load environment variables
 load_dotenv()
@@ -22,7 +36,7 @@ load_dotenv('/etc/secrets/.env')
 def auto_migrate():
     """Adds missing columns automatically with robust transaction handling for Render/Postgres"""
     print("🔄 Running auto-migrations...")
-    from sqlalchemy import text
+    from sqlalchemy import inspect, text
     
     is_postgres = "postgresql" in str(engine.url)
     
@@ -42,7 +56,8 @@ def auto_migrate():
     
     # AuditLog Table
     audit_cols = [
-        ("speaker_id", "INTEGER")
+        ("speaker_id", "INTEGER"),
+        ("roll_number", "VARCHAR")
     ]
 
     # AuthorizedUser Table
@@ -50,9 +65,35 @@ def auto_migrate():
         ("role", "VARCHAR DEFAULT 'SPEAKER_OUTREACH'"),
         ("xp", "INTEGER DEFAULT 0"),
         ("streak", "INTEGER DEFAULT 0"),
-        ("last_login_date", "VARCHAR")
+        ("last_login_date", "VARCHAR"),
+        ("first_name_key", "VARCHAR")
+    ]
+
+    # CreativeRequest Table (backfilled from created_at below)
+    creative_request_cols = [
+        ("last_updated", "TIMESTAMP")
+    ]
+
+    # Job Table
+    job_cols = [
+        ("dedupe_key", "VARCHAR")
+    ]
+
+    # Composite indexes matching the board and log queries (name, table, columns)
+    indexes = [
+        ("ix_speaker_last_updated_id", "speaker", "last_updated, id"),
+        ("ix_speaker_status_last_updated", "speaker", "status, last_updated, id"),
+        ("ix_speaker_assigned_to_last_updated", "speaker", "assigned_to, last_updated, id"),
+        ("ix_auditlog_timestamp", "auditlog", "timestamp"),
+        ("ix_auditlog_speaker_id_timestamp", "auditlog", "speaker_id, timestamp"),
+        ("ix_job_dedupe_key", "job", "dedupe_key"),
+        ("ix_creativerequest_last_updated", "creativerequest", "last_updated"),
+        ("ix_authorizeduser_first_name_key", "authorizeduser", "first_name_key"),
     ]
 
+    # Single-column indexes now covered by a composite one above
+    redundant_indexes = ["ix_auditlog_speaker_id", "idx_auditlog_speaker_id"]
+
     with engine.connect() as conn:
         # Speaker
         for col, col_type in speaker_cols:
@@ -87,10 +128,84 @@ def auto_migrate():
                 print(f"  ✓ {col} added to authorizeduser")
             except Exception: pass
 
+        # CreativeRequest
+        for col, col_type in creative_request_cols:
+            try:
+                if is_postgres:
+                    conn.execute(text(f"ALTER TABLE creativerequest ADD COLUMN IF NOT EXISTS {col} {col_type}"))
+                else:
+                    conn.execute(text(f"ALTER TABLE creativerequest ADD COLUMN {col} {col_type}"))
+                conn.commit()
+                print(f"  ✓ {col} added to creativerequest")
+            except Exception: pass
+        try:
+            conn.execute(text("UPDATE creativerequest SET last_updated = created_at WHERE last_updated IS NULL"))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+
+        # Job
+        for col, col_type in job_cols:
+            try:
+                if is_postgres:
+                    conn.execute(text(f"ALTER TABLE job ADD COLUMN IF NOT EXISTS {col} {col_type}"))
+                else:
+                    conn.execute(text(f"ALTER TABLE job ADD COLUMN {col} {col_type}"))
+                conn.commit()
+                print(f"  ✓ {col} added to job")
+            except Exception: pass
+
+        try:
+            filled = backfill_first_name_keys(conn)
+            conn.commit()
+            if filled:
+                print(f"  ✓ first_name_key filled for {filled} users")
+        except Exception:
+            conn.rollback()
+
+        # Indexes (IF NOT EXISTS works on both SQLite and Postgres)
+        for name, table, cols in indexes:
+            try:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})"))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"  ⚠️ Could not create index {name}: {e}")
+        try:
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS uq_job_active_dedupe_key ON job (dedupe_key) WHERE {ACTIVE_JOB_PREDICATE}"
+            ))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"  ⚠️ Could not create index uq_job_active_dedupe_key: {e}")
+        for name in redundant_indexes:
+            try:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"  ⚠️ Could not drop index {name}: {e}")
+
+        # The activity rollup is derived from the audit log: recreate it keyed by
+        # roll number and let activity_rollup.ensure_filled refill it
+        try:
+            if "roll_number" not in {c["name"] for c in inspect(conn).get_columns("activityrollup")}:
+                ActivityRollup.__table__.drop(conn)
+                ActivityRollup.__table__.create(conn)
+                conn.commit()
+                print("  ✓ activityrollup recreated with roll_number")
+        except Exception as e:
+            conn.rollback()
+            print(f"  ⚠️ Could not recreate activityrollup: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
     auto_migrate()
+    setup_search_index(engine)
+    pipeline_stats.ensure_consistent(engine)
+    activity_rollup.ensure_filled(engine)
     # Import CSV if DB is empty
     with Session(engine) as session:
         statement = select(Speaker)
@@ -98,25 +213,9 @@ async def lifespan(app: FastAPI):
         if not results:
             print("Importing data from CSV...")
             try:
-                # Read CSV - Adjust path as needed
                 file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "TEDxXLRI_Master_Speaker_List.csv")
-                df = pd.read_csv(file_path)
-                
-                # Iterate and save
-                for _, row in df.iterrows():
-                    speaker = Speaker(
-                        original_id=str(row.get('S. No.', '')),
-                        batch=str(row.get('Batch', '')),
-                        name=str(row.get('Name', 'Unknown')),
-                        primary_domain=str(row.get('Primary Domain', '')),
-                        blurring_line_angle=str(row.get('Blurring Line Angle', '')),
-                        location=str(row.get('Location', '')),
-                        outreach_priority=str(row.get('Outreach Priority', 'Tier 3')),
-                        contact_method=str(row.get('Contact Method', ''))
-                    )
-                    session.add(speaker)
-                session.commit()
-                print("Import completed.")
+                report = import_file(session, file_path)
+                print(f"Import completed: {report['inserted']} speakers, {report['skipped']} rows skipped.")
             except Exception as e:
                 print(f"Error importing CSV: {e}")
         
@@ -152,7 +251,16 @@ async def lifespan(app: FastAPI):
                 session.add(s)
             session.commit()
             print("✅ Sponsors seeded.")
+    xp.leaderboard.load(engine)
+    audit.writer.start()
+    job_pool.start()
+    xp_rollup.start()
     yield
+    await xp_rollup.stop()
+    await job_pool.stop()
+    # Last, so entries logged by the jobs above are written too
+    await audit.writer.stop()
+    await close_async_client()
 
 # Initialize Limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -176,15 +284,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Request Size Limit Middleware
+MAX_BODY_BYTES = 1 * 1024 * 1024  # 1MB
+# Raw research dumps are chunked server-side (ingest.py), spreadsheets and backups are loaded in batches
+LARGE_BODY_PATHS = {
+    "/ingest-ai-data": INGEST_MAX_BYTES,
+    "/admin/ingest-ai": INGEST_MAX_BYTES,
+    "/admin/import": IMPORT_MAX_BYTES,
+    "/admin/restore/stream": RESTORE_MAX_BYTES,
+}
+
 @app.middleware("http")
 async def limit_request_size(request, call_next):
     if request.method in ["POST", "PATCH", "PUT"]:
         content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > 1 * 1024 * 1024:  # 1MB
-            raise HTTPException(status_code=413, detail="Request entity too large")
+        limit = LARGE_BODY_PATHS.get(request.url.path, MAX_BODY_BYTES)
+        if content_length and int(content_length) > limit:
+            # Middleware runs outside the exception handlers, so answer directly
+            return JSONResponse(status_code=413, content={"detail": "Request entity too large"})
     response = await call_next(request)
     return response
 
@@ -200,7 +320,7 @@ def health_check():
         "last_deploy": "2026-01-21 11:30:00"
     }
 
-@app.get("/logs")
+@app.get("/logs", dependencies=[Depends(verify_token), Depends(conditional_get(AuditLog))])
 def get_global_logs(
     limit: int = 50,
     session: Session = Depends(get_session),
@@ -219,3 +339,8 @@ app.include_router(sponsors.router)
 app.include_router(creatives.router)
 app.include_router(ai.router)
 app.include_router(meta.router)
+app.include_router(jobs_router.router)
+app.include_router(events_router.router)
+app.include_router(sync.router)
+app.include_router(stats_router.router)
+app.include_router(activity_router.router)
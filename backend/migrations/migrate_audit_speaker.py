@@ -21,7 +21,7 @@ def migrate():
             conn = psycopg2.connect(url)
             cur = conn.cursor()
             cur.execute("ALTER TABLE auditlog ADD COLUMN IF NOT EXISTS speaker_id INTEGER;")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_auditlog_speaker_id ON auditlog(speaker_id);")
+            cur.execute("CREATE INDEX IF NOT EXISTS ix_auditlog_speaker_id_timestamp ON auditlog(speaker_id, timestamp);")
             conn.commit()
             cur.close()
             conn.close()
@@ -36,7 +36,7 @@ def migrate():
             cur = conn.cursor()
             try:
                 cur.execute("ALTER TABLE auditlog ADD COLUMN speaker_id INTEGER;")
-                cur.execute("CREATE INDEX idx_auditlog_speaker_id ON auditlog(speaker_id);")
+                cur.execute("CREATE INDEX IF NOT EXISTS ix_auditlog_speaker_id_timestamp ON auditlog(speaker_id, timestamp);")
             except sqlite3.OperationalError:
                 print("⚠️ Column speaker_id might already exist, skipping...")
             conn.commit()
@@ -1,6 +1,7 @@
 from typing import Optional, List
 from sqlmodel import Field, SQLModel
-from datetime import datetime
+from sqlalchemy import Index, UniqueConstraint, event, text
+from datetime import datetime, date
 from enum import Enum
 
 class OutreachStatus(str, Enum):
@@ -25,6 +26,13 @@ class SponsorStatus(str, Enum):
 from pydantic import EmailStr, validator
 
 class Speaker(SQLModel, table=True):
+    # Board access paths: newest-first listing, optionally filtered by status or assignee
+    __table_args__ = (
+        Index("ix_speaker_last_updated_id", "last_updated", "id"),
+        Index("ix_speaker_status_last_updated", "status", "last_updated", "id"),
+        Index("ix_speaker_assigned_to_last_updated", "assigned_to", "last_updated", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     batch: Optional[str] = None
     linkedin_url: Optional[str] = None
@@ -174,18 +182,78 @@ class BulkUpdate(SQLModel):
     is_bounty: Optional[bool] = None
 
 class AuditLog(SQLModel, table=True):
+    # Global feed (/logs) and per-speaker history (/speakers/{id}/logs)
+    __table_args__ = (
+        Index("ix_auditlog_timestamp", "timestamp"),
+        Index("ix_auditlog_speaker_id_timestamp", "speaker_id", "timestamp"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_name: str
+    roll_number: Optional[str] = None  # who acted (user_name is their display name); unset on older entries
     action: str
     details: str
-    speaker_id: Optional[int] = Field(default=None, index=True)
+    speaker_id: Optional[int] = None  # indexed by ix_auditlog_speaker_id_timestamp
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
+# Persisted per-table write counters behind the list ETags (see changes.py)
+class TableVersion(SQLModel, table=True):
+    table_name: str = Field(primary_key=True)
+    version: int = 0
+
+
+# Marks a resumable restore in progress (see backup.py); gone once it completes
+class RestoreProgress(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    backup_created_at: str  # identifies the backup file being restored
+    rows_restored: int = 0
+    started_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+# Deleted rows, so delta backups can replay deletes (see changes.py)
+class Tombstone(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    table_name: str
+    row_id: int
+    deleted_at: datetime = Field(default_factory=datetime.now, index=True)
+
+
+# Pipeline counters behind /stats, kept current on every write (see stats.py)
+class PipelineStat(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("dimension", "key", name="uq_pipelinestat_dimension_key"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    dimension: str  # e.g. speaker_status, speaker_assignee, sponsor_status
+    key: str
+    count: int = Field(default=0)
+    target_amount: float = Field(default=0)
+    actual_amount: float = Field(default=0)
+
+
+# Per-user, per-day AuditLog counts behind /activity/heatmap (see activity_rollup.py)
+class ActivityRollup(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("day", "roll_number", "user_name", "action", name="uq_activityrollup_day_roll_user_action"),
+        # Covers the range reads, so /activity/heatmap and /leaderboard?days= never visit the table
+        Index("ix_activityrollup_day_totals", "day", "roll_number", "user_name", "action", "count", "xp"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: date
+    roll_number: str = Field(default="")  # "" for log entries that don't record who acted
+    user_name: str
+    action: str
+    count: int = Field(default=0)
+    xp: int = Field(default=0)  # from the "(+N XP)" suffix on MOVE entries
+
+
 class AuthorizedUser(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     roll_number: str = Field(index=True, unique=True)
     name: str
+    first_name_key: Optional[str] = Field(default=None, index=True)  # login by first name, see below
     is_admin: bool = Field(default=False)
     role: UserRole = Field(default=UserRole.SPEAKER_OUTREACH)
     added_by: Optional[str] = None
@@ -196,6 +264,26 @@ class AuthorizedUser(SQLModel, table=True):
     streak: int = Field(default=0)
     last_login_date: Optional[str] = None
 
+def first_name_key(name: Optional[str]) -> Optional[str]:
+    """Normalized first word of a name, as typed on the login screen"""
+    parts = (name or "").split()
+    return parts[0].lower() if parts else None
+
+@event.listens_for(AuthorizedUser, "before_insert")
+@event.listens_for(AuthorizedUser, "before_update")
+def _sync_first_name_key(mapper, connection, target):
+    target.first_name_key = first_name_key(target.name)
+
+# Append-only XP ledger; rolled into AuthorizedUser.xp periodically (see xp.py)
+class XpEvent(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(index=True)
+    amount: int
+    reason: str  # e.g. MOVE
+    speaker_id: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    rolled_up: bool = Field(default=False, index=True)
+
 class AuthorizedUserUpdate(SQLModel):
     name: Optional[str] = None
     is_admin: Optional[bool] = None
@@ -238,6 +326,7 @@ class CreativeRequest(SQLModel, table=True):
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.now)
     completed_at: Optional[datetime] = None
+    last_updated: datetime = Field(default_factory=datetime.now, index=True)
 
 class CreativeRequestUpdate(SQLModel):
     title: Optional[str] = None
@@ -248,3 +337,40 @@ class CreativeRequestUpdate(SQLModel):
     due_date: Optional[datetime] = None
     file_urls: Optional[str] = None
     notes: Optional[str] = None
+
+# Background Jobs (long-running AI work)
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+# At most one active job per dedupe_key, enforced by the database so two
+# concurrent clicks can't both queue one (see jobs.enqueue)
+ACTIVE_JOB_PREDICATE = "status IN ('QUEUED', 'RUNNING')"
+
+class Job(SQLModel, table=True):
+    __table_args__ = (
+        Index("uq_job_active_dedupe_key", "dedupe_key", unique=True,
+              sqlite_where=text(ACTIVE_JOB_PREDICATE), postgresql_where=text(ACTIVE_JOB_PREDICATE)),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)  # generate_email, hunt_email, ingest, bulk_hunt
+    status: JobStatus = Field(default=JobStatus.QUEUED, index=True)
+    payload: Optional[str] = None  # JSON handler arguments
+    user: Optional[str] = None  # JSON token claims of the requester
+    result: Optional[str] = None  # JSON handler return value
+    progress: Optional[str] = None  # JSON, updated while running
+    error: Optional[str] = None
+    attempts: int = Field(default=0)
+    dedupe_key: Optional[str] = Field(default=None, index=True)  # e.g. hunt_email:42, one active job per key
+    created_by: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobCreate(SQLModel):
+    kind: str
+    payload: dict = {}
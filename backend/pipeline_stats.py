@@ -0,0 +1,243 @@
+"""
+Pipeline statistics behind GET /stats, kept in the PipelineStat table.
+
+Each (dimension, key) row counts the speakers or sponsors currently in one
+bucket (a status, an assignee, a batch...); sponsor rows also carry summed
+target/actual amounts. Counters move by deltas inside the writing
+transaction, so reading them never scans the speaker table:
+
+- ORM writes (new objects, attribute changes, session.delete) are diffed
+  from the attribute history in the flush hooks below.
+- Core bulk statements call `note_bulk_insert` / `note_bulk_update` /
+  `note_bulk_delete` right before executing; updates and deletes become
+  deltas with one grouped query over the affected ids.
+- Writes nothing accounts for (imports, restores, a session-executed bulk
+  statement that wasn't noted) mark the counters stale, and they are
+  rebuilt from the tables before the transaction commits.
+
+Writes made outside the app (backup.py restores/replays, manual SQL) are
+picked up by the consistency check at startup, or run:
+
+CLI:  python pipeline_stats.py check | rebuild
+"""
+from enum import Enum
+
+from sqlalchemy import event, func, inspect, select
+
+from database import increment_statement
+from derived import DerivedTable
+from models import PipelineStat, Speaker, Sponsor
+
+NONE_KEY = "NONE"  # bucket for rows with no assignee / batch / priority
+DIMENSIONS = {
+    "speaker": {
+        "speaker_status": ("status",),
+        "speaker_assignee": ("assigned_to",),
+        "speaker_batch": ("batch",),
+        "speaker_priority": ("priority",),
+        "speaker_assignee_status": ("assigned_to", "status"),
+    },
+    "sponsor": {
+        "sponsor_status": ("status",),
+    },
+}
+MODELS = {"speaker": Speaker, "sponsor": Sponsor}
+AMOUNT_COLUMNS = ("target_amount", "actual_amount")
+STAT_COLUMNS = {
+    "speaker": {"status", "assigned_to", "batch", "priority"},
+    "sponsor": {"status", *AMOUNT_COLUMNS},
+}
+
+def _key(values) -> str:
+    return ":".join(NONE_KEY if v is None else v.value if isinstance(v, Enum) else str(v) for v in values)
+
+def _add(deltas: dict, table_name: str, row: dict, sign: int = 1):
+    """Adds (sign=1) or removes (sign=-1) one row's contribution to every bucket it falls in"""
+    target = (row.get("target_amount") or 0) if table_name == "sponsor" else 0
+    actual = (row.get("actual_amount") or 0) if table_name == "sponsor" else 0
+    for dimension, columns in DIMENSIONS[table_name].items():
+        delta = deltas.setdefault((dimension, _key(row.get(c) for c in columns)), [0, 0.0, 0.0])
+        delta[0] += sign
+        delta[1] += sign * target
+        delta[2] += sign * actual
+
+def mark_stale(session):
+    """The counters can't be adjusted for this transaction's writes: rebuild them before commit"""
+    stats.mark_stale(session)
+
+def note_bulk_insert(session, model, rows: list):
+    """Call before a Core insert of `rows` (dicts) into speaker/sponsor"""
+    table_name = model.__tablename__
+    for row in rows:
+        _add(stats.pending(session), table_name, row)
+    stats.note(session)
+
+def note_bulk_update(session, model, ids, values: dict):
+    """Call before a Core update setting `values` on rows `ids`; one grouped query when a bucket column changes"""
+    table_name = model.__tablename__
+    if ids and STAT_COLUMNS[table_name] & set(values):
+        _move(session, model, ids, values)
+    stats.note(session)
+
+def note_bulk_delete(session, model, ids):
+    """Call before a Core delete of rows `ids`"""
+    if ids:
+        _move(session, model, ids, None)
+    stats.note(session)
+
+def _move(session, model, ids, values):
+    table_name = model.__tablename__
+    columns = sorted(STAT_COLUMNS[table_name])
+    if table_name == "sponsor":
+        # Amounts are per row, so sponsors are read individually (the table is small)
+        current = session.exec(select(*[getattr(model, c) for c in columns]).where(model.id.in_(ids))).all()
+        groups = [(row, 1) for row in current]
+    else:
+        groups = session.exec(
+            select(*[getattr(model, c) for c in columns], func.count())
+            .where(model.id.in_(ids)).group_by(*[getattr(model, c) for c in columns])
+        ).all()
+        groups = [(row[:-1], row[-1]) for row in groups]
+    deltas = stats.pending(session)
+    for row, count in groups:
+        old = dict(zip(columns, row))
+        _add(deltas, table_name, old, -count)
+        if values is not None:
+            _add(deltas, table_name, {**old, **values}, count)
+
+def compute(connection) -> dict:
+    """Fresh counters from the speaker and sponsor tables"""
+    totals = {}
+    for table_name, dimensions in DIMENSIONS.items():
+        model = MODELS[table_name]
+        amounts = [func.coalesce(func.sum(getattr(model, c)), 0) for c in AMOUNT_COLUMNS] if table_name == "sponsor" else []
+        for dimension, columns in dimensions.items():
+            group = [getattr(model, c) for c in columns]
+            for row in connection.execute(select(*group, func.count(), *amounts).group_by(*group)):
+                row = tuple(row)
+                count, target, actual = (row[len(columns):] + (0, 0))[:3]
+                totals[(dimension, _key(row[:len(columns)]))] = [count, float(target), float(actual)]
+    return totals
+
+def stored(connection) -> dict:
+    return {
+        (r.dimension, r.key): [r.count, r.target_amount, r.actual_amount]
+        for r in connection.execute(select(PipelineStat.__table__)) if r.count
+    }
+
+def apply_deltas(connection, deltas: dict):
+    rows = [
+        {"dimension": dimension, "key": key, "count": count, "target_amount": target, "actual_amount": actual}
+        for (dimension, key), (count, target, actual) in deltas.items()
+        if count or target or actual
+    ]
+    if rows:
+        table = PipelineStat.__table__
+        connection.execute(
+            increment_statement(connection.dialect.name, table, ["dimension", "key"], ["count", *AMOUNT_COLUMNS]),
+            rows
+        )
+
+def ensure_consistent(engine):
+    """Startup: repair counters that drifted through writes made outside the app"""
+    with engine.begin() as conn:
+        problems = check(conn)
+        if problems:
+            buckets = rebuild(conn)
+            print(f"📊 Pipeline stats were off in {len(problems)} buckets; rebuilt {buckets}")
+
+def summary(connection) -> dict:
+    """The /stats response, straight from the counters"""
+    buckets = {}
+    for (dimension, key), (count, target, actual) in stored(connection).items():
+        buckets.setdefault(dimension, {})[key] = (count, target, actual)
+
+    def counts(dimension):
+        return {key: value[0] for key, value in sorted(buckets.get(dimension, {}).items())}
+
+    by_status = counts("speaker_status")
+    by_assignee_status = {}
+    for key, count in counts("speaker_assignee_status").items():
+        assignee, _, status = key.rpartition(":")
+        by_assignee_status.setdefault(assignee, {})[status] = count
+
+    sponsors = buckets.get("sponsor_status", {})
+    return {
+        "speakers": {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "by_assignee": counts("speaker_assignee"),
+            "by_batch": counts("speaker_batch"),
+            "by_priority": counts("speaker_priority"),
+            "by_assignee_status": by_assignee_status,
+        },
+        "sponsors": {
+            "total": sum(v[0] for v in sponsors.values()),
+            "by_status": {
+                key: {"count": c, "target_amount": t, "actual_amount": a}
+                for key, (c, t, a) in sorted(sponsors.items())
+            },
+            "pipeline_value": {
+                "target_amount": sum(v[1] for k, v in sponsors.items() if k != "REJECTED"),
+                "actual_amount": sum(v[2] for k, v in sponsors.items() if k != "REJECTED"),
+            },
+        },
+    }
+
+# --- Session hooks ---
+
+def _old_values(obj, table_name):
+    """Pre-change bucket columns of a dirty object, or None when nothing relevant changed"""
+    state = inspect(obj)
+    old, changed = {}, False
+    for column in STAT_COLUMNS[table_name]:
+        history = state.attrs[column].history
+        if history.has_changes():
+            changed = True
+            old[column] = history.deleted[0] if history.deleted else None
+        else:
+            old[column] = getattr(obj, column)
+    return old if changed else None
+
+def _row(obj, table_name):
+    return {column: getattr(obj, column) for column in STAT_COLUMNS[table_name]}
+
+def _keep_previous(target, value, oldvalue, initiator):
+    pass
+
+# Load the previous value when a bucket column is assigned, so the flush can
+# move the row out of its old bucket even if the object was expired
+for table_name, model in MODELS.items():
+    for column in STAT_COLUMNS[table_name]:
+        event.listen(getattr(model, column), "set", _keep_previous, active_history=True)
+
+def collect(session, deltas):
+    for obj in session.new:
+        table_name = getattr(obj, "__tablename__", None)
+        if table_name in DIMENSIONS:
+            _add(deltas, table_name, _row(obj, table_name))
+    for obj in session.dirty:
+        table_name = getattr(obj, "__tablename__", None)
+        if table_name in DIMENSIONS:
+            old = _old_values(obj, table_name)
+            if old is not None:
+                _add(deltas, table_name, old, -1)
+                _add(deltas, table_name, _row(obj, table_name))
+    for obj in session.deleted:
+        table_name = getattr(obj, "__tablename__", None)
+        if table_name in DIMENSIONS:
+            _add(deltas, table_name, _row(obj, table_name), -1)
+
+def _same(expected, found):
+    return expected[0] == found[0] and all(abs(a - b) <= 0.005 for a, b in zip(expected[1:], found[1:]))
+
+# Core writes are accounted for only when noted; any other one marks the counters stale
+stats = DerivedTable(
+    "stats", "pipeline stats", PipelineStat.__table__, DIMENSIONS, ("dimension", "key"), [0, 0.0, 0.0],
+    compute=compute, stored=stored, apply=apply_deltas, collect=collect, matches=_same,
+)
+rebuild = stats.rebuild
+check = stats.check
+
+if __name__ == "__main__":
+    stats.main("Check or rebuild the /stats pipeline counters")
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from typing import Optional
+from database import get_session
+from auth_utils import verify_token
+from user_cache import user_cache
+import activity_rollup
+
+router = APIRouter(prefix="/activity", tags=["activity"])
+
+@router.get("/heatmap")
+def get_activity_heatmap(
+    days: int = Query(84, ge=1, le=366),
+    user: Optional[str] = None,
+    action: Optional[str] = None,
+    session: Session = Depends(get_session),
+    token: dict = Depends(verify_token)
+):
+    """
+    Logged actions and XP per day over the last `days` days, optionally for
+    one user (their roll number) or one action. Read from the daily rollup,
+    not the audit table.
+    """
+    roll_number = user_name = None
+    if user:
+        roll_number = user.lower().strip()
+        # Entries logged before roll numbers were recorded only carry the display name
+        member = user_cache.get(session, roll_number)
+        user_name = member.display_name if member else None
+    return activity_rollup.heatmap(session.connection(), days, roll_number=roll_number, user_name=user_name, action=action)
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select, delete
 from database import get_session
-from models import AuthorizedUser, AuthorizedUserCreate, AuthorizedUserUpdate, Speaker, AuditLog
-from auth_utils import verify_admin
+from models import AuthorizedUser, AuthorizedUserCreate, AuthorizedUserUpdate, Speaker, AuditLog, Tombstone
+from auth_utils import verify_admin, backfill_first_name_keys
+from dedup import DedupIndex, MATCH_THRESHOLD
+from importer import import_file
+from backup import stream_backup, backup_filename, restore_backup as restore_backup_file, verify_backup, RESTORE_BATCH_SIZE
+from sqlalchemy.exc import SQLAlchemyError
+from changes import note_resync
+from user_cache import user_cache
+from pipeline_stats import mark_stale
+from etags import conditional_get
+import xp
+import audit
+import activity_rollup
 from datetime import datetime
 from typing import List
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-@router.get("/users", response_model=List[AuthorizedUser])
+@router.get("/users", response_model=List[AuthorizedUser], dependencies=[Depends(verify_admin), Depends(conditional_get(AuthorizedUser))])
 def get_authorized_users(
     session: Session = Depends(get_session),
     admin: dict = Depends(verify_admin)
@@ -40,17 +53,11 @@ def add_authorized_user(
     )
     
     session.add(new_user)
+    audit.record(session, admin["username"], "ADD_USER", f"Added {new_user.name} ({new_user.roll_number})",
+                 roll_number=admin["roll_number"])
     session.commit()
     session.refresh(new_user)
-    
-    # Log the action
-    log = AuditLog(
-        user_name=admin["username"],
-        action="ADD_USER",
-        details=f"Added {new_user.name} ({new_user.roll_number})"
-    )
-    session.add(log)
-    session.commit()
+    user_cache.invalidate(new_user.roll_number)
     
     return {"message": "User added successfully", "user": new_user}
 
@@ -73,16 +80,11 @@ def remove_authorized_user(
         raise HTTPException(status_code=400, detail="Cannot remove yourself")
     
     session.delete(user)
+    audit.record(session, admin["username"], "REMOVE_USER", f"Removed {user.name} ({user.roll_number})",
+                 roll_number=admin["roll_number"])
     session.commit()
-    
-    # Log the action
-    log = AuditLog(
-        user_name=admin["username"],
-        action="REMOVE_USER",
-        details=f"Removed {user.name} ({user.roll_number})"
-    )
-    session.add(log)
-    session.commit()
+    user_cache.invalidate(user.roll_number)
+    xp.leaderboard.discard(user.id)
     
     return {"message": "User removed successfully"}
 
@@ -115,16 +117,16 @@ def update_authorized_user(
             user.role = "ADMIN"
             
     session.add(user)
-    session.commit()
-    
-    # Log the action
-    log = AuditLog(
-        user_name=admin["username"],
-        action="UPDATE_USER_PERMISSIONS",
-        details=f"Modified {user.name} ({user.roll_number}) - Admin: {user.is_admin}, Role: {user.role}"
+    audit.record(
+        session,
+        admin["username"],
+        "UPDATE_USER_PERMISSIONS",
+        f"Modified {user.name} ({user.roll_number}) - Admin: {user.is_admin}, Role: {getattr(user.role, 'value', user.role)}",
+        roll_number=admin["roll_number"]
     )
-    session.add(log)
     session.commit()
+    session.refresh(user)
+    user_cache.invalidate(user.roll_number)
     
     return user
 
@@ -165,6 +167,7 @@ def purge_invalid_data(
         s.assigned_to = None
         s.assigned_by = None
         s.assigned_at = None
+        s.last_updated = datetime.now()
         session.add(s)
         fix_count += 1
     
@@ -175,6 +178,32 @@ def purge_invalid_data(
         "fixed": fix_count
     }
 
+@router.get("/duplicates")
+def find_duplicates(
+    threshold: float = Query(MATCH_THRESHOLD, ge=0.5, le=1.0),
+    limit: int = Query(200, ge=1, le=2000),
+    session: Session = Depends(get_session),
+    admin: dict = Depends(verify_admin)
+):
+    """Groups of speakers that look like the same person (fuzzy name, email or LinkedIn match)"""
+    groups = DedupIndex.from_session(session).duplicate_groups(threshold)
+    return {"total_groups": len(groups), "groups": groups[:limit]}
+
+@router.post("/import")
+async def import_speakers(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    session: Session = Depends(get_session),
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Upserts speakers from a CSV/Excel upload, matched on name (admin only).
+    Invalid rows are skipped and listed in `errors`; dry_run=true only validates.
+    """
+    data = await file.read()
+    # import_file logs the import in the same commit as the speakers
+    return await run_in_threadpool(import_file, session, data, file.filename or "", admin, dry_run)
+
 @router.get("/backup")
 def download_backup(
     session: Session = Depends(get_session),
@@ -192,6 +221,21 @@ def download_backup(
         "authorized_users": [u.model_dump() for u in users]
     }
 
+@router.get("/backup/stream")
+def stream_full_backup(
+    session: Session = Depends(get_session),
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Export every table as gzip-compressed NDJSON, paged through server-side
+    cursors; the last line is a manifest with row counts and checksums.
+    """
+    return StreamingResponse(
+        stream_backup(session.get_bind()),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{backup_filename()}"'}
+    )
+
 @router.post("/restore")
 def restore_backup(
     backup_data: dict,
@@ -204,6 +248,8 @@ def restore_backup(
         session.exec(delete(Speaker))
         session.exec(delete(AuditLog))
         session.exec(delete(AuthorizedUser))
+        # Tombstones describe deletes from the data being replaced (clients resync instead)
+        session.exec(delete(Tombstone))
         
         # Restore Speakers
         for s_data in backup_data.get("speakers", []):
@@ -226,8 +272,19 @@ def restore_backup(
             if "timestamp" in l_data and l_data["timestamp"]:
                 l_data["timestamp"] = datetime.fromisoformat(l_data["timestamp"])
             session.add(AuditLog(**l_data))
-            
+
+        # Restored rows keep their old timestamps: live boards and /sync must refetch
+        note_resync(session)
+        xp.discard_pending(session)
+        session.add(AuditLog(
+            user_name=admin["username"],
+            roll_number=admin["roll_number"],
+            action="RESTORE_BACKUP",
+            details=f"Restored {len(backup_data.get('speakers', []))} speakers from a JSON backup"
+        ))
         session.commit()
+        user_cache.invalidate()
+        xp.leaderboard.invalidate()
         return {"message": "System Restore Successful", "counts": {
             "speakers": len(backup_data.get("speakers", [])),
             "users": len(backup_data.get("authorized_users", [])),
@@ -236,3 +293,52 @@ def restore_backup(
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=400, detail=f"Restore failed: {str(e)}")
+
+@router.get("/backup/delta")
+def stream_delta_backup(
+    since: datetime,
+    session: Session = Depends(get_session),
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Export only rows changed since `since` (the `watermark` in the previous
+    backup's header) plus tombstones for deleted rows, as gzip NDJSON.
+    """
+    return StreamingResponse(
+        stream_backup(session.get_bind(), since=since),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{backup_filename(delta=True)}"'}
+    )
+
+@router.post("/restore/stream")
+async def restore_streamed_backup(
+    file: UploadFile = File(...),
+    resume: bool = False,
+    verify_only: bool = False,
+    batch_size: int = Query(RESTORE_BATCH_SIZE, ge=100, le=50000),
+    session: Session = Depends(get_session),
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Restore from a gzip NDJSON backup (GET /admin/backup/stream), loaded in
+    batches and checked against its manifest. Replaces all data atomically;
+    resume=true commits batch by batch into an empty database, and running it
+    again continues that restore if it was interrupted.
+    """
+    try:
+        if verify_only:
+            return await run_in_threadpool(verify_backup, file.file)
+        report = await run_in_threadpool(restore_backup_file, session.get_bind(), file.file, batch_size, resume,
+                                         admin["username"], file.filename or "", admin["roll_number"])
+    except (SQLAlchemyError, ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Restore failed: {str(e)}")
+
+    backfill_first_name_keys(session.connection())  # backups taken before the column existed
+    note_resync(session)
+    mark_stale(session)
+    activity_rollup.mark_stale(session)
+    xp.discard_pending(session)
+    session.commit()
+    user_cache.invalidate()
+    xp.leaderboard.invalidate()
+    return report
@@ -1,14 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, JSONResponse
 from sqlmodel import Session, select
+from sqlalchemy import or_, update
 from database import get_session
-from models import Speaker, OutreachStatus, AuditLog
+from models import Speaker, OutreachStatus
 from auth_utils import verify_token
 import os
+import asyncio
 import requests
 import json
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, Field
 from typing import Optional
-from ai_utils import call_ai, hunt_email
+from ai_utils import (
+    call_ai, call_ai_async, hunt_email, hunt_email_async, hunt_emails_batch_async, flight_stats, rate_limiter,
+    AI_MAX_CONCURRENCY, DRAFT_CACHE_TTL, HUNT_BATCH_SIZE, HUNT_MAX_BATCH_SIZE
+)
+from ai_cache import cache as ai_cache
+from jobs import enqueue, job_handler
+from ingest import run_ingest, INGEST_MAX_BYTES
+from changes import note_update
+from pipeline_stats import note_bulk_update
+import audit
 
 router = APIRouter(tags=["AI"])
 
@@ -17,18 +31,49 @@ class RefineRequest(BaseModel):
     instruction: str
 
 class IngestRequest(BaseModel):
-    raw_text: str
+    raw_text: str = Field(max_length=INGEST_MAX_BYTES)
 
 class BulkHuntRequest(BaseModel):
     ids: list[int]
+    concurrency: Optional[int] = None  # Capped at AI_MAX_CONCURRENCY
+    batch_size: Optional[int] = None  # Speakers per AI call, defaults to HUNT_BATCH_SIZE
+    background: bool = False  # Queue as a job instead of streaming
 
-@router.post("/generate-email")
-async def generate_email(
+# Job payloads, checked by enqueue for these routes and POST /jobs alike
+class EmailDraftJob(BaseModel):
+    speaker_id: int
+    regenerate: bool = False
+
+class HuntEmailJob(BaseModel):
+    speaker_id: int
+    refresh: bool = False
+
+class BulkHuntJob(BaseModel):
+    ids: list[int]
+    concurrency: Optional[int] = None
+    batch_size: Optional[int] = None
+
+def queued(job):
+    return {"job_id": job.id, "status": job.status}
+
+@router.post("/generate-email", status_code=202)
+def generate_email(
     speaker_id: int,
+    regenerate: bool = False,
     session: Session = Depends(get_session),
     user: dict = Depends(verify_token)
 ):
-    speaker = session.get(Speaker, speaker_id)
+    """
+    Queues an AI invitation draft; poll GET /jobs/{job_id} for the email.
+    Drafts are cached for a day - pass regenerate=true to force a fresh one.
+    """
+    if not session.get(Speaker, speaker_id):
+        raise HTTPException(status_code=404, detail="Speaker not found")
+    return queued(enqueue(session, "generate_email", {"speaker_id": speaker_id, "regenerate": regenerate}, user))
+
+@job_handler("generate_email", EmailDraftJob, dedupe=lambda p: f"generate_email:{p['speaker_id']}")
+def generate_email_job(session: Session, payload: dict, user: dict, progress):
+    speaker = session.get(Speaker, payload["speaker_id"])
     if not speaker:
         raise HTTPException(status_code=404, detail="Speaker not found")
 
@@ -46,7 +91,8 @@ async def generate_email(
     - body_html: The email content in HTML format (use <p>, <br>, <strong> tags).
     """
     
-    raw_response = call_ai(prompt, system_prompt="You are a prestigious head of speaker curation for TEDxXLRI. Output ONLY valid JSON.")
+    raw_response = call_ai(prompt, system_prompt="You are a prestigious head of speaker curation for TEDxXLRI. Output ONLY valid JSON.",
+                           cache_ttl=DRAFT_CACHE_TTL, refresh=payload.get("regenerate", False))
     
     try:
         # Robust JSON cleaning
@@ -71,6 +117,7 @@ async def generate_email(
     speaker.email_draft = draft_str
     if speaker.status == OutreachStatus.SCOUTED:
         speaker.status = OutreachStatus.DRAFTED
+    speaker.last_updated = datetime.now()
     session.add(speaker)
     session.commit()
     
@@ -95,7 +142,8 @@ async def refine_email(
     - body_html: The updated email content in HTML.
     """
     
-    raw_response = call_ai(prompt)
+    # Interactive lane: refinements jump ahead of queued bulk hunts
+    raw_response = await call_ai_async(prompt)
     try:
         clean_json = raw_response
         if "```json" in raw_response:
@@ -106,89 +154,24 @@ async def refine_email(
     except:
         return {"subject": "Updated Invitation", "body_html": raw_response.replace("\n", "<br>")}
 
-@router.post("/ingest-ai-data")
-@router.post("/admin/ingest-ai")
-async def ingest_ai_data(
+@router.post("/ingest-ai-data", status_code=202)
+@router.post("/admin/ingest-ai", status_code=202)
+def ingest_ai_data(
     payload: IngestRequest,
     session: Session = Depends(get_session),
     user: dict = Depends(verify_token)
 ):
+    """Queues extraction of speaker profiles from raw search data; poll GET /jobs/{job_id}"""
+    return queued(enqueue(session, "ingest", {"raw_text": payload.raw_text}, user))
+
+@job_handler("ingest", IngestRequest)
+async def ingest_job(session: Session, payload: dict, user: dict, progress):
     """
-    Parses raw search data and extracts speaker profiles with deduplication.
-    """
-    prompt = f"""
-    Extract a list of potential speakers from the following text. 
-    Format the output as a JSON array of objects with these fields:
-    - name: Full name (be precise)
-    - primary_domain: Their main field or occupation
-    - location: City or country
-    - linkedin_url: URL if found
-    - email: Email if found
-    - phone: Phone if found
-    - search_details: A short 2-3 sentence summary of why they are relevant to TEDxXLRI's theme 'The Blurring Line'.
-
-    Raw Text:
-    {payload.raw_text}
-
-    Return ONLY the raw JSON array. If no speakers are found, return [].
+    Extracts speaker profiles from raw search data in overlapping chunks,
+    deduplicating across chunks and against the board (see ingest.py).
     """
-    
-    raw_json = call_ai(prompt, system_prompt="You are a data extraction assistant for TEDxXLRI. Output ONLY a valid JSON array of objects. No intro text, no conversational filler.")
-    
-    try:
-        # Robust JSON cleaning
-        clean_json = raw_json.strip()
-        if "```json" in clean_json:
-            clean_json = clean_json.split("```json")[1].split("```")[0].strip()
-        elif "```" in clean_json:
-            clean_json = clean_json.split("```")[1].split("```")[0].strip()
-        
-        # Remove any leading/trailing non-bracket characters if AI added text
-        start_idx = clean_json.find('[')
-        end_idx = clean_json.rfind(']')
-        if start_idx != -1 and end_idx != -1:
-            clean_json = clean_json[start_idx : end_idx + 1]
-            
-        speakers_data = json.loads(clean_json)
-        
-        new_speakers_count = 0
-        skipped_duplicates = []
-        
-        for s_data in speakers_data:
-            name = s_data.get("name", "").strip()
-            if not name or name.lower() == "unknown":
-                continue
-                
-            # Deduplication: Check if name already exists
-            existing = session.exec(select(Speaker).where(Speaker.name == name)).first()
-            if existing:
-                skipped_duplicates.append(name)
-                continue
-                
-            speaker = Speaker(
-                name=name,
-                primary_domain=s_data.get("primary_domain"),
-                location=s_data.get("location"),
-                linkedin_url=s_data.get("linkedin_url"),
-                email=s_data.get("email"),
-                phone=s_data.get("phone"),
-                search_details=s_data.get("search_details"),
-                status=OutreachStatus.SCOUTED,
-                assigned_by=user["roll_number"]
-            )
-            session.add(speaker)
-            new_speakers_count += 1
-            
-        session.commit()
-        return {
-            "message": f"Successfully ingested {new_speakers_count} new speakers.",
-            "count": new_speakers_count,
-            "skipped_duplicates": skipped_duplicates,
-            "skipped_count": len(skipped_duplicates)
-        }
-    except Exception as e:
-        print(f"Ingestion error: {e}")
-        return {"error": "Failed to parse AI output into valid speaker data.", "raw": raw_json}
+    payload = IngestRequest(**payload)
+    return await run_ingest(session, payload.raw_text, user, progress)
 
 @router.get("/speakers/{speaker_id}/ai-prompt")
 def get_ai_prompt(
@@ -202,58 +185,173 @@ def get_ai_prompt(
     prompt = f"Draft a professional invitation email for {speaker.name} who is a {speaker.primary_domain}. Mention TEDxXLRI..."
     return {"prompt": prompt}
 
-@router.post("/hunt-email")
-async def hunt_email_for_speaker(
+@router.post("/hunt-email", status_code=202)
+def hunt_email_for_speaker(
     speaker_id: int,
+    refresh: bool = False,
     session: Session = Depends(get_session),
     user: dict = Depends(verify_token)
 ):
-    speaker = session.get(Speaker, speaker_id)
+    """Queues an AI email hunt for one speaker; poll GET /jobs/{job_id}. refresh=true skips the cache"""
+    if not session.get(Speaker, speaker_id):
+        raise HTTPException(status_code=404, detail="Speaker not found")
+    return queued(enqueue(session, "hunt_email", {"speaker_id": speaker_id, "refresh": refresh}, user))
+
+@job_handler("hunt_email", HuntEmailJob, dedupe=lambda p: f"hunt_email:{p['speaker_id']}")
+def hunt_email_job(session: Session, payload: dict, user: dict, progress):
+    speaker = session.get(Speaker, payload["speaker_id"])
     if not speaker:
         raise HTTPException(status_code=404, detail="Speaker not found")
 
-    email = hunt_email(speaker.name, speaker.primary_domain or "", speaker.location or "")
+    email = hunt_email(speaker.name, speaker.primary_domain or "", speaker.location or "",
+                       refresh=payload.get("refresh", False))
     
     if email and "@" in email:
         speaker.hunted_email = email.strip()
+        speaker.last_updated = datetime.now()
         session.add(speaker)
         session.commit()
         return {"hunted_email": email}
     
     return {"email": None, "message": email}
 
+async def hunt_speakers(engine, rows, concurrency: int, batch_size: int = 1):
+    """
+    Hunts emails for (id, name, domain, location) rows with at most `concurrency`
+    upstream calls in flight, saving hits as they land. With batch_size > 1 rows
+    are packed into multi-speaker prompts; rows a batch reply doesn't answer
+    cleanly are retried one by one.
+    Yields one result dict per speaker in completion order.
+    """
+    def save_hunted_emails(found: list):
+        with Session(engine) as write_session:
+            for speaker_id, email in found:
+                values = {"hunted_email": email, "last_updated": datetime.now()}
+                note_bulk_update(write_session, Speaker, [speaker_id], values)
+                write_session.exec(update(Speaker).where(Speaker.id == speaker_id).values(**values))
+                note_update(write_session, Speaker, [speaker_id], values)
+            write_session.commit()
+
+    async def outcomes(answers):
+        """answers: (id, name, email or None) -> result dicts, saving the hits"""
+        hits = [(sid, email.strip()) for sid, _, email in answers if email and "@" in email]
+        if hits:
+            await asyncio.to_thread(save_hunted_emails, hits)
+        hit_ids = {sid for sid, _ in hits}
+        return [
+            {"id": sid, "name": name, "hunted_email": email.strip(), "status": "success"} if sid in hit_ids
+            else {"id": sid, "name": name, "hunted_email": None, "status": "not_found"}
+            for sid, name, email in answers
+        ]
+
+    def failure(sid, name, error):
+        print(f"Individual hunt failure for {name}: {error}")
+        return {"id": sid, "name": name, "hunted_email": None, "status": "error", "error": error}
+
+    async def hunt_one(semaphore, sid, name, domain, location):
+        async with semaphore:
+            try:
+                email = await hunt_email_async(name, domain or "", location or "")
+            except HTTPException as e:
+                return [failure(sid, name, e.detail)]
+            except Exception as e:
+                return [failure(sid, name, str(e))]
+        return await outcomes([(sid, name, email)])
+
+    async def hunt_batch(semaphore, batch):
+        async with semaphore:
+            try:
+                found = await hunt_emails_batch_async(batch)
+            except HTTPException as e:
+                return [failure(sid, name, e.detail) for sid, name, _, _ in batch]
+            except Exception as e:
+                return [failure(sid, name, str(e)) for sid, name, _, _ in batch]
+
+        results = await outcomes([(sid, name, found[sid]) for sid, name, _, _ in batch if sid in found])
+        leftovers = [row for row in batch if row[0] not in found]
+        if leftovers:
+            print(f"Batch hunt: {len(leftovers)}/{len(batch)} rows unparsed, hunting individually")
+            for retried in await asyncio.gather(*[hunt_one(semaphore, *row) for row in leftovers]):
+                results.extend(retried)
+        return results
+
+    semaphore = asyncio.Semaphore(concurrency)
+    if batch_size > 1:
+        batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        tasks = [asyncio.create_task(hunt_batch(semaphore, batch)) for batch in batches]
+    else:
+        tasks = [asyncio.create_task(hunt_one(semaphore, *row)) for row in rows]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for result in await next_done:
+                yield result
+    finally:
+        # Consumer went away mid-run: stop the remaining upstream calls
+        for task in tasks:
+            task.cancel()
+
+def load_hunt_candidates(session: Session, ids: list[int]):
+    """Speakers from `ids` that still lack an email"""
+    return session.exec(
+        select(Speaker.id, Speaker.name, Speaker.primary_domain, Speaker.location)
+        .where(Speaker.id.in_(ids), or_(Speaker.email == None, Speaker.email == ""))
+    ).all()
+
+def hunt_concurrency(requested: Optional[int]) -> int:
+    return max(1, min(requested or AI_MAX_CONCURRENCY, AI_MAX_CONCURRENCY))
+
+def hunt_batch_size(requested: Optional[int]) -> int:
+    return max(1, min(requested or HUNT_BATCH_SIZE, HUNT_MAX_BATCH_SIZE))
+
 @router.post("/bulk-hunt-emails")
 async def bulk_hunt_emails(
     request: BulkHuntRequest,
     session: Session = Depends(get_session),
     user: dict = Depends(verify_token)
 ):
+    """
+    Hunts emails for many speakers concurrently (bounded by `concurrency`),
+    `batch_size` speakers per AI call (1 = one call per speaker).
+    Streams one NDJSON line per speaker as soon as its hunt finishes, then a
+    final {"done": true, ...} summary line. With `background: true` the run is
+    queued as a job instead and its progress is polled from GET /jobs/{job_id}.
+    """
+    if request.background:
+        job = await run_in_threadpool(enqueue, session, "bulk_hunt", {
+            "ids": request.ids, "concurrency": request.concurrency, "batch_size": request.batch_size
+        }, user)
+        return JSONResponse(status_code=202, content=queued(job))
+
+    rows = await run_in_threadpool(load_hunt_candidates, session, request.ids)
+    engine = session.get_bind()
+    concurrency = hunt_concurrency(request.concurrency)
+    batch_size = hunt_batch_size(request.batch_size)
+
+    async def stream_results():
+        found_count = 0
+        async for result in hunt_speakers(engine, rows, concurrency, batch_size):
+            if result["status"] == "success":
+                found_count += 1
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"done": True, "found": found_count, "total": len(rows)}) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@job_handler("bulk_hunt", BulkHuntJob)
+async def bulk_hunt_job(session: Session, payload: dict, user: dict, progress):
+    rows = await asyncio.to_thread(load_hunt_candidates, session, payload["ids"])
     results = []
     found_count = 0
-    
-    for sid in request.ids:
-        speaker = session.get(Speaker, sid)
-        if not speaker or speaker.email:
-            continue
-            
-        try:
-            email = hunt_email(speaker.name, speaker.primary_domain or "", speaker.location or "")
-            if email and "@" in email:
-                speaker.hunted_email = email.strip()
-                session.add(speaker)
-                found_count += 1
-                results.append({"id": sid, "name": speaker.name, "hunted_email": email, "status": "success"})
-            else:
-                results.append({"id": sid, "name": speaker.name, "hunted_email": None, "status": "not_found"})
-        except Exception as e:
-            print(f"Individual hunt failure for {speaker.name}: {e}")
-            results.append({"id": sid, "name": speaker.name, "email": None, "status": "error", "error": str(e)})
-            
-    session.commit()
+    async for result in hunt_speakers(session.get_bind(), rows, hunt_concurrency(payload.get("concurrency")),
+                                      hunt_batch_size(payload.get("batch_size"))):
+        results.append(result)
+        if result["status"] == "success":
+            found_count += 1
+        await asyncio.to_thread(progress, {"processed": len(results), "total": len(rows), "found": found_count})
     return {"found": found_count, "results": results}
 
 @router.post("/approve-hunted-email")
-async def approve_hunted_email(
+def approve_hunted_email(
     speaker_id: int,
     approve: bool,
     session: Session = Depends(get_session),
@@ -270,17 +368,24 @@ async def approve_hunted_email(
         speaker.hunted_email = None
     else:
         speaker.hunted_email = None
+    speaker.last_updated = datetime.now()
     
     details = f"{'Approved' if approve else 'Discarded'} AI hunted email for {speaker.name}"
-    log = AuditLog(
-        user_name=user.get("username") or user.get("roll_number") or "Unknown",
-        action="APPROVE_EMAIL" if approve else "DISCARD_EMAIL",
-        details=details,
-        speaker_id=speaker_id
+    audit.record(
+        session,
+        user.get("username") or user.get("roll_number") or "Unknown",
+        "APPROVE_EMAIL" if approve else "DISCARD_EMAIL",
+        details,
+        speaker_id=speaker_id,
+        roll_number=user.get("roll_number")
     )
-    session.add(log)
     
     session.add(speaker)
     session.commit()
     session.refresh(speaker)
     return speaker
+
+@router.get("/ai/metrics")
+async def ai_metrics(user: dict = Depends(verify_token)):
+    """Cache, request coalescing and rate limiter metrics for the Perplexity integration"""
+    return {"cache": ai_cache.stats(), "inflight": flight_stats(), "rate_limiter": rate_limiter.stats()}
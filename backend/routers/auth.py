@@ -1,3 +1,4 @@
+import os
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from sqlmodel import Session, select
 from database import get_session
@@ -8,21 +9,45 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+
+# Proxies in front of the app that append to X-Forwarded-For (1 on Render). The
+# client controls everything left of their entries, so the client address is
+# the one the outermost trusted proxy appended; with 0 the header is ignored.
+# Render sets RENDER on its services, so the default there is 1.
+TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES") or ("1" if os.getenv("RENDER") else "0"))
+_warned_forwarded = False
+
+def client_ip(request: Request) -> str:
+    global _warned_forwarded
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if TRUSTED_PROXIES and len(hops) >= TRUSTED_PROXIES:
+        return hops[-TRUSTED_PROXIES]
+    if hops and not TRUSTED_PROXIES and not _warned_forwarded:
+        # Behind a proxy every client shares its address, and so one login bucket
+        _warned_forwarded = True
+        print("⚠️ X-Forwarded-For received but TRUSTED_PROXIES is 0: rate limits key on the proxy's address. Set TRUSTED_PROXIES to the number of proxies in front of the app.")
+    return get_remote_address(request)
+
+limiter = Limiter(key_func=client_ip)
+
+LOGIN_RATE_LIMIT = os.getenv("LOGIN_RATE_LIMIT", "20/minute")  # per client IP
 
 @router.post("/login")
-def login(request: LoginRequest, response: Response, session: Session = Depends(get_session)):
+@limiter.limit(LOGIN_RATE_LIMIT)
+def login(request: Request, credentials: LoginRequest, response: Response, session: Session = Depends(get_session)):
+    typed = credentials.roll_number.lower().strip()
+
     # Try Roll Number match (Original)
-    user = session.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == request.roll_number.lower().strip())).first()
+    user = session.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == typed)).first()
     
-    # If no roll match, try First Name match (Case insensitive)
-    if not user:
-        all_users = session.exec(select(AuthorizedUser)).all()
-        target_name = request.roll_number.lower().strip()
-        for u in all_users:
-            if u.name and u.name.split()[0].lower() == target_name:
-                user = u
-                break
+    # If no roll match, try First Name match (Case insensitive, indexed; earliest user wins)
+    if not user and typed:
+        user = session.exec(
+            select(AuthorizedUser)
+            .where(AuthorizedUser.first_name_key == typed)
+            .order_by(AuthorizedUser.id)
+            .limit(1)
+        ).first()
     
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credential. Roll/Name not recognized.")
@@ -4,6 +4,7 @@ from database import get_session
 from models import (CreativeAsset, CreativeUpdate, CreativeStatus, 
                     CreativeRequest, CreativeRequestUpdate, CreativeRequestStatus, AuditLog)
 from auth_utils import verify_token, get_current_user_name
+from etags import conditional_get
 from typing import List, Optional
 from datetime import datetime
 
@@ -11,7 +12,7 @@ router = APIRouter(tags=["creatives"])
 
 # --- Creative Assets (Internal Team) ---
 
-@router.get("/creatives", response_model=List[CreativeAsset])
+@router.get("/creatives", response_model=List[CreativeAsset], dependencies=[Depends(conditional_get(CreativeAsset))])
 def read_creatives(
     session: Session = Depends(get_session),
     status: Optional[str] = None
@@ -53,7 +54,7 @@ def update_creative(
 
 # --- Creative Requests (Public/PR -> Creatives) ---
 
-@router.get("/creative-requests", response_model=List[CreativeRequest])
+@router.get("/creative-requests", response_model=List[CreativeRequest], dependencies=[Depends(verify_token), Depends(conditional_get(CreativeRequest))])
 def get_creative_requests(
     session: Session = Depends(get_session),
     user: dict = Depends(verify_token)
@@ -90,6 +91,7 @@ def update_creative_request(
     if update.status == CreativeRequestStatus.COMPLETED and not db_req.completed_at:
         db_req.completed_at = datetime.now()
         
+    db_req.last_updated = datetime.now()
     session.add(db_req)
     session.commit()
     session.refresh(db_req)
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from auth_utils import verify_token
+from events import hub
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+HEARTBEAT_SECONDS = 20
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    user: dict = Depends(verify_token)
+):
+    """
+    Server-sent events with the board's committed changes, one event per
+    commit: {"changes": [{"op": "insert" | "update" | "delete" | "resync", ...}]}.
+    Reconnect with Last-Event-ID to receive what was missed.
+    """
+    subscriber = hub.subscribe(last_event_id)
+
+    async def events():
+        try:
+            yield f"retry: 3000\nid: {subscriber.event_id(subscriber.last_seq)}\ndata: {{\"changes\": []}}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    seq, data = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"id: {subscriber.event_id(seq)}\ndata: {data}\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+@router.get("/metrics")
+def event_metrics(user: dict = Depends(verify_token)):
+    return hub.metrics()
@@ -1,42 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
+from sqlalchemy import case, update
 from database import get_session
 from models import AuthorizedUser
 from gamification_models import GamificationUpdate
-from auth_utils import verify_token
+from auth_utils import get_current_user
+from user_cache import CachedUser
+from datetime import datetime, timedelta
+from typing import Optional
+import xp
+import activity_rollup
 
 router = APIRouter()
 
+# Date.prototype.toDateString(), e.g. "Sat Oct 18 2026"
+LOGIN_DATE_FORMAT = "%a %b %d %Y"
+
 @router.get("/users/me", response_model=AuthorizedUser)
 def get_current_user_details(
     session: Session = Depends(get_session),
-    user_token: dict = Depends(verify_token)
+    current: CachedUser = Depends(get_current_user)
 ):
     """Get current user details including Gamification stats"""
-    user = session.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == user_token["roll_number"])).first()
+    user = session.get(AuthorizedUser, current.id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    # Awards not yet rolled up still count
+    return {**user.model_dump(), "xp": (user.xp or 0) + xp.pending_xp(session, user.id)}
 
 @router.patch("/users/me/gamification")
 def update_gamification(
-    update: GamificationUpdate,
+    update_data: GamificationUpdate,
     session: Session = Depends(get_session),
-    user_token: dict = Depends(verify_token)
+    current: CachedUser = Depends(get_current_user)
 ):
-    """Sync/Update XP and Streak from frontend"""
-    user = session.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == user_token["roll_number"])).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    if update.xp is not None:
-        user.xp = update.xp
-    if update.streak is not None:
-        user.streak = update.streak
-    if update.last_login_date is not None:
-        user.last_login_date = update.last_login_date
-    
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    return user
+    """Record today's login and advance the streak (in SQL, so parallel tabs can't double count)"""
+    if update_data.last_login_date is not None:
+        try:
+            today = datetime.strptime(update_data.last_login_date, LOGIN_DATE_FORMAT)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="last_login_date must look like 'Sat Oct 18 2026'")
+        # The client's local date, within a day of ours either way (timezones)
+        if abs((today.date() - datetime.now().date()).days) > 1:
+            raise HTTPException(status_code=400, detail="last_login_date must be today")
+        today_str = today.strftime(LOGIN_DATE_FORMAT)
+        yesterday_str = (today - timedelta(days=1)).strftime(LOGIN_DATE_FORMAT)
+        session.exec(
+            update(AuthorizedUser)
+            .where(AuthorizedUser.id == current.id)
+            .values(
+                streak=case(
+                    (AuthorizedUser.last_login_date == today_str, AuthorizedUser.streak),
+                    (AuthorizedUser.last_login_date == yesterday_str, AuthorizedUser.streak + 1),
+                    else_=1
+                ),
+                last_login_date=today_str
+            )
+        )
+        session.commit()
+    return get_current_user_details(session, current)
+
+@router.get("/leaderboard")
+def get_leaderboard(
+    k: int = Query(10, ge=1, le=100),
+    days: Optional[int] = Query(None, ge=1, le=366),
+    session: Session = Depends(get_session),
+    current: CachedUser = Depends(get_current_user)
+):
+    """
+    Top k users by XP. All-time ranks come from the in-memory ranking (see
+    xp.py); with `days`, XP and action counts over that window come from the
+    daily activity rollup (see activity_rollup.py).
+    """
+    if days:
+        ranked = activity_rollup.leaders(session.connection(), days)
+        # Display names aren't unique: find the caller by roll number
+        mine = next(((rank, score) for rank, (roll, _, score, _) in enumerate(ranked, start=1) if roll == current.roll_number), None)
+        return {
+            "days": days,
+            "leaders": [
+                {"rank": rank, "roll_number": roll or None, "name": name, "xp": score, "actions": actions}
+                for rank, (roll, name, score, actions) in enumerate(ranked[:k], start=1)
+            ],
+            "me": {"rank": mine[0] if mine else None, "xp": mine[1] if mine else 0}
+        }
+
+    xp.leaderboard.ensure_loaded(session.get_bind())
+    top = xp.leaderboard.top(k)
+    my_rank, my_xp = xp.leaderboard.standing(current.id)
+    users = {
+        u.id: u for u in session.exec(
+            select(AuthorizedUser.id, AuthorizedUser.roll_number, AuthorizedUser.name)
+            .where(AuthorizedUser.id.in_([user_id for user_id, _ in top]))
+        ).all()
+    }
+    return {
+        "leaders": [
+            {"rank": rank, "roll_number": users[user_id].roll_number, "name": users[user_id].name, "xp": score}
+            for rank, (user_id, score) in enumerate(top, start=1) if user_id in users
+        ],
+        "me": {"rank": my_rank, "xp": my_xp}
+    }
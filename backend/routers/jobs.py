@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from models import Job, JobCreate
+from auth_utils import verify_token
+from jobs import enqueue, job_to_dict
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.post("", status_code=202)
+def create_job(
+    job_data: JobCreate,
+    session: Session = Depends(get_session),
+    user: dict = Depends(verify_token)
+):
+    """Queue a background job of a registered kind; its payload is checked and deduplicated as on the kind's own route"""
+    job = enqueue(session, job_data.kind, job_data.payload, user)
+    return job_to_dict(job)
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: int,
+    session: Session = Depends(get_session),
+    user: dict = Depends(verify_token)
+):
+    """
+    Poll a job's status, progress and result. Visible to whoever queued it and
+    to admins; deduplicated per-speaker jobs are handed to everyone who asks for
+    the same speaker, so those are visible to any member.
+    """
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    shared = job.dedupe_key is not None
+    if job.created_by != user.get("roll_number") and not user.get("is_admin") and not shared:
+        raise HTTPException(status_code=403, detail="You can only view your own jobs")
+    return job_to_dict(job)
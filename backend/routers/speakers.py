@@ -1,15 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, func
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlmodel import Session, select
+from sqlalchemy import tuple_, and_, or_, update, delete
 from database import get_session
 from models import Speaker, SpeakerUpdate, OutreachStatus, AuditLog, AuthorizedUser, BulkUpdate
-from auth_utils import verify_token, get_current_user_name, verify_admin
+from auth_utils import verify_token, get_current_user_name, verify_admin, get_current_user
+from user_cache import user_cache, CachedUser
+from search import apply_search
+from changes import record_tombstones, note_update
+from pipeline_stats import note_bulk_update, note_bulk_delete
+from etags import conditional_get
+import xp
+import audit
 from typing import List, Optional
 from datetime import datetime
+import base64
+import json
 
 router = APIRouter(prefix="/speakers", tags=["speakers"])
 
-@router.get("", response_model=List[Speaker])
+# Heavy text columns left out of the "card" projection used by the board
+HEAVY_FIELDS = {"email_draft", "search_details"}
+SPEAKER_FIELDS = list(Speaker.model_fields.keys())
+CARD_FIELDS = [f for f in SPEAKER_FIELDS if f not in HEAVY_FIELDS]
+
+def encode_cursor(last_updated: datetime, speaker_id: int) -> str:
+    """Opaque keyset token for the (last_updated, id) position of the last row served"""
+    raw = json.dumps({"t": last_updated.isoformat(), "i": speaker_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["t"]), int(data["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def resolve_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Maps the `fields` query param to a column list (None means full rows)"""
+    if not fields:
+        return None
+    if fields == "card":
+        return CARD_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in SPEAKER_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # id and last_updated are always needed to build the next cursor
+    for required in ("last_updated", "id"):
+        if required not in requested:
+            requested.insert(0, required)
+    return requested
+
+@router.get("", dependencies=[Depends(verify_token), Depends(conditional_get(Speaker))])
 def read_speakers(
+    response: Response,
     session: Session = Depends(get_session),
     status: Optional[str] = None,
     limit: int = 300,
@@ -19,9 +64,22 @@ def read_speakers(
     assigned_to: Optional[str] = None,
     unassigned: bool = False,
     assigned_to_me: bool = False,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    # Keyset pagination & projection
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
 ):
-    query = select(Speaker)
+    """
+    List speakers for the board, newest activity first.
+    Pass the `X-Next-Cursor` response header back as `cursor` to page with a
+    keyset seek instead of `offset`; `fields=card` drops the heavy text columns.
+    `search` results come back ranked by relevance instead.
+    """
+    columns = resolve_fields(fields)
+    if columns:
+        query = select(*[getattr(Speaker, c) for c in columns])
+    else:
+        query = select(Speaker)
     
     if status:
         query = query.where(Speaker.status == status)
@@ -35,42 +93,53 @@ def read_speakers(
     if assigned_to_me:
         query = query.where(Speaker.assigned_to == user["roll_number"])
 
+    ranked = False
     if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            (Speaker.name.ilike(search_term)) |
-            (Speaker.primary_domain.ilike(search_term)) |
-            (Speaker.location.ilike(search_term))
-        )
-    
-    # Order by last update
-    query = query.order_by(Speaker.last_updated.desc())
-    
-    query = query.offset(offset).limit(limit)
-    speakers = session.exec(query).all()
+        query, ranked = apply_search(query, search, session.get_bind())
+
+    if ranked:
+        # Relevance order: page with offset, the keyset cursor only applies to the board order
+        query = query.offset(offset)
+    else:
+        if cursor:
+            cursor_time, cursor_id = decode_cursor(cursor)
+            query = query.where(tuple_(Speaker.last_updated, Speaker.id) < tuple_(cursor_time, cursor_id))
+
+        # Order by last update (id breaks ties so the keyset order is total)
+        query = query.order_by(Speaker.last_updated.desc(), Speaker.id.desc())
+
+        if not cursor:
+            query = query.offset(offset)
+    query = query.limit(limit)
+    rows = session.exec(query).all()
+
+    if columns:
+        speakers = [dict(zip(columns, row)) for row in rows]
+        last = speakers[-1] if speakers else None
+        last_key = (last["last_updated"], last["id"]) if last else None
+    else:
+        speakers = rows
+        last_key = (rows[-1].last_updated, rows[-1].id) if rows else None
+
+    if last_key and len(rows) == limit and not ranked:
+        response.headers["X-Next-Cursor"] = encode_cursor(*last_key)
     return speakers
 
 @router.post("", response_model=Speaker)
 def create_speaker(
     speaker: Speaker, 
     session: Session = Depends(get_session), 
-    user_name: str = Depends(get_current_user_name)
+    user: dict = Depends(verify_token)
 ):
     session.add(speaker)
-    session.commit()
-    session.refresh(speaker)
     
-    # Audit Log
-    if user_name:
-        log = AuditLog(
-            user_name=user_name,
-            action="ADD",
-            details=f"Added speaker {speaker.name} to {speaker.status.value}",
-            speaker_id=speaker.id
-        )
-        session.add(log)
-        session.commit()
+    # Audit Log (same commit; the flush assigns the speaker's id)
+    session.flush()
+    audit.record(session, user["username"], "ADD", f"Added speaker {speaker.name} to {speaker.status.value}",
+                 speaker_id=speaker.id, roll_number=user["roll_number"])
 
+    session.commit()
+    session.refresh(speaker)
     return speaker
 
 @router.get("/{speaker_id}", response_model=Speaker)
@@ -94,68 +163,95 @@ def get_speaker_logs(
     ).all()
     return logs
 
+def has_contact_info():
+    """SQL predicate mirroring the Python `email or phone` truthiness check"""
+    return or_(
+        and_(Speaker.email != None, Speaker.email != ""),
+        and_(Speaker.phone != None, Speaker.phone != "")
+    )
+
 @router.patch("/bulk")
 def bulk_update_speakers(
     update_data: BulkUpdate,
     session: Session = Depends(get_session),
-    user_name: str = Depends(get_current_user_name)
+    user: dict = Depends(verify_token)
 ):
-    """Update multiple speakers at once"""
+    """Update multiple speakers at once (one SELECT, one UPDATE and one audit insert)"""
+    user_name, roll_number = user["username"], user["roll_number"]
+    ids = list(set(update_data.ids))
+    # An explicit null status or bounty flag means "leave it as is" (a null assignee unassigns)
+    update_dict = {
+        key: value for key, value in update_data.model_dump(exclude_unset=True).items()
+        if value is not None or key == 'assigned_to'
+    }
+    now = datetime.now()
+
+    values = {}
+    changes = []
+    needs_contact = False
+
+    if 'status' in update_dict:
+        new_status = update_dict['status']
+        # Verification: If moving to EMAIL_ADDED or beyond, must have an email OR phone
+        needs_contact = new_status != OutreachStatus.SCOUTED
+        values["status"] = new_status
+        changes.append(f"moved to {new_status.value}")
+
+    if 'assigned_to' in update_dict:
+        target = update_dict['assigned_to']
+        if target == "null" or target is None:
+            values.update(assigned_to=None, assigned_by=None, assigned_at=None)
+            changes.append("unassigned")
+        elif str(target).lower() == 'nan':
+            # Skip NaN assignments strictly
+            pass
+        else:
+            values.update(assigned_to=target, assigned_by=user_name, assigned_at=now)
+            changes.append(f"assigned to {target}")
+
+    if 'is_bounty' in update_dict:
+        values["is_bounty"] = update_dict['is_bounty']
+        changes.append("marked as bounty" if update_dict['is_bounty'] else "unmarked as bounty")
+
+    modified = any(key in update_dict for key in ('status', 'assigned_to', 'is_bounty'))
+    if not ids or not modified:
+        return {"message": "Successfully updated 0 speakers. Skipped 0 lacking email.", "count": 0, "skipped": 0}
+
+    # One round-trip for the candidates (names are needed for the audit trail)
+    candidates = session.exec(
+        select(Speaker.id, Speaker.name, has_contact_info()).where(Speaker.id.in_(ids))
+    ).all()
+    eligible = [(sid, name) for sid, name, contact in candidates if contact or not needs_contact]
+    skipped = len(candidates) - len(eligible)
+
     count = 0
-    skipped = 0
-    for speaker_id in update_data.ids:
-        db_speaker = session.get(Speaker, speaker_id)
-        if not db_speaker:
-            continue
-            
-        update_dict = update_data.model_dump(exclude_unset=True)
-        modified = False
-        
-        if 'status' in update_dict:
-            new_status = update_dict['status']
-            # Verification: If moving to EMAIL_ADDED or beyond, must have an email OR phone
-            if new_status != OutreachStatus.SCOUTED and not (db_speaker.email or db_speaker.phone):
-                skipped += 1
-                continue
-            db_speaker.status = new_status
-            modified = True
-            
-        if 'assigned_to' in update_dict:
-            target = update_dict['assigned_to']
-            if target == "null" or target is None:
-                db_speaker.assigned_to = None
-                db_speaker.assigned_by = None
-                db_speaker.assigned_at = None
-            elif str(target).lower() == 'nan':
-                # Skip NaN assignments strictly
-                pass
-            else:
-                db_speaker.assigned_to = target
-                db_speaker.assigned_by = user_name
-                db_speaker.assigned_at = func.now()
-            modified = True
-            
-        if 'is_bounty' in update_dict:
-            db_speaker.is_bounty = update_dict['is_bounty']
-            modified = True
-            
-        if modified:
-            db_speaker.last_updated = func.now()
-            session.add(db_speaker)
-            count += 1
-            
-    session.commit()
-    
-    # Log the bulk action
-    if count > 0:
-        log = AuditLog(
-            user_name=user_name,
-            action="BULK_UPDATE",
-            details=f"Updated {count} speakers (Skipped {skipped} due to missing email)"
+    if eligible:
+        note_bulk_update(session, Speaker, [sid for sid, _ in eligible], values)
+        statement = update(Speaker).where(Speaker.id.in_(ids))
+        if needs_contact:
+            statement = statement.where(has_contact_info())
+        result = session.exec(
+            statement.values(**values, last_updated=now).execution_options(synchronize_session=False)
         )
-        session.add(log)
-        session.commit()
-        
+        count = result.rowcount
+        note_update(session, Speaker, [sid for sid, _ in eligible], {**values, "last_updated": now})
+
+    # Log the bulk action: one row per speaker plus a summary, in a single multi-row insert
+    if count > 0:
+        summary = ", ".join(changes) or "touched"
+        entries = [
+            {"user_name": user_name, "roll_number": roll_number, "action": "BULK_UPDATE",
+             "details": f"Bulk {summary}: {name}", "speaker_id": sid, "timestamp": now}
+            for sid, name in eligible
+        ]
+        entries.append({
+            "user_name": user_name, "roll_number": roll_number, "action": "BULK_UPDATE", "speaker_id": None, "timestamp": now,
+            "details": f"Updated {count} speakers (Skipped {skipped} due to missing email)"
+        })
+        audit.record_many(session, entries)
+
+    session.commit()
+
     return {
         "message": f"Successfully updated {count} speakers. Skipped {skipped} lacking email.", 
         "count": count,
@@ -170,23 +266,33 @@ def bulk_delete_speakers(
     admin: dict = Depends(verify_admin)
 ):
     """Delete multiple speakers at once (Admin Only)"""
+    ids = list(set(delete_data.ids))
+    targets = session.exec(select(Speaker.id, Speaker.name).where(Speaker.id.in_(ids))).all() if ids else []
+
     count = 0
-    for speaker_id in delete_data.ids:
-        db_speaker = session.get(Speaker, speaker_id)
-        if db_speaker:
-            session.delete(db_speaker)
-            count += 1
-            
-    session.commit()
-    
-    if count > 0:
-        log = AuditLog(
-            user_name=user_name,
-            action="BULK_DELETE",
-            details=f"Deleted {count} speakers (IDs: {delete_data.ids[:5]}...)"
+    if targets:
+        note_bulk_delete(session, Speaker, [sid for sid, _ in targets])
+        result = session.exec(
+            delete(Speaker).where(Speaker.id.in_([sid for sid, _ in targets]))
+            .execution_options(synchronize_session=False)
         )
-        session.add(log)
-        session.commit()
+        count = result.rowcount
+        record_tombstones(session, Speaker, [sid for sid, _ in targets])
+
+    if count > 0:
+        now = datetime.now()
+        entries = [
+            {"user_name": user_name, "roll_number": admin["roll_number"], "action": "BULK_DELETE",
+             "details": f"Deleted speaker {name}", "speaker_id": sid, "timestamp": now}
+            for sid, name in targets
+        ]
+        entries.append({
+            "user_name": user_name, "roll_number": admin["roll_number"], "action": "BULK_DELETE", "speaker_id": None, "timestamp": now,
+            "details": f"Deleted {count} speakers (IDs: {delete_data.ids[:5]}...)"
+        })
+        audit.record_many(session, entries)
+
+    session.commit()
         
     return {"message": f"Successfully deleted {count} speakers", "count": count}
 
@@ -195,7 +301,7 @@ def update_speaker(
     speaker_id: int, 
     speaker_update: SpeakerUpdate, 
     session: Session = Depends(get_session), 
-    user_token: dict = Depends(verify_token)
+    user: CachedUser = Depends(get_current_user)
 ):
     db_speaker = session.get(Speaker, speaker_id)
     if not db_speaker:
@@ -224,12 +330,11 @@ def update_speaker(
     for key, value in speaker_data.items():
         setattr(db_speaker, key, value)
         
-    db_speaker.last_updated = func.now()
+    db_speaker.last_updated = datetime.now()
     session.add(db_speaker)
     
     # Audit Log and XP Awarding
-    if user_token:
-        user_roll = user_token["roll_number"]
+    if user:
         action = "UPDATE"
         details = f"Updated profile for {db_speaker.name}"
         
@@ -250,25 +355,16 @@ def update_speaker(
             }
             reward = XP_MAP.get(db_speaker.status, 0)
             if reward > 0:
-                # Find the user performing the action to award XP
-                current_user = session.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == user_roll)).first()
-                if current_user:
-                    current_user.xp += reward
-                    session.add(current_user)
-                    details += f" (+{reward} XP)"
+                # Award XP to the user performing the action (a ledger entry, see xp.py)
+                xp.award(session, user.id, reward, "MOVE", speaker_id=speaker_id)
+                details += f" (+{reward} XP)"
 
         elif 'is_bounty' in speaker_data:
             action = "BOUNTY"
             status_str = "Marked" if db_speaker.is_bounty else "Unmarked"
             details = f"{status_str} {db_speaker.name} as Bounty"
             
-        log = AuditLog(
-            user_name=user_token.get("username") or user_token.get("roll_number") or "Unknown",
-            action=action,
-            details=details,
-            speaker_id=speaker_id
-        )
-        session.add(log)
+        audit.record(session, user.display_name, action, details, speaker_id=speaker_id, roll_number=user.roll_number)
     
     session.commit()
     session.refresh(db_speaker)
@@ -279,7 +375,7 @@ def assign_speaker(
     speaker_id: int,
     assigned_to: str,  # Roll number
     session: Session = Depends(get_session),
-    user: dict = Depends(verify_token)
+    user: CachedUser = Depends(get_current_user)
 ):
     """Assign a speaker to a team member"""
     speaker = session.get(Speaker, speaker_id)
@@ -287,30 +383,22 @@ def assign_speaker(
         raise HTTPException(status_code=404, detail="Speaker not found")
     
     # Verify assigned_to user exists
-    assignee = session.exec(
-        select(AuthorizedUser).where(AuthorizedUser.roll_number == assigned_to)
-    ).first()
+    assignee = user_cache.get(session, assigned_to)
     
     if not assignee:
         raise HTTPException(status_code=404, detail="Assignee not found")
     
     speaker.assigned_to = assigned_to
-    speaker.assigned_by = user["roll_number"]
+    speaker.assigned_by = user.roll_number
     speaker.assigned_at = datetime.now()
     speaker.last_activity = datetime.now()
     speaker.last_updated = datetime.now()
     
     session.add(speaker)
-    session.commit()
     
     # Log the assignment
-    log = AuditLog(
-        user_name=user["username"],
-        action="ASSIGN_SPEAKER",
-        details=f"Assigned {speaker.name} to {assignee.name}",
-        speaker_id=speaker_id
-    )
-    session.add(log)
+    audit.record(session, user.display_name, "ASSIGN_SPEAKER", f"Assigned {speaker.name} to {assignee.name}",
+                 speaker_id=speaker_id, roll_number=user.roll_number)
     session.commit()
     
     return {"message": "Speaker assigned successfully", "assigned_to": assignee.name}
@@ -333,16 +421,10 @@ def unassign_speaker(
     speaker.last_updated = datetime.now()
     
     session.add(speaker)
-    session.commit()
     
     # Log the unassignment
-    log = AuditLog(
-        user_name=user["username"],
-        action="UNASSIGN_SPEAKER",
-        details=f"Unassigned {speaker.name}",
-        speaker_id=speaker_id
-    )
-    session.add(log)
+    audit.record(session, user["username"], "UNASSIGN_SPEAKER", f"Unassigned {speaker.name}", speaker_id=speaker_id,
+                 roll_number=user["roll_number"])
     session.commit()
     
     return {"message": "Speaker unassigned successfully"}
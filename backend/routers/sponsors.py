@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 from database import get_session
-from models import Sponsor, SponsorUpdate, SponsorStatus, AuditLog
+from models import Sponsor, SponsorUpdate, SponsorStatus
 from auth_utils import verify_token, get_current_user_name
+from etags import conditional_get
 from typing import List, Optional
 from datetime import datetime
+import audit
 
 router = APIRouter(prefix="/sponsors", tags=["sponsors"])
 
-@router.get("", response_model=List[Sponsor])
+@router.get("", response_model=List[Sponsor], dependencies=[Depends(verify_token), Depends(conditional_get(Sponsor))])
 def read_sponsors(
     session: Session = Depends(get_session),
     status: Optional[str] = None,
@@ -23,22 +25,13 @@ def read_sponsors(
 def create_sponsor(
     sponsor: Sponsor,
     session: Session = Depends(get_session),
-    user_name: str = Depends(get_current_user_name)
+    user: dict = Depends(verify_token)
 ):
     session.add(sponsor)
+    audit.record(session, user["username"], "ADD_SPONSOR", f"Added sponsor {sponsor.company_name}",
+                 roll_number=user["roll_number"])
     session.commit()
     session.refresh(sponsor)
-    
-    if user_name:
-        log = AuditLog(
-            user_name=user_name,
-            action="ADD_SPONSOR",
-            details=f"Added sponsor {sponsor.company_name}",
-            timestamp=datetime.now()
-        )
-        session.add(log)
-        session.commit()
-        
     return sponsor
 
 @router.patch("/{sponsor_id}", response_model=Sponsor)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from database import get_session
+from auth_utils import verify_token, verify_admin
+import pipeline_stats
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+@router.get("")
+def get_stats(
+    session: Session = Depends(get_session),
+    user: dict = Depends(verify_token)
+):
+    """
+    Speaker counts by status, assignee, batch, priority and assignee+status,
+    and sponsor counts and amounts by status, read from the maintained
+    counters (no table scan). Rows without a value are counted under "NONE".
+    """
+    return pipeline_stats.summary(session.connection())
+
+@router.get("/check")
+def check_stats(
+    session: Session = Depends(get_session),
+    admin: dict = Depends(verify_admin)
+):
+    """Compare the counters against a fresh count (admin only)"""
+    problems = pipeline_stats.check(session.connection())
+    return {"ok": not problems, "problems": problems}
+
+@router.post("/rebuild")
+def rebuild_stats(
+    session: Session = Depends(get_session),
+    admin: dict = Depends(verify_admin)
+):
+    """Recompute every counter from the tables (admin only)"""
+    buckets = pipeline_stats.rebuild(session.connection())
+    session.commit()
+    return {"message": f"Rebuilt {buckets} stat buckets", "buckets": buckets}
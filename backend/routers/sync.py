@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session, select
+from database import get_session
+from models import Speaker, Sponsor, CreativeAsset, CreativeRequest, Tombstone, AuditLog
+from auth_utils import verify_token
+from datetime import datetime, timedelta
+from typing import Optional
+
+router = APIRouter(tags=["sync"])
+
+SYNC_MODELS = (Speaker, Sponsor, CreativeAsset, CreativeRequest)
+# last_updated is set before commit, so a slow transaction can land behind the
+# watermark; re-sending the last minute of changes is cheaper than missing one
+SYNC_OVERLAP = timedelta(minutes=1)
+SYNC_MAX_ROWS = 2000  # past this a plain refetch is cheaper for the client
+
+@router.get("/sync")
+def sync_changes(
+    since: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+    user: dict = Depends(verify_token)
+):
+    """
+    Rows created, updated or deleted since `since`, for speakers, sponsors,
+    creatives and creative requests:
+    {"watermark": ..., "resync": false, "tables": {"speaker": {"rows": [...], "deleted": [ids]}, ...}}
+    Pass `watermark` back as the next `since`; rows may repeat across calls, so
+    apply them as upserts by id. Without `since` only a starting watermark is
+    returned. `resync: true` means the delta can't be trusted (a restore ran
+    or too much changed) and the client should refetch its lists.
+    """
+    watermark = datetime.now() - SYNC_OVERLAP
+    tables = {model.__tablename__: {"rows": [], "deleted": []} for model in SYNC_MODELS}
+    if since is None:
+        return {"watermark": watermark, "resync": False, "tables": tables}
+
+    # Restores bring back rows with their old timestamps, invisible to a delta
+    restored = session.exec(
+        select(AuditLog.id).where(AuditLog.action == "RESTORE_BACKUP", AuditLog.timestamp >= since).limit(1)
+    ).first()
+    if restored:
+        return {"watermark": watermark, "resync": True, "tables": tables}
+
+    budget = SYNC_MAX_ROWS
+    for model in SYNC_MODELS:
+        rows = session.exec(
+            select(model).where(model.last_updated >= since).order_by(model.last_updated, model.id).limit(budget + 1)
+        ).all()
+        budget -= len(rows)
+        if budget < 0:
+            return {"watermark": watermark, "resync": True,
+                    "tables": {model.__tablename__: {"rows": [], "deleted": []} for model in SYNC_MODELS}}
+        tables[model.__tablename__]["rows"] = rows
+
+    # Deletes go last: apply them after the upserts
+    deleted = session.exec(
+        select(Tombstone.table_name, Tombstone.row_id)
+        .where(Tombstone.deleted_at >= since, Tombstone.table_name.in_(tables.keys()))
+    ).all()
+    for table_name, row_id in deleted:
+        tables[table_name]["deleted"].append(row_id)
+
+    return {"watermark": watermark, "resync": False, "tables": tables}
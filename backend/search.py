@@ -0,0 +1,111 @@
+"""
+Full-text search for the speaker board.
+
+SQLite uses an FTS5 external-content table kept in sync by triggers, Postgres a
+generated tsvector column with a GIN index. Both match every word of the search
+box as a prefix and rank results (name > domain > angle/tags > location > remarks).
+If neither is available the query falls back to ILIKE over the same columns.
+"""
+import re
+from sqlalchemy import text, func, literal_column, or_, Integer, Float
+from models import Speaker
+
+SEARCH_COLUMNS = ["name", "primary_domain", "blurring_line_angle", "tags", "location", "remarks"]
+# Relative weights per column, same order as SEARCH_COLUMNS
+BM25_WEIGHTS = [10.0, 4.0, 3.0, 3.0, 2.0, 1.0]
+PG_WEIGHTS = ["A", "B", "B", "B", "C", "D"]
+
+# Engine URLs whose search index has been set up in this process
+_ready = set()
+
+def _fts5_statements():
+    cols = ", ".join(SEARCH_COLUMNS)
+    new_vals = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+    old_vals = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS speaker_fts_ai AFTER INSERT ON speaker BEGIN
+            INSERT INTO speaker_fts(rowid, {cols}) VALUES (new.id, {new_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS speaker_fts_ad AFTER DELETE ON speaker BEGIN
+            INSERT INTO speaker_fts(speaker_fts, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS speaker_fts_au AFTER UPDATE OF {cols} ON speaker BEGIN
+            INSERT INTO speaker_fts(speaker_fts, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+            INSERT INTO speaker_fts(rowid, {cols}) VALUES (new.id, {new_vals});
+        END""",
+    ]
+
+def setup_search_index(engine):
+    """Creates the search index for this database if missing (idempotent)"""
+    is_postgres = engine.dialect.name == "postgresql"
+    with engine.connect() as conn:
+        try:
+            if is_postgres:
+                doc = " || ".join(
+                    f"setweight(to_tsvector('simple'::regconfig, coalesce({c}, '')), '{w}')"
+                    for c, w in zip(SEARCH_COLUMNS, PG_WEIGHTS)
+                )
+                conn.execute(text(
+                    f"ALTER TABLE speaker ADD COLUMN IF NOT EXISTS search_doc tsvector "
+                    f"GENERATED ALWAYS AS ({doc}) STORED"
+                ))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_speaker_search_doc ON speaker USING gin (search_doc)"))
+            else:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='speaker_fts'"
+                )).first()
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS speaker_fts USING fts5("
+                    f"{', '.join(SEARCH_COLUMNS)}, content='speaker', content_rowid='id', "
+                    f"tokenize='unicode61 remove_diacritics 2')"
+                ))
+                for stmt in _fts5_statements():
+                    conn.execute(text(stmt))
+                if not exists:
+                    # Index rows that were written before the FTS table existed
+                    conn.execute(text("INSERT INTO speaker_fts(speaker_fts) VALUES ('rebuild')"))
+            conn.commit()
+            _ready.add(str(engine.url))
+            print("  ✓ speaker search index ready")
+        except Exception as e:
+            conn.rollback()
+            print(f"  ⚠️ Full-text search unavailable, falling back to ILIKE: {e}")
+
+def search_terms(term: str):
+    """Splits the search box into word tokens (quotes and operators are dropped)"""
+    return re.findall(r"\w+", term.lower())
+
+def apply_search(query, term: str, engine):
+    """
+    Restricts `query` to speakers matching `term`.
+    Returns (query, ranked); when ranked is True the query is already ordered by relevance.
+    """
+    words = search_terms(term)
+    if not words:
+        return query, False
+
+    if str(engine.url) in _ready:
+        if engine.dialect.name == "postgresql":
+            tsquery = func.to_tsquery("simple", " & ".join(f"{w}:*" for w in words))
+            doc = literal_column("speaker.search_doc")
+            query = query.where(doc.op("@@")(tsquery)).order_by(
+                func.ts_rank(doc, tsquery).desc(), Speaker.id.desc()
+            )
+            return query, True
+
+        match = " ".join(f'"{w}"*' for w in words)
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        fts = (
+            text(f"SELECT rowid, bm25(speaker_fts, {weights}) AS rank FROM speaker_fts WHERE speaker_fts MATCH :search_q")
+            .bindparams(search_q=match)
+            .columns(rowid=Integer, rank=Float)
+            .subquery("fts")
+        )
+        query = query.join(fts, fts.c.rowid == Speaker.id).order_by(fts.c.rank, Speaker.id.desc())
+        return query, True
+
+    conditions = []
+    for word in words:
+        pattern = f"%{word}%"
+        conditions.append(or_(*[getattr(Speaker, c).ilike(pattern) for c in SEARCH_COLUMNS]))
+    return query.where(*conditions), False
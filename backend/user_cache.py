@@ -0,0 +1,88 @@
+"""
+In-process cache of authorized users, keyed by roll number.
+
+Every authenticated request resolves its user here (auth_utils.verify_token),
+so a removed or demoted user is locked out on the next request after the
+admin endpoints invalidate the entry, and within USER_CACHE_TTL otherwise
+(writes made by another process, restores). Unknown roll numbers are cached
+too, so a revoked token doesn't cost a query per request.
+
+Entries are immutable snapshots of the identity fields only; XP and streak
+change constantly and are still read from the database where needed.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from models import AuthorizedUser, UserRole
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))  # seconds
+
+@dataclass(frozen=True)
+class CachedUser:
+    id: int
+    roll_number: str
+    name: str
+    is_admin: bool
+    role: UserRole
+
+    @property
+    def display_name(self) -> str:
+        # AuditLog needs a non-empty user_name
+        return self.name or self.roll_number
+
+class UserCache:
+    def __init__(self, ttl: float = USER_CACHE_TTL):
+        self.ttl = ttl
+        self.entries = {}  # roll_number -> (expires_at, CachedUser or None)
+        self.lock = threading.Lock()
+        self.generation = 0  # bumped by invalidate, so a lookup racing an admin change isn't cached
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, session: Session, roll_number: str) -> Optional[CachedUser]:
+        """The user for `roll_number`, or None if not authorized; queries only on a miss"""
+        now = time.monotonic()
+        entry = self.entries.get(roll_number)
+        if entry and entry[0] > now:
+            self.stats["hits"] += 1
+            return entry[1]
+        self.stats["misses"] += 1
+        generation = self.generation
+        user = self._load(session, roll_number)
+        with self.lock:
+            if generation == self.generation:
+                self.entries[roll_number] = (now + self.ttl, user)
+        return user
+
+    def _load(self, session: Session, roll_number: str) -> Optional[CachedUser]:
+        # A short session of its own, so the request's session (and a long-lived
+        # stream holding it) doesn't keep a pooled connection checked out
+        with Session(session.get_bind()) as lookup:
+            row = lookup.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == roll_number)).first()
+            if not row:
+                return None
+            return CachedUser(
+                id=row.id,
+                roll_number=row.roll_number,
+                name=row.name,
+                is_admin=bool(row.is_admin or row.role == UserRole.ADMIN),
+                role=row.role,
+            )
+
+    def invalidate(self, roll_number: Optional[str] = None):
+        """Drop one user (after an admin change) or everyone (after a restore)"""
+        with self.lock:
+            self.generation += 1
+            if roll_number is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(roll_number, None)
+
+    def metrics(self) -> dict:
+        return {**self.stats, "entries": len(self.entries), "ttl": self.ttl}
+
+user_cache = UserCache()
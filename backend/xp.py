@@ -0,0 +1,206 @@
+"""
+XP ledger and leaderboard.
+
+XP is awarded by appending an XpEvent inside the writing transaction
+(`award`); the user row isn't touched. A periodic rollup folds pending
+events into AuthorizedUser.xp with one `UPDATE ... SET xp = xp + :n` per
+user and marks them rolled up in the same transaction, so concurrent awards
+are never lost and a balance is always `AuthorizedUser.xp + pending events`.
+
+The leaderboard is an in-memory list kept sorted by (-xp, user_id). It is
+loaded from the tables once (startup, or the first read after a restore) and
+then moved by each committed award, so the top k is a slice and rank is a
+bisect; leaderboard reads never scan the user table. A load remembers which
+pending events it counted, so an award that commits while it runs isn't
+added a second time when its commit reaches the leaderboard.
+
+CLI:  python xp.py rollup
+"""
+import asyncio
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import func, inspect, update
+from sqlmodel import Session, select
+
+from derived import TransactionState
+from models import AuthorizedUser, XpEvent
+
+XP_ROLLUP_SECONDS = float(os.getenv("XP_ROLLUP_SECONDS", "60"))
+XP_ROLLUP_BATCH = int(os.getenv("XP_ROLLUP_BATCH", "5000"))
+
+def award(session: Session, user_id: int, amount: int, reason: str, speaker_id: Optional[int] = None):
+    """Appends an XP event; it counts (and moves the leaderboard) once the session commits"""
+    xp_event = XpEvent(user_id=user_id, amount=amount, reason=reason, speaker_id=speaker_id)
+    session.add(xp_event)
+    awards.get(session).append((xp_event, user_id, amount))
+
+def pending_xp(session: Session, user_id: int) -> int:
+    """XP awarded to `user_id` but not yet rolled into AuthorizedUser.xp"""
+    return session.exec(
+        select(func.coalesce(func.sum(XpEvent.amount), 0))
+        .where(XpEvent.user_id == user_id, XpEvent.rolled_up == False)  # noqa: E712
+    ).one()
+
+def discard_pending(session: Session):
+    """After a restore the restored xp columns are the truth: older pending events must not apply"""
+    session.exec(update(XpEvent).where(XpEvent.rolled_up == False).values(rolled_up=True))  # noqa: E712
+
+def rollup(engine, batch_size: int = XP_ROLLUP_BATCH) -> dict:
+    """Folds pending events into AuthorizedUser.xp, one transaction per batch"""
+    report = {"events": 0, "users": 0}
+    while True:
+        with Session(engine) as session:
+            rows = session.exec(
+                select(XpEvent.id, XpEvent.user_id, XpEvent.amount)
+                .where(XpEvent.rolled_up == False)  # noqa: E712
+                .order_by(XpEvent.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return report
+            ids = [row.id for row in rows]
+            # Claim first: a concurrent rollup that got some of these rows first
+            # leaves us short, and we back off instead of applying them twice
+            claimed = session.exec(
+                update(XpEvent).where(XpEvent.id.in_(ids), XpEvent.rolled_up == False).values(rolled_up=True)  # noqa: E712
+            ).rowcount
+            if claimed != len(ids):
+                session.rollback()
+                continue
+            totals = defaultdict(int)
+            for row in rows:
+                totals[row.user_id] += row.amount
+            for user_id, amount in totals.items():
+                session.exec(update(AuthorizedUser).where(AuthorizedUser.id == user_id).values(xp=AuthorizedUser.xp + amount))
+            session.commit()
+            report["events"] += len(ids)
+            report["users"] += len(totals)
+            if len(rows) < batch_size:
+                return report
+
+class Leaderboard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.scores = {}  # user_id -> xp
+        self.ranking = []  # (-xp, user_id), ascending = best first
+        self.loaded = False
+        self.counted = frozenset()  # ids of the pending events the last load added in
+
+    def load(self, engine):
+        """Balances of every user with XP, from the user table plus pending events"""
+        with self.lock, Session(engine) as session:
+            scores = dict(session.exec(select(AuthorizedUser.id, AuthorizedUser.xp)).all())
+            # Pending events one by one (the rollup keeps them few), so the ids
+            # counted here are known exactly, whatever order awards commit in
+            pending = session.exec(
+                select(XpEvent.id, XpEvent.user_id, XpEvent.amount).where(XpEvent.rolled_up == False)  # noqa: E712
+            ).all()
+            for _, user_id, amount in pending:
+                if user_id in scores:
+                    scores[user_id] = (scores[user_id] or 0) + amount
+            self.scores = {user_id: xp for user_id, xp in scores.items() if xp}
+            self.ranking = sorted((-xp, user_id) for user_id, xp in self.scores.items())
+            self.counted = frozenset(event_id for event_id, _, _ in pending)
+            self.loaded = True
+
+    def ensure_loaded(self, engine):
+        if not self.loaded:
+            self.load(engine)
+
+    def invalidate(self):
+        """Reload on the next read (after a restore, or in tests switching databases)"""
+        with self.lock:
+            self.loaded = False
+
+    def _remove(self, user_id):
+        old = self.scores.pop(user_id, None)
+        if old is not None:
+            del self.ranking[bisect_left(self.ranking, (-old, user_id))]
+        return old or 0
+
+    def add(self, user_id: int, amount: int, event_id: Optional[int] = None):
+        with self.lock:
+            if not self.loaded:
+                return  # the next load reads it from the tables
+            if event_id in self.counted:
+                return  # committed before the load read the ledger, so already in its balance
+            xp = self._remove(user_id) + amount
+            if xp:
+                self.scores[user_id] = xp
+                insort(self.ranking, (-xp, user_id))
+
+    def discard(self, user_id: int):
+        with self.lock:
+            self._remove(user_id)
+
+    def top(self, k: int) -> list:
+        """[(user_id, xp)] for the k highest balances"""
+        with self.lock:
+            return [(user_id, -neg) for neg, user_id in self.ranking[:k]]
+
+    def rank(self, user_id: int) -> Optional[int]:
+        return self.standing(user_id)[0]
+
+    def standing(self, user_id: int) -> tuple:
+        """(rank, xp) read together; (None, 0) for users without XP"""
+        with self.lock:
+            xp = self.scores.get(user_id)
+            if xp is None:
+                return None, 0
+            return bisect_left(self.ranking, (-xp, user_id)) + 1, xp
+
+leaderboard = Leaderboard()
+
+def apply_awards(session, committed):
+    for xp_event, user_id, amount in committed:
+        # The identity outlives the commit's expiry, so reading it doesn't query
+        leaderboard.add(user_id, amount, inspect(xp_event).identity[0])
+
+awards = TransactionState("xp_awards", list, on_commit=apply_awards)
+
+class RollupLoop:
+    """Runs `rollup` every XP_ROLLUP_SECONDS inside the API process"""
+
+    def __init__(self, engine, interval: float = XP_ROLLUP_SECONDS):
+        self.engine = engine
+        self.interval = interval
+        self.stop_event = None
+        self.task = None
+
+    async def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                report = await asyncio.to_thread(rollup, self.engine)
+                if report["events"]:
+                    print(f"🏅 XP rollup: {report['events']} events for {report['users']} users")
+            except Exception as e:
+                print(f"XP rollup error: {e}")
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        self.stop_event = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # The final pass runs before the loop exits, so nothing is left pending on shutdown
+        if self.task:
+            self.stop_event.set()
+            await self.task
+            self.task = None
+
+if __name__ == "__main__":
+    import sys
+    from database import engine
+
+    if sys.argv[1:] != ["rollup"]:
+        sys.exit("usage: python xp.py rollup")
+    print(rollup(engine))
@@ -51,6 +51,28 @@ api.interceptors.response.use(
     }
 );
 
+// Conditional GETs: list endpoints answer with an ETag, and sending it back
+// as If-None-Match gets a bodiless 304 when nothing changed since.
+const etagCache = new Map();
+
+// Resolves to { data, nextCursor } so paged lists can follow X-Next-Cursor.
+const cachedPage = async (url, config = {}) => {
+    const key = api.getUri({ url, params: config.params });
+    const cached = etagCache.get(key);
+    const response = await api.get(url, {
+        ...config,
+        headers: { ...config.headers, ...(cached && { 'If-None-Match': cached.etag }) },
+        validateStatus: (status) => (status >= 200 && status < 300) || (cached && status === 304)
+    });
+    if (response.status === 304) return cached.page;
+    const page = { data: response.data, nextCursor: response.headers['x-next-cursor'] };
+    const etag = response.headers.etag;
+    if (etag) etagCache.set(key, { etag, page });
+    return page;
+};
+
+const cachedGet = async (url, config = {}) => (await cachedPage(url, config)).data;
+
 export const loginUser = async (rollNumber) => {
     const response = await api.post('/login', { roll_number: rollNumber });
     if (response.data.access_token) {
@@ -61,8 +83,16 @@ export const loginUser = async (rollNumber) => {
     return response.data;
 };
 
-export const getSpeakers = async (params = {}) => {
-    const response = await api.get('/speakers', { params });
+// The board only needs card fields (no drafts or research notes), one keyset
+// page per call: pass the previous page's nextCursor to get the next one
+// (null when there is none). OutreachModal loads the full row.
+export const getSpeakers = async (params = {}, cursor = null) => {
+    const page = await cachedPage('/speakers', { params: { ...params, fields: 'card', ...(cursor && { cursor }) } });
+    return { speakers: page.data, nextCursor: page.nextCursor || null };
+};
+
+export const getSpeaker = async (id) => {
+    const response = await api.get(`/speakers/${id}`);
     return response.data;
 };
 
@@ -81,9 +111,25 @@ export const deleteSpeaker = async (id) => {
     return response.data;
 };
 
-export const generateEmail = async (id) => {
-    const response = await api.post(`/generate-email?speaker_id=${id}`);
-    return response.data;
+// Long-running AI endpoints answer 202 with a job id; poll until the job finishes
+export const waitForJob = async (jobId, { interval = 1500, onProgress } = {}) => {
+    while (true) {
+        const { data: job } = await api.get(`/jobs/${jobId}`);
+        if (job.status === 'SUCCEEDED') return job.result;
+        if (job.status === 'FAILED') {
+            const error = new Error(job.error || 'Background job failed');
+            error.response = { data: { detail: job.error } };
+            throw error;
+        }
+        if (onProgress && job.progress) onProgress(job.progress);
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+};
+
+// regenerate=true skips the server-side draft cache
+export const generateEmail = async (id, regenerate = false) => {
+    const response = await api.post(`/generate-email?speaker_id=${id}&regenerate=${regenerate}`);
+    return waitForJob(response.data.job_id);
 };
 
 export const refineEmail = async (currentDraft, instruction) => {
@@ -100,8 +146,66 @@ export const exportSpeakers = () => {
 };
 
 export const getLogs = async () => {
-    const response = await api.get('/logs');
-    return response.data;
+    return cachedGet('/logs');
+};
+
+// Rows changed since a /sync watermark (omit `since` to just get a starting one)
+export const syncChanges = async (since) => {
+    const response = await api.get('/sync', { params: since ? { since } : {} });
+    return response.data;
+};
+
+// Live change feed (server-sent events). EventSource can't send the auth
+// header, so the stream is read with fetch; reconnects resume via Last-Event-ID.
+export const subscribeChanges = (onChanges) => {
+    let stopped = false;
+    let controller = null;
+    let lastEventId = null;
+    let retryMs = 3000;
+    let failures = 0;
+
+    const connect = async () => {
+        while (!stopped) {
+            controller = new AbortController();
+            try {
+                const headers = { Authorization: `Bearer ${localStorage.getItem('tedx_token')}` };
+                if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+                const response = await fetch(`${API_URL}/events/stream`, { headers, signal: controller.signal });
+                if (response.status === 401) return;
+                if (!response.ok || !response.body) throw new Error(`Change feed HTTP ${response.status}`);
+                failures = 0;
+                const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = '';
+                for (;;) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += value;
+                    let end;
+                    while ((end = buffer.indexOf('\n\n')) !== -1) {
+                        const frame = buffer.slice(0, end);
+                        buffer = buffer.slice(end + 2);
+                        let data = '';
+                        for (const line of frame.split('\n')) {
+                            if (line.startsWith('id: ')) lastEventId = line.slice(4);
+                            else if (line.startsWith('data: ')) data += line.slice(6);
+                            else if (line.startsWith('retry: ')) retryMs = parseInt(line.slice(7), 10) || retryMs;
+                        }
+                        if (data) onChanges(JSON.parse(data).changes);
+                    }
+                }
+            } catch (e) {
+                if (stopped) return;
+                failures += 1;
+            }
+            await new Promise(resolve => setTimeout(resolve, Math.min(retryMs * 2 ** Math.min(failures, 4), 60000)));
+        }
+    };
+
+    connect();
+    return () => {
+        stopped = true;
+        controller?.abort();
+    };
 };
 
 export const getSpeakerLogs = async (speakerId) => {
@@ -120,8 +224,7 @@ export const unassignSpeaker = async (speakerId) => {
 };
 
 export const getAuthorizedUsers = async () => {
-    const response = await api.get('/admin/users');
-    return response.data;
+    return cachedGet('/admin/users');
 };
 
 export const getAiPrompt = async (id) => {
@@ -141,8 +244,7 @@ export const bulkDeleteSpeakers = async (data) => {
 
 // Sponsor APIs
 export const getSponsors = async (params = {}) => {
-    const response = await api.get('/sponsors', { params });
-    return response.data;
+    return cachedGet('/sponsors', { params });
 };
 
 export const createSponsor = async (data) => {
@@ -162,8 +264,7 @@ export const generateSponsorEmail = async (id) => {
 
 // Creative APIs
 export const getCreatives = async (params = {}) => {
-    const response = await api.get('/creatives', { params });
-    return response.data;
+    return cachedGet('/creatives', { params });
 };
 
 export const createCreative = async (data) => {
@@ -181,10 +282,15 @@ export const generateCreativeBrief = async (id) => {
     return response.data;
 };
 
+// Pipeline counts by status / assignee / batch / priority, sponsor value by status
+export const getStats = async () => {
+    const response = await api.get('/stats');
+    return response.data;
+};
+
 // Admin roles
 export const getAllUsers = async () => {
-    const response = await api.get('/admin/users');
-    return response.data;
+    return cachedGet('/admin/users');
 };
 
 export const adminAddUser = async (userData) => {
@@ -212,21 +318,46 @@ export const restoreBackup = async (data) => {
     return response.data;
 };
 
+// Full gzip NDJSON backup (every table, with a checksum manifest)
+export const downloadBackupStream = async () => {
+    const response = await api.get('/admin/backup/stream', { responseType: 'blob' });
+    const match = /filename="([^"]+)"/.exec(response.headers['content-disposition'] || '');
+    return { blob: response.data, filename: match ? match[1] : 'tedx_backup.ndjson.gz' };
+};
+
+export const restoreBackupStream = async (file, { resume = false, verifyOnly = false } = {}) => {
+    const form = new FormData();
+    form.append('file', file);
+    const response = await api.post(`/admin/restore/stream?resume=${resume}&verify_only=${verifyOnly}`, form, {
+        headers: { 'Content-Type': 'multipart/form-data' }
+    });
+    return response.data;
+};
+
+// CSV/Excel speaker import; dryRun only validates and reports
+export const importSpeakers = async (file, dryRun = false) => {
+    const form = new FormData();
+    form.append('file', file);
+    const response = await api.post(`/admin/import?dry_run=${dryRun}`, form, {
+        headers: { 'Content-Type': 'multipart/form-data' }
+    });
+    return response.data;
+};
+
 export const updateUserRole = async (rollNumber, data) => {
     const response = await api.patch(`/admin/users/${rollNumber}`, data);
     return response.data;
 };
 
 // AI Ingestion
-export const ingestAiData = async (rawText) => {
+export const ingestAiData = async (rawText, onProgress) => {
     const response = await api.post('/ingest-ai-data', { raw_text: rawText });
-    return response.data;
+    return waitForJob(response.data.job_id, { onProgress });
 };
 
 // Creative Request System
 export const getCreativeRequests = async () => {
-    const response = await api.get('/creative-requests');
-    return response.data;
+    return cachedGet('/creative-requests');
 };
 
 export const createCreativeRequest = async (data) => {
@@ -246,11 +377,23 @@ export const getMyDetails = async () => {
 };
 
 export const updateMyGamification = async (data) => {
-    // data = { xp, streak, last_login_date }
+    // data = { last_login_date } (new Date().toDateString()); the server works out the streak
     const response = await api.patch('/users/me/gamification', data);
     return response.data;
 };
 
+export const getLeaderboard = async (k = 10, days = null) => {
+    // days = null for all-time XP, or a window (e.g. 7) from the daily activity rollup
+    const response = await api.get('/leaderboard', { params: days ? { k, days } : { k } });
+    return response.data;
+};
+
+export const getActivityHeatmap = async (days = 84, user = null) => {
+    // user: a roll number
+    const response = await api.get('/activity/heatmap', { params: user ? { days, user } : { days } });
+    return response.data;
+};
+
 // Meta / Sprint
 export const getSprintDeadline = async () => {
     const response = await api.get('/meta/sprint-deadline');
@@ -267,14 +410,44 @@ export const getHealth = async () => {
     return response.data;
 };
 
-export const huntEmail = async (speakerId) => {
-    const response = await api.post(`/hunt-email?speaker_id=${speakerId}`);
-    return response.data;
+export const huntEmail = async (speakerId, refresh = false) => {
+    const response = await api.post(`/hunt-email?speaker_id=${speakerId}&refresh=${refresh}`);
+    return waitForJob(response.data.job_id);
 };
 
-export const bulkHuntEmails = async (ids) => {
-    const response = await api.post('/bulk-hunt-emails', { ids });
-    return response.data;
+// Streams NDJSON: onResult is called once per speaker as each hunt finishes
+export const bulkHuntEmails = async (ids, onResult = () => { }) => {
+    const token = localStorage.getItem('tedx_token');
+    const response = await fetch(`${API_URL}/bulk-hunt-emails`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            ...(token ? { Authorization: `Bearer ${token}` } : {})
+        },
+        body: JSON.stringify({ ids })
+    });
+    if (!response.ok) {
+        throw new Error(`Bulk hunt failed (${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let summary = null;
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        for (const line of lines) {
+            if (!line.trim()) continue;
+            const item = JSON.parse(line);
+            if (item.done) summary = item;
+            else onResult(item);
+        }
+    }
+    return summary;
 };
 
 export const approveHuntedEmail = async (speakerId, approve) => {
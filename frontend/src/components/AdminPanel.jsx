@@ -16,12 +16,14 @@ import {
     adminRemoveUser,
     ingestAiData,
     purgeInvalidData,
-    getBackup,
-    restoreBackup
+    downloadBackupStream,
+    restoreBackup,
+    restoreBackupStream,
+    importSpeakers,
+    getStats,
+    getActivityHeatmap
 } from '../api';
 
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
-
 const AdminPanel = ({ onClose, speakers = [] }) => {
     const [activeTab, setActiveTab] = useState('users'); // users | analytics | creative
     const [users, setUsers] = useState([]);
@@ -30,12 +32,32 @@ const AdminPanel = ({ onClose, speakers = [] }) => {
     const [addingUser, setAddingUser] = useState(false);
     const [newRequest, setNewRequest] = useState({ title: '', description: '', priority: 'MEDIUM', due_date: '' });
     const [newUser, setNewUser] = useState({ roll_number: '', name: '', is_admin: false, role: 'SPEAKER_OUTREACH' });
+    const [stats, setStats] = useState(null);
+    const [heatmap, setHeatmap] = useState(null);
 
     useEffect(() => {
         fetchUsers();
         fetchCreativeRequests();
+        fetchStats();
+        fetchHeatmap();
     }, []);
 
+    const fetchStats = async () => {
+        try {
+            setStats(await getStats());
+        } catch (error) {
+            console.error("Failed to fetch stats", error);
+        }
+    };
+
+    const fetchHeatmap = async () => {
+        try {
+            setHeatmap(await getActivityHeatmap(84));
+        } catch (error) {
+            console.error("Failed to fetch activity heatmap", error);
+        }
+    };
+
     const fetchCreativeRequests = async () => {
         try {
             const data = await getCreativeRequests();
@@ -111,21 +133,22 @@ const AdminPanel = ({ onClose, speakers = [] }) => {
         }
     };
 
-    // Analytics Calculations
-    const totalSpeakers = speakers.length;
-    const lockedSpeakers = speakers.filter(s => s.status === 'LOCKED').length;
+    // Analytics from the server-side pipeline counters (GET /stats)
+    const totalSpeakers = stats?.speakers.total ?? 0;
+    const lockedSpeakers = stats?.speakers.by_status.LOCKED ?? 0;
     const conversionRate = totalSpeakers > 0 ? ((lockedSpeakers / totalSpeakers) * 100).toFixed(1) : 0;
 
     const userPerformance = users.map(user => {
-        const userLeads = speakers.filter(s => s.assigned_to === user.roll_number);
-        const userLocked = userLeads.filter(s => s.status === 'LOCKED').length;
-        const userOutreach = userLeads.filter(s => ['CONTACT_INITIATED', 'CONNECTED', 'IN_TALKS', 'LOCKED'].includes(s.status)).length;
+        const byStatus = stats?.speakers.by_assignee_status[user.roll_number] || {};
+        const leads = Object.values(byStatus).reduce((sum, n) => sum + n, 0);
+        const userLocked = byStatus.LOCKED || 0;
+        const userOutreach = ['CONTACT_INITIATED', 'CONNECTED', 'IN_TALKS', 'LOCKED'].reduce((sum, s) => sum + (byStatus[s] || 0), 0);
         return {
             ...user,
-            leads: userLeads.length,
+            leads,
             locked: userLocked,
             outreach: userOutreach,
-            efficiency: userLeads.length > 0 ? ((userLocked / userLeads.length) * 100).toFixed(1) : 0
+            efficiency: leads > 0 ? ((userLocked / leads) * 100).toFixed(1) : 0
         };
     }).sort((a, b) => b.locked - a.locked);
 
@@ -398,15 +421,16 @@ const AdminPanel = ({ onClose, speakers = [] }) => {
                                             btn.disabled = true;
                                             btn.innerText = "Processing with AI...";
                                             try {
-                                                const token = localStorage.getItem('tedx_token');
-                                                const res = await axios.post(`${API_URL}/admin/ingest-ai`, { raw_text: text }, {
-                                                    headers: { 'Authorization': `Bearer ${token}` }
+                                                const result = await ingestAiData(text, (p) => {
+                                                    btn.innerText = p.stage === 'saving'
+                                                        ? "Saving speakers..."
+                                                        : `Extracting ${p.chunks_done}/${p.chunks_total} chunks...`;
                                                 });
 
-                                                let msg = res.data.message;
-                                                if (res.data.duplicates && res.data.duplicates.length > 0) {
+                                                let msg = result.message;
+                                                if (result.duplicates && result.duplicates.length > 0) {
                                                     msg += "\n\nDuplicates skipped:\n";
-                                                    res.data.duplicates.forEach(d => {
+                                                    result.duplicates.forEach(d => {
                                                         msg += `- ${d.name} (matched by ${d.reason})\n`;
                                                     });
                                                 }
@@ -458,8 +482,8 @@ const AdminPanel = ({ onClose, speakers = [] }) => {
                                 </div>
                                 <div className="bg-gradient-to-br from-blue-600/10 to-transparent p-6 rounded-2xl border border-blue-500/10">
                                     <p className="text-[10px] text-blue-500 font-black uppercase tracking-widest mb-1">Team Velocity</p>
-                                    <h4 className="text-3xl font-black text-white">Aggressive</h4>
-                                    <p className="text-[10px] text-gray-500 mt-2 font-bold uppercase">Optimal Output</p>
+                                    <h4 className="text-3xl font-black text-white">{heatmap ? heatmap.days.slice(-7).reduce((sum, d) => sum + d.count, 0) : '—'}</h4>
+                                    <p className="text-[10px] text-gray-500 mt-2 font-bold uppercase">Actions in the last 7 days</p>
                                 </div>
                             </div>
 
@@ -503,6 +527,25 @@ const AdminPanel = ({ onClose, speakers = [] }) => {
                                     ))}
                                 </div>
                             </div>
+
+                            {heatmap && (
+                                <div>
+                                    <h3 className="text-sm font-black text-white uppercase tracking-widest mb-4 flex items-center gap-2">
+                                        <Activity size={16} className="text-red-500" /> Team Activity
+                                        <span className="text-[9px] text-gray-600 font-bold normal-case tracking-normal">{heatmap.total} actions since {heatmap.from}</span>
+                                    </h3>
+                                    <div className="grid grid-rows-7 grid-flow-col gap-1 w-fit p-4 border border-white/5 rounded-2xl bg-white/5">
+                                        {heatmap.days.map(d => (
+                                            <div
+                                                key={d.date}
+                                                title={`${d.date}: ${d.count} actions, ${d.xp} XP`}
+                                                className="w-3 h-3 rounded-sm bg-red-500"
+                                                style={{ opacity: d.count ? 0.2 + 0.8 * (d.count / (heatmap.max || 1)) : 0.05 }}
+                                            />
+                                        ))}
+                                    </div>
+                                </div>
+                            )}
                         </div>
                     ) : activeTab === 'control' ? (
                         <div className="space-y-8">
@@ -670,13 +713,13 @@ const AdminPanel = ({ onClose, speakers = [] }) => {
                         <button
                             onClick={async () => {
                                 try {
-                                    const data = await getBackup();
-                                    const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
+                                    const { blob, filename } = await downloadBackupStream();
                                     const url = URL.createObjectURL(blob);
                                     const a = document.createElement('a');
                                     a.href = url;
-                                    a.download = `tedx_backup_${new Date().toISOString().split('T')[0]}.json`;
+                                    a.download = filename;
                                     a.click();
+                                    URL.revokeObjectURL(url);
                                 } catch (e) { alert("Backup failed"); }
                             }}
                             className="text-[8px] bg-blue-900/20 text-blue-400 px-2 py-1 rounded border border-blue-900/30 hover:bg-blue-600 hover:text-white transition-all font-black uppercase"
@@ -688,10 +731,24 @@ const AdminPanel = ({ onClose, speakers = [] }) => {
                             type="file"
                             id="restore-file"
                             className="hidden"
-                            accept=".json"
+                            accept=".json,.gz,.ndjson"
                             onChange={async (e) => {
                                 const file = e.target.files[0];
+                                e.target.value = '';
                                 if (!file) return;
+                                if (!file.name.endsWith('.json')) {
+                                    try {
+                                        const check = await restoreBackupStream(file, { verifyOnly: true });
+                                        if (!check.ok) return alert(`Backup failed verification:\n${check.problems.join('\n')}`);
+                                        const rows = Object.entries(check.tables).map(([t, n]) => `${t}: ${n}`).join('\n');
+                                        if (!window.confirm(`CRITICAL: This will overwrite ALL current data with this backup (${check.created_at}).\n\n${rows}\n\nProceed?`)) return;
+                                        await restoreBackupStream(file);
+                                        alert("System Restored Successfully");
+                                        window.location.reload();
+                                    } catch (err) { alert(`Restore failed: ${err.response?.data?.detail || err.message}`); }
+                                    return;
+                                }
+                                // Legacy JSON backups
                                 if (!window.confirm("CRITICAL: This will overwrite ALL current data with this backup. Proceed?")) return;
                                 const reader = new FileReader();
                                 reader.onload = async (event) => {
@@ -711,6 +768,36 @@ const AdminPanel = ({ onClose, speakers = [] }) => {
                         >
                             Import Restore
                         </button>
+
+                        <input
+                            type="file"
+                            id="import-sheet-file"
+                            className="hidden"
+                            accept=".csv,.xlsx,.xls"
+                            onChange={async (e) => {
+                                const file = e.target.files[0];
+                                e.target.value = '';
+                                if (!file) return;
+                                try {
+                                    const preview = await importSpeakers(file, true);
+                                    const errorLines = preview.errors.slice(0, 10).map(err => `- line ${err.row}: ${err.error}`).join('\n');
+                                    const summary = `${preview.inserted} new, ${preview.updated} updated, ${preview.skipped} skipped` +
+                                        (errorLines ? `\n\nFirst problems:\n${errorLines}` : '');
+                                    if (!window.confirm(`Import ${file.name}?\n\n${summary}`)) return;
+                                    const report = await importSpeakers(file);
+                                    alert(`Imported: ${report.inserted} new, ${report.updated} updated, ${report.skipped} skipped.`);
+                                    window.location.reload();
+                                } catch (err) {
+                                    alert("Import failed: " + (err.response?.data?.detail || err.message));
+                                }
+                            }}
+                        />
+                        <button
+                            onClick={() => document.getElementById('import-sheet-file').click()}
+                            className="text-[8px] bg-green-900/20 text-green-400 px-2 py-1 rounded border border-green-900/30 hover:bg-green-600 hover:text-white transition-all font-black uppercase"
+                        >
+                            Import Sheet
+                        </button>
                     </div>
                     <p className="text-[9px] text-gray-400 font-black uppercase tracking-[0.2em]">TEDxXLRI Hub Management Terminal</p>
                 </div>
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { CheckSquare, Trash2, Edit3, ArrowRight } from 'lucide-react';
 import {
@@ -24,7 +24,7 @@ import SpeakerColumn from './SpeakerColumn';
 import BoardHeader from './BoardHeader';
 import IngestionModal from './IngestionModal';
 import CreativeRequestModal from './CreativeRequestModal';
-import { getSpeakers, updateSpeaker, exportSpeakers, getLogs, bulkUpdateSpeakers, getMyDetails, updateMyGamification, getSprintDeadline, bulkHuntEmails, approveHuntedEmail, getHealth, getAllUsers } from '../api';
+import { getSpeakers, updateSpeaker, exportSpeakers, getLogs, subscribeChanges, syncChanges, bulkUpdateSpeakers, getMyDetails, updateMyGamification, getLeaderboard, getSprintDeadline, bulkHuntEmails, approveHuntedEmail, getHealth, getAllUsers } from '../api';
 import { Search, Filter, Trophy, Zap, Download, Undo, Redo, Star, Flame, Target, Bell, ListTodo, X, CircleHelp, Shield, Users, CheckCircle, LayoutGrid, Sparkles } from 'lucide-react';
 import confetti from 'canvas-confetti';
 
@@ -91,8 +91,13 @@ const Countdown = ({ targetDate }) => {
     );
 };
 
+const SPEAKER_PAGE_SIZE = 300;
+
 const Board = ({ onSwitchMode }) => {
     const [speakers, setSpeakers] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const loadedCount = useRef(0);
     const [filteredSpeakers, setFilteredSpeakers] = useState([]);
     const [activeId, setActiveId] = useState(null);
     const [currentUser, setCurrentUser] = useState(() => {
@@ -173,40 +178,15 @@ const Board = ({ onSwitchMode }) => {
                     }
 
                     const today = new Date().toDateString();
-                    const lastLogin = user.last_login_date;
-                    let currentStreak = user.streak || 0;
-
-                    if (lastLogin !== today) {
-                        const yesterday = new Date();
-                        yesterday.setDate(yesterday.getDate() - 1);
-
-                        if (lastLogin === yesterday.toDateString()) {
-                            // Consecutive day
-                            currentStreak += 1;
-                            if (currentStreak % 3 === 0) confetti({ particleCount: 50, origin: { x: 0.1, y: 0.1 } });
-                        } else if (lastLogin) {
-                            // Check if strictly more than 1 day gap
-                            const lastDate = new Date(lastLogin);
-                            const diffTime = Math.abs(new Date() - lastDate);
-                            const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
-                            if (diffDays > 1) {
-                                currentStreak = 1; // Reset
-                            }
-                        } else {
-                            currentStreak = 1; // First time
-                        }
-
-                        // Optimistic update
-                        setStreak(currentStreak);
-
-                        // Push to backend
-                        await updateMyGamification({
-                            streak: currentStreak,
-                            last_login_date: today
-                        });
+                    if (user.last_login_date !== today) {
+                        // The server advances (or resets) the streak from the login dates
+                        const updated = await updateMyGamification({ last_login_date: today });
+                        if (updated.streak > 1 && updated.streak % 3 === 0) confetti({ particleCount: 50, origin: { x: 0.1, y: 0.1 } });
+                        setStreak(updated.streak);
                     } else {
-                        setStreak(currentStreak);
+                        setStreak(user.streak || 0);
                     }
+                    refreshLeaderboard();
                 } catch (error) {
                     console.error("Failed to sync gamification", error);
                     if (error.response?.status === 401) {
@@ -329,19 +309,21 @@ const Board = ({ onSwitchMode }) => {
         })
     );
 
+    const formatLog = (l) => ({
+        // Bulk audit entries arrive on the change feed without an id
+        id: l.id ?? `live-${l.timestamp}-${Math.random()}`,
+        text: l.details,
+        time: new Date(l.timestamp + "Z").toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
+        user: l.user_name,
+        type: l.action
+    });
+
     const fetchLogs = async () => {
         if (!localStorage.getItem('tedx_token')) return;
         try {
             const logs = await getLogs();
             if (logs && Array.isArray(logs)) {
-                const formatted = logs.map(l => ({
-                    id: l.id,
-                    text: l.details,
-                    time: new Date(l.timestamp + "Z").toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
-                    user: l.user_name,
-                    type: l.action
-                }));
-                setActivityLog(formatted);
+                setActivityLog(logs.map(formatLog));
             }
         } catch (e) {
             console.error("Log fetch failed", e);
@@ -382,27 +364,84 @@ const Board = ({ onSwitchMode }) => {
 
     useEffect(() => {
         if (currentUser) {
-            fetchSpeakers();
+            fetchSpeakers({ keepLoaded: false });
             fetchLogs();
             fetchSprintDeadline();
             if (currentUser.isAdmin) {
                 fetchAuthorizedUsers();
             }
-            const interval = setInterval(fetchLogs, 10000);
-            return () => clearInterval(interval);
         }
     }, [currentUser, filterMode, debouncedSearchTerm]);
 
-    // Hourly refresh for bounty board
+    // Live updates: patch cards and the activity feed from the server's change
+    // stream instead of polling. Filtered/searched views just refetch; the full
+    // board catches up on a resync with only the rows changed since /sync's watermark.
     useEffect(() => {
-        if (currentUser) {
-            const hourlyRefresh = setInterval(() => {
-                fetchSpeakers();
-                console.log('Hourly refresh: Speakers updated');
-            }, 3600000); // 1 hour = 3600000ms
-            return () => clearInterval(hourlyRefresh);
+        if (!currentUser) return;
+        const patchable = filterMode === 'ALL' && !debouncedSearchTerm;
+        let refetchTimer = null;
+        let watermark = null;
+        const refetch = () => {
+            clearTimeout(refetchTimer);
+            refetchTimer = setTimeout(() => { fetchSpeakers(); fetchLogs(); }, 500);
+        };
+        const catchUp = () => {
+            if (!patchable || !watermark) return refetch();
+            clearTimeout(refetchTimer);
+            refetchTimer = setTimeout(async () => {
+                try {
+                    const delta = await syncChanges(watermark);
+                    watermark = delta.watermark;
+                    if (delta.resync) return refetch();
+                    const { rows, deleted } = delta.tables.speaker;
+                    const gone = new Set(deleted);
+                    setSpeakers(prev => {
+                        const byId = new Map(prev.map(s => [s.id, s]));
+                        rows.filter(s => s.name && s.name.toLowerCase() !== 'nan').forEach(s => byId.set(s.id, s));
+                        return [...byId.values()].filter(s => !gone.has(s.id));
+                    });
+                    fetchLogs();
+                } catch (e) {
+                    console.error("Sync failed", e);
+                    refetch();
+                }
+            }, 500);
+        };
+        if (patchable) {
+            syncChanges().then(delta => { watermark = delta.watermark; }).catch(() => {});
         }
-    }, [currentUser]);
+
+        const unsubscribe = subscribeChanges((changes) => {
+            const newLogs = [];
+            for (const change of changes) {
+                if (change.op === 'resync') {
+                    catchUp();
+                } else if (change.table === 'auditlog') {
+                    if (change.op === 'insert') newLogs.push(change.row);
+                } else if (change.table === 'speaker') {
+                    if (!patchable) {
+                        refetch();
+                    } else if (change.op === 'insert') {
+                        if (change.row.name && change.row.name.toLowerCase() !== 'nan') {
+                            setSpeakers(prev => prev.some(s => s.id === change.id) ? prev : [change.row, ...prev]);
+                        }
+                    } else if (change.op === 'update') {
+                        setSpeakers(prev => prev.map(s => s.id === change.id ? { ...s, ...change.values } : s));
+                    } else if (change.op === 'delete') {
+                        setSpeakers(prev => prev.filter(s => s.id !== change.id));
+                    }
+                }
+            }
+            if (newLogs.length) {
+                setActivityLog(prev => [...newLogs.reverse().map(formatLog), ...prev].slice(0, 50));
+            }
+        });
+
+        return () => {
+            unsubscribe();
+            clearTimeout(refetchTimer);
+        };
+    }, [currentUser, filterMode, debouncedSearchTerm]);
 
     useEffect(() => {
         if (!localStorage.getItem('tedx_tour_completed')) {
@@ -462,16 +501,15 @@ const Board = ({ onSwitchMode }) => {
         setUserXP(calculatedXP);
     }, [calculatedXP]);
 
-    const currentLeaderboard = useMemo(() => {
-        return authorizedUsers
-            .map(u => ({ name: u.name, score: u.xp || 0 }))
-            .sort((a, b) => b.score - a.score)
-            .slice(0, 10);
-    }, [authorizedUsers]);
-
-    useEffect(() => {
-        setLeaderboard(currentLeaderboard);
-    }, [currentLeaderboard]);
+    // Top 10 by XP, ranked server-side from the XP ledger
+    const refreshLeaderboard = async () => {
+        try {
+            const data = await getLeaderboard(10);
+            setLeaderboard(data.leaders.map(u => ({ name: u.name, score: u.xp })));
+        } catch (e) {
+            console.error("Failed to fetch leaderboard", e);
+        }
+    };
 
     // Keyboard Shortcuts for Undo/Redo
     useEffect(() => {
@@ -549,17 +587,26 @@ const Board = ({ onSwitchMode }) => {
         setSessionAdds(prev => [newSpeaker, ...prev]);
     };
 
-    const fetchSpeakers = async () => {
+    const speakerParams = () => {
+        const params = {};
+        if (filterMode === 'ME') params.assigned_to_me = true;
+        if (filterMode === 'UNASSIGNED') params.unassigned = true;
+        if (searchTerm) params.search = searchTerm;
+        return params;
+    };
+
+    const visible = (page) => page.filter(s => s && s.name && s.name.toLowerCase() !== 'nan');
+
+    // One page of cards; refetches after edits keep as many rows as "Load more"
+    // had already brought in, a new filter or search starts over at one page.
+    const fetchSpeakers = async ({ keepLoaded = true } = {}) => {
         if (!localStorage.getItem('tedx_token')) return;
         try {
-            const params = {};
-            if (filterMode === 'ME') params.assigned_to_me = true;
-            if (filterMode === 'UNASSIGNED') params.unassigned = true;
-            if (searchTerm) params.search = searchTerm;
-
-            const data = await getSpeakers(params);
-            const sanitized = data.filter(s => s && s.name && s.name.toLowerCase() !== 'nan');
-            setSpeakers(sanitized);
+            const limit = keepLoaded ? Math.max(SPEAKER_PAGE_SIZE, loadedCount.current) : SPEAKER_PAGE_SIZE;
+            const page = await getSpeakers({ ...speakerParams(), limit });
+            loadedCount.current = page.speakers.length;
+            setSpeakers(visible(page.speakers));
+            setNextCursor(page.nextCursor);
         } catch (e) {
             console.error("Failed to fetch", e);
             if (e.response?.status === 401) {
@@ -568,6 +615,24 @@ const Board = ({ onSwitchMode }) => {
         }
     };
 
+    const loadMoreSpeakers = async () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const page = await getSpeakers({ ...speakerParams(), limit: SPEAKER_PAGE_SIZE }, nextCursor);
+            loadedCount.current += page.speakers.length;
+            setSpeakers(prev => {
+                const seen = new Set(prev.map(s => s.id));
+                return [...prev, ...visible(page.speakers).filter(s => !seen.has(s.id))];
+            });
+            setNextCursor(page.nextCursor);
+        } catch (e) {
+            console.error("Failed to load more speakers", e);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleBulkUpdate = async (updates) => {
         const validIds = Array.from(selectedIds)
             .map(id => parseInt(id))
@@ -706,17 +771,12 @@ const Board = ({ onSwitchMode }) => {
         let processed = 0;
 
         try {
-            const { huntEmail } = await import('../api');
-
-            for (const id of validIds) {
-                try {
-                    const result = await huntEmail(id);
-                    if (result.email) found++;
-                } catch (err) {
-                    console.error(`Failed to hunt email for ID ${id}:`, err);
-                }
+            // Results stream in per speaker while the server hunts in parallel
+            await bulkHuntEmails(validIds, (result) => {
                 processed++;
-            }
+                if (result.status === 'success') found++;
+                if (result.status === 'error') console.error(`Failed to hunt email for ID ${result.id}:`, result.error);
+            });
 
             await fetchSpeakers();
             setSelectedIds(new Set());
@@ -828,6 +888,7 @@ const Board = ({ onSwitchMode }) => {
                     setUserXP(u.xp);
                     setStreak(u.streak);
                 });
+                refreshLeaderboard();
                 setActivityLog(prev => [{
                     id: Date.now(),
                     user: currentUser?.name || 'Unknown',
@@ -949,6 +1010,15 @@ const Board = ({ onSwitchMode }) => {
                 <div className="flex items-center gap-4 text-[9px] font-black text-red-500 uppercase tracking-widest bg-red-600/10 px-3 py-1 rounded-full border border-red-600/20">
                     <span className="animate-pulse">● LIVE OPS</span>
                     <span className="text-gray-400 text-[8px] border-l border-white/10 pl-4">{speakers.filter(s => s.status !== 'LOCKED').length} Leads in Pipeline</span>
+                    {nextCursor && (
+                        <button
+                            onClick={loadMoreSpeakers}
+                            disabled={loadingMore}
+                            className="text-gray-300 hover:text-white border-l border-white/10 pl-4 disabled:opacity-50"
+                        >
+                            {loadingMore ? 'Loading...' : 'Load more'}
+                        </button>
+                    )}
                 </div>
             </div>
 
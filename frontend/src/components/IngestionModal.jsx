@@ -1,14 +1,13 @@
 import React, { useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { X, Sparkles, Lightbulb, CheckCircle, AlertCircle } from 'lucide-react';
-import axios from 'axios';
-
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import { ingestAiData } from '../api';
 
 const IngestionModal = ({ onClose }) => {
     const [rawText, setRawText] = useState('');
     const [isProcessing, setIsProcessing] = useState(false);
     const [result, setResult] = useState(null);
+    const [progress, setProgress] = useState(null);
 
     const handleIngest = async () => {
         if (!rawText.trim()) {
@@ -18,20 +17,17 @@ const IngestionModal = ({ onClose }) => {
 
         setIsProcessing(true);
         setResult(null);
+        setProgress(null);
 
         try {
-            const token = localStorage.getItem('tedx_token');
-            const res = await axios.post(`${API_URL}/admin/ingest-ai`,
-                { raw_text: rawText },
-                { headers: { 'Authorization': `Bearer ${token}` } }
-            );
+            const data = await ingestAiData(rawText, setProgress);
 
             setResult({
                 success: true,
-                message: res.data.message,
-                count: res.data.count,
-                skipped: res.data.skipped,
-                duplicates: res.data.duplicates || []
+                message: data.message,
+                count: data.count,
+                skipped: data.skipped_count,
+                duplicates: data.duplicates || []
             });
 
             setRawText('');
@@ -171,7 +167,11 @@ The AI will extract names, domains, locations, and even emails/phones if mention
                                     >
                                         <Sparkles size={14} />
                                     </motion.div>
-                                    Processing...
+                                    {progress?.stage === 'saving'
+                                        ? 'Saving...'
+                                        : progress?.chunks_total > 1
+                                            ? `Extracting ${progress.chunks_done}/${progress.chunks_total}...`
+                                            : 'Processing...'}
                                 </>
                             ) : (
                                 <>
@@ -6,7 +6,7 @@ import {
     User, Sparkles, X, Activity, Users, TrendingUp,
     Pencil, Save, CheckCircle
 } from 'lucide-react';
-import { getSpeakerLogs, assignSpeaker, unassignSpeaker, generateEmail, updateSpeaker, refineEmail, getAiPrompt, huntEmail } from '../api';
+import { getSpeaker, getSpeakerLogs, assignSpeaker, unassignSpeaker, generateEmail, updateSpeaker, refineEmail, getAiPrompt, huntEmail } from '../api';
 import { Copy, Check } from 'lucide-react';
 
 const OutreachModal = ({ speaker, onClose, onUpdate, authorizedUsers = [], currentUser = null }) => {
@@ -56,11 +56,18 @@ const OutreachModal = ({ speaker, onClose, onUpdate, authorizedUsers = [], curre
     }, [speaker]);
 
     useEffect(() => {
-        // Load persisted draft
-        if (speaker.email_draft) {
+        // Load persisted draft (board cards leave it out, so fetch the full row)
+        const loadDraft = (draft) => {
             try {
-                setEmailData(JSON.parse(speaker.email_draft));
+                setEmailData(JSON.parse(draft));
             } catch (e) { console.error("Bad draft json", e); }
+        };
+        if (speaker.email_draft) {
+            loadDraft(speaker.email_draft);
+        } else if (speaker.id) {
+            getSpeaker(speaker.id)
+                .then(full => { if (full.email_draft) loadDraft(full.email_draft); })
+                .catch(e => console.error("Failed to load draft", e));
         }
 
         if (speaker.id) {
@@ -83,7 +90,8 @@ const OutreachModal = ({ speaker, onClose, onUpdate, authorizedUsers = [], curre
     const handleGenerate = async () => {
         setLoading(true);
         try {
-            const data = await generateEmail(speaker.id);
+            // A draft already exists, so the user is asking for a fresh one
+            const data = await generateEmail(speaker.id, Boolean(emailData));
             setEmailData(data);
             onUpdate(speaker.id, { status: 'DRAFTED', email_draft: JSON.stringify(data) });
         } catch (error) {
@@ -643,6 +651,13 @@ const OutreachModal = ({ speaker, onClose, onUpdate, authorizedUsers = [], curre
                                         </div>
 
                                         <div className="space-y-2 mt-auto">
+                                            <button
+                                                onClick={handleGenerate}
+                                                disabled={loading}
+                                                className="w-full py-2 bg-white/5 hover:bg-white/10 border border-white/10 rounded-lg text-sm font-medium transition-colors flex items-center justify-center gap-2"
+                                            >
+                                                <Sparkles size={14} /> {loading ? 'Thinking...' : 'Regenerate Draft'}
+                                            </button>
                                             <button
                                                 onClick={handleDownload}
                                                 className="w-full py-2 bg-white/5 hover:bg-white/10 border border-white/10 rounded-lg text-sm font-medium transition-colors flex items-center justify-center gap-2"
@@ -0,0 +1,96 @@
+"""
+Benchmark: 84-day activity heatmap and 7-day leaderboard, aggregated straight
+from the audit log vs read from the daily ActivityRollup.
+
+Seeds a fresh SQLite database with N audit rows spread over a year and 40
+users, fills the rollup the way the backfill command does, then times both
+queries each way.
+
+Usage (from repo root):  python scripts/bench_activity.py [audit_rows] [repeats]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from sqlalchemy import func, insert, select
+from sqlmodel import SQLModel, create_engine
+from models import AuditLog
+import activity_rollup
+
+ACTIONS = ["MOVE", "UPDATE", "BULK_UPDATE", "ASSIGN", "BOUNTY"]
+XP = [5, 10, 50, 100, 150, 500]
+
+
+def seed(engine, n):
+    rng = random.Random(7)
+    now = datetime.now()
+    users = [f"Member {i}" for i in range(40)]
+    with engine.begin() as conn:
+        for start in range(0, n, 50_000):
+            rows = []
+            for _ in range(min(50_000, n - start)):
+                action = rng.choice(ACTIONS)
+                details = f"Moved someone (+{rng.choice(XP)} XP)" if action == "MOVE" else "Updated profile"
+                rows.append({"user_name": rng.choice(users), "action": action, "details": details,
+                             "timestamp": now - timedelta(seconds=rng.randrange(365 * 86400))})
+            conn.execute(insert(AuditLog.__table__), rows)
+
+
+def from_audit_log(conn):
+    """The same two views aggregated from the raw log"""
+    heat_start = datetime.combine(date.today() - timedelta(days=83), datetime.min.time())
+    day = func.date(AuditLog.timestamp)
+    heat = conn.execute(select(day, func.count()).where(AuditLog.timestamp >= heat_start).group_by(day)).all()
+    week_start = datetime.combine(date.today() - timedelta(days=6), datetime.min.time())
+    week = conn.execute(
+        select(AuditLog.user_name, AuditLog.details).where(AuditLog.timestamp >= week_start)
+    ).all()
+    scores = {}
+    for name, details in week:
+        match = activity_rollup.XP_PATTERN.search(details or "")
+        scores[name] = scores.get(name, 0) + (int(match.group(1)) if match else 0)
+    return heat, sorted(scores.items(), key=lambda kv: -kv[1])
+
+
+def from_rollup(conn):
+    return activity_rollup.heatmap(conn, 84), activity_rollup.leaders(conn, 7)
+
+
+def time_it(engine, fn, repeats):
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn(conn)
+        return (time.perf_counter() - start) / repeats
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'activity.db')}")
+        SQLModel.metadata.create_all(engine)
+        start = time.perf_counter()
+        seed(engine, n)
+        print(f"Seeded {n:,} audit rows in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            rows = activity_rollup.rebuild(conn)
+        print(f"Backfill: {rows:,} rollup rows in {time.perf_counter() - start:.1f}s")
+
+        raw = time_it(engine, from_audit_log, repeats)
+        rolled = time_it(engine, from_rollup, repeats)
+        print(f"{'heatmap + leaderboard':<24}{'audit log':>12}{'rollup':>12}{'speedup':>10}")
+        print(f"{'per request':<24}{raw * 1000:>10.1f}ms{rolled * 1000:>10.2f}ms{raw / rolled:>9.0f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
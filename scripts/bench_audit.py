@@ -0,0 +1,79 @@
+"""
+Benchmark: audit-logged writes, legacy commit-then-log vs the audit module's
+"transaction" and "buffered" durability modes.
+
+Each write updates one speaker and logs it, the way assign_speaker does, on
+a fresh SQLite file database (so every commit pays for a real fsync).
+
+Usage (from repo root):  python scripts/bench_audit.py [writes]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select, func
+from models import AuditLog, Speaker
+import audit
+
+
+def legacy(session, speaker):
+    speaker.last_updated = datetime.now()
+    session.add(speaker)
+    session.commit()
+    session.add(AuditLog(user_name="Bench", action="ASSIGN_SPEAKER", details=f"Assigned {speaker.name}", speaker_id=speaker.id))
+    session.commit()
+
+
+def recorded(session, speaker):
+    speaker.last_updated = datetime.now()
+    session.add(speaker)
+    audit.record(session, "Bench", "ASSIGN_SPEAKER", f"Assigned {speaker.name}", speaker_id=speaker.id)
+    session.commit()
+
+
+def run(writes, durability, write):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'audit.db')}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add_all(Speaker(name=f"Speaker {i}") for i in range(100))
+            session.commit()
+        commits = []
+        event.listen(engine, "commit", lambda conn: commits.append(1))
+
+        audit.writer = audit.AuditWriter(durability=durability)
+        if durability == "buffered":
+            audit.writer.task = object()  # as if the lifespan task were running; flushed below
+        start = time.perf_counter()
+        with Session(engine) as session:
+            speakers = session.exec(select(Speaker)).all()
+            for i in range(writes):
+                write(session, speakers[i % len(speakers)])
+        audit.writer.flush()
+        elapsed = time.perf_counter() - start
+        with Session(engine) as session:
+            assert session.exec(select(func.count()).select_from(AuditLog)).one() == writes
+        engine.dispose()
+        return elapsed, len(commits)
+
+
+def main():
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    print(f"{writes:,} logged writes")
+    print(f"{'mode':<28}{'writes/s':>10}{'commits':>10}")
+    for label, durability, write in [
+        ("commit, then log (legacy)", "transaction", legacy),
+        ("transaction", "transaction", recorded),
+        ("buffered", "buffered", recorded),
+    ]:
+        elapsed, commits = run(writes, durability, write)
+        print(f"{label:<28}{writes / elapsed:>10,.0f}{commits:>10,}")
+
+
+if __name__ == "__main__":
+    main()
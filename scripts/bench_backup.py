@@ -0,0 +1,155 @@
+"""
+Benchmark: full backup export and restore, the in-memory JSON dict
+(GET /admin/backup, POST /admin/restore) vs the streaming gzip NDJSON
+export and batched restore in backend/backup.py.
+
+Seeds a SQLite database with speakers and a large audit log, then measures
+wall time and peak Python memory (tracemalloc) of each export, and wall time
+of restoring each format into a fresh database. A delta export after a
+small batch of changes shows the nightly incremental cost.
+
+Usage (from repo root):  python scripts/bench_backup.py [audit_rows]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from datetime import datetime
+from sqlmodel import SQLModel, Session, create_engine, select
+from models import Speaker, AuditLog, AuthorizedUser
+from backup import stream_backup, write_backup, restore_backup
+
+SPEAKERS = 5000
+
+
+def seed(engine, audit_rows):
+    raw = engine.raw_connection()
+    cur = raw.cursor()
+    cur.executemany(
+        "INSERT INTO speaker (name, status, last_updated, is_bounty, priority, search_details) "
+        "VALUES (?, 'SCOUTED', '2026-01-01 00:00:00', 0, 'MEDIUM', ?)",
+        ((f"Speaker {i}", "Founder and para-athlete; " * 8) for i in range(SPEAKERS))
+    )
+    cur.executemany(
+        "INSERT INTO auditlog (user_name, action, details, speaker_id, timestamp) "
+        "VALUES ('Admin', 'UPDATE_STATUS', ?, ?, '2026-01-01 10:00:00')",
+        ((f"Moved speaker {i % SPEAKERS} to IN_TALKS", i % SPEAKERS) for i in range(audit_rows))
+    )
+    raw.commit()
+    raw.close()
+
+
+def legacy_export(engine):
+    """What download_backup does: load everything, dump it, serialise the dict"""
+    with Session(engine) as session:
+        data = {
+            "speakers": [s.model_dump() for s in session.exec(select(Speaker)).all()],
+            "logs": [l.model_dump() for l in session.exec(select(AuditLog)).all()],
+            "authorized_users": [u.model_dump() for u in session.exec(select(AuthorizedUser)).all()],
+        }
+        return len(json.dumps(data, default=str).encode())
+
+
+def legacy_restore(engine, data):
+    """What restore_backup in routers/admin.py does: one ORM object per row"""
+    with Session(engine) as session:
+        for s_data in data["speakers"]:
+            for field in ("last_updated", "assigned_at", "due_date", "last_activity"):
+                if s_data.get(field):
+                    s_data[field] = datetime.fromisoformat(s_data[field])
+            session.add(Speaker(**s_data))
+        for u_data in data["authorized_users"]:
+            session.add(AuthorizedUser(**u_data))
+        for l_data in data["logs"]:
+            if l_data.get("timestamp"):
+                l_data["timestamp"] = datetime.fromisoformat(l_data["timestamp"])
+            session.add(AuditLog(**l_data))
+        session.commit()
+
+
+def fresh_engine(tmp, name):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, name)}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def streaming_export(engine):
+    return sum(len(chunk) for chunk in stream_backup(engine))
+
+
+def measure(fn, engine):
+    # Timed and traced separately: tracemalloc slows per-row work a lot
+    start = time.perf_counter()
+    size = fn(engine)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(engine)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    audit_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = fresh_engine(tmp, "bench.db")
+        seed(engine, audit_rows)
+
+        print(f"{SPEAKERS:,} speakers, {audit_rows:,} audit rows")
+        print(f"{'export':<26}{'seconds':>9}{'peak MB':>10}{'output MB':>11}")
+        for label, fn in (("legacy JSON dict", legacy_export), ("streaming NDJSON + gzip", streaming_export)):
+            elapsed, peak, size = measure(fn, engine)
+            print(f"{label:<26}{elapsed:>9.2f}{peak / 2**20:>10.1f}{size / 2**20:>11.1f}")
+
+        # A night's worth of changes, then a delta from the watermark
+        since = datetime.now()
+        raw = engine.raw_connection()
+        raw.execute("UPDATE speaker SET last_updated = ?, notes = 'followed up' WHERE id % 10 = 0",
+                    (datetime.now().isoformat(" "),))
+        raw.executemany(
+            "INSERT INTO auditlog (user_name, action, details, speaker_id, timestamp) VALUES ('Admin', 'UPDATE', 'x', 1, ?)",
+            ((datetime.now().isoformat(" "),) for _ in range(2000))
+        )
+        raw.commit()
+        raw.close()
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in stream_backup(engine, since=since))
+        elapsed = time.perf_counter() - start
+        print(f"{'delta (500 + 2,000 rows)':<26}{elapsed:>9.2f}{'':>10}{size / 2**20:>11.2f}")
+
+        # Restores, each into an empty database
+        with Session(engine) as session:
+            legacy_data = json.loads(json.dumps({
+                "speakers": [s.model_dump() for s in session.exec(select(Speaker)).all()],
+                "logs": [l.model_dump() for l in session.exec(select(AuditLog)).all()],
+                "authorized_users": [],
+            }, default=str))
+        path = os.path.join(tmp, "backup.ndjson.gz")
+        write_backup(engine, path)
+        engine.dispose()
+
+        print(f"\n{'restore':<26}{'seconds':>9}{'rows/s':>10}")
+        rows = SPEAKERS + audit_rows
+        target = fresh_engine(tmp, "legacy_restore.db")
+        start = time.perf_counter()
+        legacy_restore(target, legacy_data)
+        elapsed = time.perf_counter() - start
+        print(f"{'legacy ORM per row':<26}{elapsed:>9.2f}{rows / elapsed:>10,.0f}")
+        target.dispose()
+
+        target = fresh_engine(tmp, "restore.db")
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            restore_backup(target, f)
+        elapsed = time.perf_counter() - start
+        print(f"{'batched NDJSON restore':<26}{elapsed:>9.2f}{rows / elapsed:>10,.0f}")
+        target.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: bulk email hunt, one AI call per speaker vs batched prompts.
+
+Runs hunt_speakers against a local fake Perplexity endpoint whose latency grows
+with the number of speakers in the prompt, and reports upstream calls and wall
+time. The client-side rate limiter uses the normal AI_REQUESTS_PER_MINUTE /
+AI_BURST settings, so the per-speaker loop pays for its extra calls there too.
+
+Usage (from repo root):  python scripts/bench_bulk_hunt.py [speakers] [batch_size]
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("AI_CACHE_PATH", "")
+os.environ.setdefault("PERPLEXITY_API_KEY", "bench")
+
+from sqlmodel import SQLModel, Session, create_engine
+from models import Speaker
+import ai_utils
+from ai_cache import cache
+from routers.ai import hunt_speakers, load_hunt_candidates, hunt_concurrency
+
+BASE_LATENCY = 0.6  # seconds per completion
+PER_SPEAKER_LATENCY = 0.08  # extra search time per speaker in the prompt
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        rows = re.findall(r"^(\d+) \| ([^|]+) \|", prompt, re.M)
+        with self.server.lock:
+            self.server.calls += 1
+        time.sleep(BASE_LATENCY + PER_SPEAKER_LATENCY * max(1, len(rows)))
+        if rows:
+            answer = json.dumps([{"id": int(i), "email": f"speaker{i}@example.com"} for i, _ in rows])
+        else:
+            answer = re.search(r"email address for ([^,\n.]+)", prompt).group(1).strip().replace(" ", ".") + "@example.com"
+        payload = json.dumps({"choices": [{"message": {"content": answer}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def run(engine, rows, batch_size):
+    cache.clear()
+    ai_utils.rate_limiter = ai_utils.TokenBucket()
+
+    async def consume():
+        return [r async for r in hunt_speakers(engine, rows, hunt_concurrency(None), batch_size)]
+
+    start = time.perf_counter()
+    results = asyncio.run(consume())
+    return time.perf_counter() - start, results
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else ai_utils.HUNT_BATCH_SIZE
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ai_utils.PERPLEXITY_API_URL = f"http://127.0.0.1:{server.server_address[1]}/chat/completions"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            speakers = [Speaker(name=f"Sports Leader {i}", primary_domain="SPORTS & CORPORATE LEADERS") for i in range(n)]
+            session.add_all(speakers)
+            session.commit()
+            rows = load_hunt_candidates(session, [s.id for s in speakers])
+
+        print(f"{n} speakers, concurrency {hunt_concurrency(None)}, "
+              f"rate limit {ai_utils.AI_REQUESTS_PER_MINUTE:g}/min (burst {ai_utils.AI_BURST})")
+        print(f"{'mode':<16}{'calls':>8}{'found':>8}{'wall s':>10}")
+        for label, size in (("per-speaker", 1), (f"batched x{batch_size}", batch_size)):
+            server.calls = 0
+            elapsed, results = run(engine, rows, size)
+            found = sum(r["status"] == "success" for r in results)
+            print(f"{label:<16}{server.calls:>8}{found:>8}{elapsed:>10.2f}")
+        engine.dispose()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
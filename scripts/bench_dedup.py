@@ -0,0 +1,106 @@
+"""
+Benchmark: speaker deduplication at 100k rows, exact per-name queries vs the
+fuzzy blocking index in backend/dedup.py.
+
+Half of the 1,000 incoming candidates are spelling/honorific/order variants of
+speakers already on the board; the other half are new people.
+
+Usage (from repo root):  python scripts/bench_dedup.py [rows]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from sqlmodel import SQLModel, Session, create_engine, select
+from models import Speaker
+from dedup import DedupIndex, name_tokens, name_similarity
+
+FIRST = ["Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Ishaan", "Kavya", "Rohan", "Saanvi", "Shital",
+         "Arjun", "Meera", "Kiran", "Neha", "Pranav", "Riya", "Siddharth", "Tara", "Varun", "Zoya"]
+LAST = ["Mahajan", "Mehta", "Rao", "Iyer", "Kapoor", "Nair", "Reddy", "Banerjee", "Chopra", "Deshpande",
+        "Gupta", "Joshi", "Kulkarni", "Menon", "Pillai", "Saxena", "Shetty", "Trivedi", "Verma", "Yadav"]
+CANDIDATES = 1000
+
+
+def synthetic_name(rng):
+    # A made-up middle/family token keeps most full names unique, as on the real board
+    extra = "".join(rng.choice("aeioubdghklmnprstv") for _ in range(rng.randint(4, 7))).title()
+    return f"{rng.choice(FIRST)} {extra} {rng.choice(LAST)}"
+
+
+def variant(rng, name):
+    parts = name.split()
+    kind = rng.randrange(4)
+    if kind == 0:
+        return "Dr. " + name.upper()
+    if kind == 1:
+        return " ".join(reversed(parts))
+    if kind == 2:
+        i = rng.randrange(len(parts))
+        parts[i] = parts[i] + parts[i][-1]  # doubled last letter typo
+        return " ".join(parts)
+    return name + " " + rng.choice(LAST)  # married/family name appended
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(3)
+    names = [synthetic_name(rng) for _ in range(n)]
+    variants = [variant(rng, rng.choice(names)) for _ in range(CANDIDATES // 2)]
+    fresh = [synthetic_name(rng) + " Newcomer" for _ in range(CANDIDATES - len(variants))]
+    candidates = variants + fresh
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        raw = engine.raw_connection()
+        raw.cursor().executemany(
+            "INSERT INTO speaker (name, status, last_updated, is_bounty, priority) "
+            "VALUES (?, 'SCOUTED', '2026-01-01 00:00:00', 0, 'MEDIUM')",
+            ((name,) for name in names)
+        )
+        raw.commit()
+        raw.close()
+
+        with Session(engine) as session:
+            start = time.perf_counter()
+            exact_hits = sum(
+                1 for c in candidates if session.exec(select(Speaker.id).where(Speaker.name == c)).first()
+            )
+            exact_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            index = DedupIndex.from_session(session)
+            build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fuzzy_hits = sum(1 for c in candidates if index.match(c))
+        match_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        groups = index.duplicate_groups()
+        groups_time = time.perf_counter() - start
+
+        # Brute force: score one candidate against every row, extrapolated
+        tokens = [name_tokens(name) for name in names]
+        start = time.perf_counter()
+        probe = name_tokens(candidates[0])
+        for other in tokens:
+            name_similarity(probe, other)
+        brute_per_candidate = time.perf_counter() - start
+        engine.dispose()
+
+    print(f"{n:,} speakers, {CANDIDATES:,} candidates ({len(variants)} near-duplicates)")
+    print(f"  exact SELECT per name     {exact_time * 1000 / CANDIDATES:8.3f} ms/candidate   caught {exact_hits}")
+    print(f"  index build (one query)   {build_time:8.2f} s")
+    print(f"  index match               {match_time * 1000 / CANDIDATES:8.3f} ms/candidate   caught {fuzzy_hits}")
+    print(f"  brute-force fuzzy         {brute_per_candidate * 1000:8.1f} ms/candidate")
+    print(f"  whole-table duplicate scan {groups_time:7.2f} s   ({len(groups)} groups)")
+
+
+if __name__ == "__main__":
+    main()
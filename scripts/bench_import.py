@@ -0,0 +1,97 @@
+"""
+Benchmark: speaker CSV import, legacy iterrows/ORM seed vs backend/importer.py.
+
+Generates a CSV shaped like TEDxXLRI_Master_Speaker_List.csv, imports it into
+a fresh SQLite database both ways, then re-imports it with the new importer to
+time the upsert (update) path.
+
+Usage (from repo root):  python scripts/bench_import.py [rows] [legacy_rows]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+import pandas as pd
+from sqlmodel import SQLModel, Session, create_engine
+from models import Speaker
+from importer import import_file
+
+BATCHES = ["SPORTS & CORPORATE LEADERS", "ARTS & SOCIAL IMPACT", "RURAL INNOVATORS & AGRITECH"]
+CITIES = ["Mumbai", "Delhi", "Jamshedpur", "Bengaluru", "Haryana", "Pune", "National"]
+
+
+def write_csv(path, n):
+    rng = random.Random(5)
+    pd.DataFrame({
+        "Batch": [rng.choice(BATCHES) for _ in range(n)],
+        "ID": range(1, n + 1),
+        "Name": [f"Speaker {i} {rng.choice(['Rao', 'Mehta', 'Iyer', 'Nair'])}" for i in range(n)],
+        "Primary Domain": [rng.choice(["Para-Athletics", "Music", "Agritech", "AI"]) for _ in range(n)],
+        "Blurring Line Angle": ["Sport + technology for the differently-abled"] * n,
+        "Location": [rng.choice(CITIES) for _ in range(n)],
+        "Outreach Priority": [rng.choice(["Tier 1", "Tier 2", "Tier 3"]) for _ in range(n)],
+        "Contact Method": ["TEDx organizer networks"] * n,
+    }).to_csv(path, index=False)
+
+
+def legacy_import(session, path):
+    """The seed loop that used to live in main.py's lifespan"""
+    df = pd.read_csv(path)
+    for _, row in df.iterrows():
+        session.add(Speaker(
+            original_id=str(row.get('S. No.', '')),
+            batch=str(row.get('Batch', '')),
+            name=str(row.get('Name', 'Unknown')),
+            primary_domain=str(row.get('Primary Domain', '')),
+            blurring_line_angle=str(row.get('Blurring Line Angle', '')),
+            location=str(row.get('Location', '')),
+            outreach_priority=str(row.get('Outreach Priority', 'Tier 3')),
+            contact_method=str(row.get('Contact Method', ''))
+        ))
+    session.commit()
+
+
+def fresh_engine(tmp, name):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, name)}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    legacy_n = int(sys.argv[2]) if len(sys.argv) > 2 else min(n, 20_000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path, legacy_path = os.path.join(tmp, "speakers.csv"), os.path.join(tmp, "legacy.csv")
+        write_csv(path, n)
+        write_csv(legacy_path, legacy_n)
+
+        engine = fresh_engine(tmp, "legacy.db")
+        with Session(engine) as session:
+            start = time.perf_counter()
+            legacy_import(session, legacy_path)
+            legacy_time = time.perf_counter() - start
+        engine.dispose()
+
+        engine = fresh_engine(tmp, "importer.db")
+        with Session(engine) as session:
+            start = time.perf_counter()
+            first = import_file(session, path)
+            insert_time = time.perf_counter() - start
+            start = time.perf_counter()
+            second = import_file(session, path)
+            upsert_time = time.perf_counter() - start
+        engine.dispose()
+
+    print(f"{'path':<28}{'rows':>9}{'seconds':>10}{'rows/s':>10}")
+    print(f"{'legacy iterrows + ORM':<28}{legacy_n:>9,}{legacy_time:>10.2f}{legacy_n / legacy_time:>10,.0f}")
+    print(f"{'importer (insert)':<28}{first['inserted']:>9,}{insert_time:>10.2f}{n / insert_time:>10,.0f}")
+    print(f"{'importer (re-import upsert)':<28}{second['updated']:>9,}{upsert_time:>10.2f}{n / upsert_time:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
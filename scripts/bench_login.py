@@ -0,0 +1,112 @@
+"""
+Benchmark: /login user lookup, legacy full-table first-name scan vs the
+indexed roll_number / first_name_key queries.
+
+Seeds a fresh SQLite database with N authorized users, then times lookups by
+roll number, by first name, and for unknown input (the legacy scan's worst
+case, which every typo or brute-force attempt hits), and finally end-to-end
+POST /login throughput through the app.
+
+Usage (from repo root):  python scripts/bench_login.py [users] [lookups]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("LOGIN_RATE_LIMIT", "1000000/minute")  # measure the handler, not the limiter
+
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine, select
+from models import AuthorizedUser
+from database import get_session
+from main import app
+
+FIRST = ["Aarav", "Riya", "Kabir", "Ananya", "Vihaan", "Isha", "Arjun", "Meera", "Rohan", "Diya"]
+LAST = ["Sharma", "Iyer", "Nair", "Mehta", "Rao", "Gupta", "Das", "Kulkarni"]
+
+
+def legacy_lookup(session, typed):
+    """The /login lookup before first_name_key"""
+    typed = typed.lower().strip()
+    user = session.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == typed)).first()
+    if not user:
+        for u in session.exec(select(AuthorizedUser)).all():
+            if u.name and u.name.split()[0].lower() == typed:
+                return u
+    return user
+
+
+def indexed_lookup(session, typed):
+    typed = typed.lower().strip()
+    user = session.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == typed)).first()
+    if not user:
+        user = session.exec(
+            select(AuthorizedUser).where(AuthorizedUser.first_name_key == typed).order_by(AuthorizedUser.id).limit(1)
+        ).first()
+    return user
+
+
+def seed(engine, n):
+    rng = random.Random(7)
+    with Session(engine) as session:
+        # Unique first names so a first-name hit can land anywhere in the table
+        session.add_all(
+            AuthorizedUser(roll_number=f"b{25000 + i}", name=f"{rng.choice(FIRST)}{i} {rng.choice(LAST)}")
+            for i in range(n)
+        )
+        session.commit()
+        return [(u.roll_number, u.name.split()[0]) for u in session.exec(select(AuthorizedUser))]
+
+
+def time_lookups(engine, lookup, inputs):
+    with Session(engine) as session:
+        start = time.perf_counter()
+        for typed in inputs:
+            lookup(session, typed)
+            session.expunge_all()
+        return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'login.db')}", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        users = seed(engine, n)
+        rng = random.Random(11)
+        picks = [rng.choice(users) for _ in range(lookups)]
+        cases = {
+            "roll number": [roll for roll, _ in picks],
+            "first name": [first for _, first in picks],
+            "unknown": [f"nobody{i}" for i in range(lookups)],
+        }
+
+        print(f"{n:,} users, {lookups:,} lookups per case")
+        print(f"{'case':<14}{'legacy/s':>12}{'indexed/s':>12}{'speedup':>10}")
+        for case, inputs in cases.items():
+            legacy = time_lookups(engine, legacy_lookup, inputs)
+            indexed = time_lookups(engine, indexed_lookup, inputs)
+            print(f"{case:<14}{lookups / legacy:>12,.0f}{lookups / indexed:>12,.0f}{legacy / indexed:>9.1f}x")
+
+        def override_session():
+            with Session(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_session
+        client = TestClient(app)
+        start = time.perf_counter()
+        for _, first in picks:
+            assert client.post("/login", json={"roll_number": first}).status_code == 200
+        elapsed = time.perf_counter() - start
+        app.dependency_overrides.clear()
+        print(f"POST /login by first name: {lookups / elapsed:,.0f} logins/s end to end")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
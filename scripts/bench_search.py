@@ -0,0 +1,87 @@
+"""
+Benchmark: board search latency vs corpus size, ILIKE scan vs FTS5 index.
+
+Usage (from repo root):  python scripts/bench_search.py [sizes...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from sqlmodel import SQLModel, Session, create_engine, select, or_
+from models import Speaker
+import search
+
+# Synthetic vocabulary so that, like real profiles, most words are rare
+_rng = random.Random(1)
+WORDS = ["".join(_rng.choice("abcdefghiklmnoprstuvy") for _ in range(_rng.randint(4, 9))) for _ in range(5000)]
+CITIES = ["Mumbai", "Delhi", "Jamshedpur", "Bengaluru", "Haryana", "Pune", "Chennai", "Kolkata"]
+QUERIES = [WORDS[10], WORDS[200][:4], f"mumbai {WORDS[42]}", WORDS[3000], "zzzz"]
+REPEATS = 20
+
+
+def seed(engine, n):
+    rng = random.Random(7)
+    raw = engine.raw_connection()
+    cur = raw.cursor()
+    cur.executemany(
+        "INSERT INTO speaker (name, primary_domain, location, blurring_line_angle, tags, remarks, "
+        "status, last_updated, is_bounty, priority) VALUES (?, ?, ?, ?, ?, ?, 'SCOUTED', '2026-01-01 00:00:00', 0, 'MEDIUM')",
+        (
+            (
+                f"Speaker {i} {rng.choice(WORDS).title()}",
+                " + ".join(rng.sample(WORDS, 3)),
+                rng.choice(CITIES),
+                " ".join(rng.sample(WORDS, 5)),
+                ",".join(rng.sample(WORDS, 2)),
+                rng.choice(WORDS),
+            )
+            for i in range(n)
+        ),
+    )
+    raw.commit()
+    raw.close()
+
+
+def ilike_query(term):
+    pattern = f"%{term}%"
+    return select(Speaker.id).where(
+        or_(*[getattr(Speaker, c).ilike(pattern) for c in search.SEARCH_COLUMNS])
+    ).limit(300)
+
+
+def time_query(session, build):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for q in QUERIES:
+            session.exec(build(q)).all()
+    return (time.perf_counter() - start) * 1000 / (REPEATS * len(QUERIES))
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [1_000, 10_000, 50_000, 100_000]
+    print(f"{'rows':>8} | {'ILIKE ms/query':>15} | {'FTS ms/query':>13} | speedup")
+    print("-" * 54)
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            SQLModel.metadata.create_all(engine)
+            seed(engine, n)
+            search.setup_search_index(engine)
+
+            def fts_query(term):
+                query, _ = search.apply_search(select(Speaker.id), term, engine)
+                return query.limit(300)
+
+            with Session(engine) as session:
+                scan_ms = time_query(session, ilike_query)
+                fts_ms = time_query(session, fts_query)
+            engine.dispose()
+        print(f"{n:>8} | {scan_ms:>15.2f} | {fts_ms:>13.2f} | {scan_ms / fts_ms:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+
+# The backend modules use flat imports (`from models import ...`) while the
+# app itself imports `backend.migrations`, so both roots need to be importable.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "backend")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Keep the AI response cache in memory so test runs never share answers
+os.environ.setdefault("AI_CACHE_PATH", "")
+
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+
+ADMIN = {"roll_number": "b25001", "username": "Admin", "is_admin": True}
+MEMBER = {"roll_number": "b25002", "username": "Riya Sharma", "is_admin": False}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(request, engine):
+    """
+    (TestClient, engine) on a fresh database with an admin (b25001) and a
+    member (b25002). Signed in as the admin by default; parametrize
+    indirectly with "member" to sign in as the member, or "tokens" to keep
+    the real bearer-token checks.
+    """
+    from fastapi.testclient import TestClient
+
+    import xp
+    from auth_utils import verify_token, verify_admin
+    from database import get_session
+    from main import app
+    from models import AuthorizedUser
+    from user_cache import user_cache
+
+    with Session(engine) as session:
+        session.add(AuthorizedUser(roll_number=ADMIN["roll_number"], name=ADMIN["username"], is_admin=True))
+        session.add(AuthorizedUser(roll_number=MEMBER["roll_number"], name=MEMBER["username"]))
+        session.commit()
+    user_cache.invalidate()
+    xp.leaderboard.invalidate()
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    mode = getattr(request, "param", "admin")
+    if mode == "admin":
+        app.dependency_overrides[verify_token] = lambda: ADMIN
+        app.dependency_overrides[verify_admin] = lambda: ADMIN
+    elif mode == "member":
+        # verify_admin runs for real on top of this and refuses the member
+        app.dependency_overrides[verify_token] = lambda: MEMBER
+    yield TestClient(app), engine
+    app.dependency_overrides.clear()
+    user_cache.invalidate()
+    xp.leaderboard.invalidate()
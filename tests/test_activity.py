@@ -0,0 +1,84 @@
+"""
+Daily activity rollup behind /activity/heatmap and the windowed /leaderboard.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+import activity_rollup
+from models import ActivityRollup, AuditLog, Speaker, OutreachStatus
+
+
+@pytest.fixture
+def client(client):
+    _, engine = client
+    with Session(engine) as session:
+        session.add_all(Speaker(name=f"Speaker {i}", email=f"s{i}@example.com", status=OutreachStatus.EMAIL_ADDED) for i in range(4))
+        session.commit()
+    return client
+
+
+def test_rollup_follows_log_writes_and_serves_heatmap_and_leaderboard(client):
+    test_client, engine = client
+    today, week_ago = datetime.now(), datetime.now() - timedelta(days=6)
+    with Session(engine) as session:
+        session.add(AuditLog(user_name="Riya", action="MOVE", details="Moved A to LOCKED (+500 XP)", timestamp=week_ago))
+        session.add(AuditLog(user_name="Riya", action="MOVE", details="Moved B to IN_TALKS (+150 XP)", timestamp=today - timedelta(days=40)))
+        session.commit()
+
+    # ORM entries (a move worth 50 XP) and Core multi-row inserts (bulk updates)
+    assert test_client.patch("/speakers/1", json={"status": "CONTACT_INITIATED"}).status_code == 200
+    assert test_client.patch("/speakers/bulk", json={"ids": [2, 3], "is_bounty": True}).status_code == 200
+
+    with engine.connect() as conn:
+        assert activity_rollup.check(conn) == []
+        rows = conn.execute(select(ActivityRollup.action, ActivityRollup.count, ActivityRollup.xp)
+                            .where(ActivityRollup.user_name == "Admin", ActivityRollup.day == date.today())
+                            .order_by(ActivityRollup.action)).all()
+    assert [tuple(r) for r in rows] == [("BULK_UPDATE", 3, 0), ("MOVE", 1, 50)]
+
+    heat = test_client.get("/activity/heatmap", params={"days": 7}).json()
+    assert len(heat["days"]) == 7 and heat["to"] == date.today().isoformat()
+    assert [(d["count"], d["xp"]) for d in heat["days"]][::6] == [(1, 500), (4, 50)]
+    assert heat["total"] == 5 and heat["max"] == 4
+    assert test_client.get("/activity/heatmap", params={"days": 7, "user": "b25001", "action": "MOVE"}).json()["total"] == 1
+
+    week = test_client.get("/leaderboard", params={"days": 7}).json()
+    assert [(u["name"], u["xp"], u["actions"]) for u in week["leaders"]] == [("Riya", 500, 1), ("Admin", 50, 4)]
+    assert week["me"] == {"rank": 2, "xp": 50}
+    assert test_client.get("/leaderboard", params={"days": 60}).json()["leaders"][0]["xp"] == 650
+
+    # Deleting log rows can't be followed row by row: the rollup is rebuilt on commit
+    with Session(engine) as session:
+        old = session.exec(select(AuditLog).where(AuditLog.user_name == "Riya")).all()
+        session.delete(old[0])
+        session.commit()
+        session.exec(AuditLog.__table__.delete().where(AuditLog.action == "BULK_UPDATE"))
+        session.commit()
+    with engine.connect() as conn:
+        assert activity_rollup.check(conn) == []
+    assert test_client.get("/activity/heatmap", params={"days": 7}).json()["total"] == 1
+
+
+def test_windowed_leaderboard_tells_namesakes_apart(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        # Another user who is also called "Admin", far ahead this week
+        session.add(AuditLog(user_name="Admin", roll_number="b25003", action="MOVE", details="Moved A to LOCKED (+500 XP)"))
+        session.commit()
+    assert test_client.patch("/speakers/1", json={"status": "CONTACT_INITIATED"}).status_code == 200
+
+    week = test_client.get("/leaderboard", params={"days": 7}).json()
+    assert [(u["roll_number"], u["name"], u["xp"]) for u in week["leaders"]] == [("b25003", "Admin", 500), ("b25001", "Admin", 50)]
+    assert week["me"] == {"rank": 2, "xp": 50}
+    with engine.connect() as conn:
+        assert activity_rollup.check(conn) == []
+
+    # A user's heatmap is theirs alone, plus their older entries logged by name only
+    with Session(engine) as session:
+        session.add(AuditLog(user_name="Admin", action="MOVE", details="Moved B to IN_TALKS (+150 XP)"))
+        session.commit()
+    heat = test_client.get("/activity/heatmap", params={"days": 7, "user": "b25001"}).json()
+    assert heat["total"] == 2 and heat["days"][-1]["xp"] == 200
+    assert test_client.get("/activity/heatmap", params={"days": 7, "user": "b25003"}).json()["days"][-1]["xp"] == 500
@@ -0,0 +1,222 @@
+"""
+Bulk email hunting against a local fake Perplexity server.
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlmodel import Session
+
+import ai_utils
+from models import Speaker
+
+
+class FakePerplexity(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay=0.05, throttle_first=0):
+        super().__init__(("127.0.0.1", 0), FakeHandler)
+        self.delay = delay
+        self.throttle_remaining = throttle_first
+        self.throttle_status = 429
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/chat/completions"
+
+
+def fake_email(name):
+    return None if name.startswith("Ghost") else name.lower().replace(" ", ".") + "@example.com"
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.calls += 1
+            if server.throttle_remaining > 0:
+                server.throttle_remaining -= 1
+                throttled = True
+            else:
+                throttled = False
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        if throttled:
+            self.send_response(server.throttle_status)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        time.sleep(server.delay)
+        prompt = body["messages"][-1]["content"]
+        rows = re.findall(r"^(\d+) \| ([^|]+) \|", prompt, re.M)
+        if rows:
+            # Batched prompt; "Shy" speakers are left out of the reply
+            answer = json.dumps([
+                {"id": int(sid), "email": fake_email(name.strip())}
+                for sid, name in rows if not name.startswith("Shy")
+            ])
+        else:
+            name = re.search(r"email address for ([^,\n.]+)", prompt).group(1).strip()
+            answer = fake_email(name) or "NOT_FOUND"
+        with server.lock:
+            server.in_flight -= 1
+
+        payload = json.dumps({"choices": [{"message": {"content": answer}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    server = FakePerplexity()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("PERPLEXITY_API_KEY", "test-key")
+    monkeypatch.setattr(ai_utils, "PERPLEXITY_API_URL", server.url)
+    monkeypatch.setattr(ai_utils, "rate_limiter", ai_utils.TokenBucket(requests_per_minute=6000, burst=100))
+    monkeypatch.setattr(ai_utils, "AI_RETRY_BASE_DELAY", 0.01)
+    ai_utils.ai_cache.clear()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_call_ai_async_retries_after_429(fake_ai):
+    fake_ai.throttle_remaining = 2
+    answer = asyncio.run(ai_utils.hunt_email_async("Ada Lovelace"))
+    assert answer == "ada.lovelace@example.com"
+    assert fake_ai.calls == 3
+
+
+def test_server_errors_are_retried_with_backoff(fake_ai):
+    fake_ai.throttle_remaining = 2
+    fake_ai.throttle_status = 503
+    assert ai_utils.hunt_email("Ada Lovelace") == "ada.lovelace@example.com"
+    assert fake_ai.calls == 3
+    assert ai_utils.rate_limiter.stats()["retries_5xx"] == 2
+
+
+def test_interactive_lane_goes_before_bulk():
+    bucket = ai_utils.TokenBucket(requests_per_minute=600, burst=1)
+    bucket.acquire()  # drain; the next token arrives in ~0.1s
+    order = []
+
+    def take(priority):
+        bucket.acquire(priority)
+        order.append(priority)
+
+    bulk = threading.Thread(target=take, args=(ai_utils.PRIORITY_BULK,))
+    bulk.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=take, args=(ai_utils.PRIORITY_INTERACTIVE,))
+    interactive.start()
+    bulk.join()
+    interactive.join()
+    assert order == [ai_utils.PRIORITY_INTERACTIVE, ai_utils.PRIORITY_BULK]
+    assert bucket.stats()["queue_depth"] == {"interactive": 0, "bulk": 0}
+
+
+def test_bulk_hunt_streams_results_with_bounded_concurrency(fake_ai, client):
+    test_client, engine = client
+    with Session(engine) as session:
+        speakers = [Speaker(name=f"Person {i}") for i in range(10)]
+        speakers.append(Speaker(name="Ghost Writer"))
+        speakers.append(Speaker(name="Has Email", email="known@example.com"))
+        session.add_all(speakers)
+        session.commit()
+        ids = [s.id for s in speakers]
+
+    response = test_client.post("/bulk-hunt-emails", json={"ids": ids, "concurrency": 3, "batch_size": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    results, summary = lines[:-1], lines[-1]
+    assert summary == {"done": True, "found": 10, "total": 11}
+    assert {r["status"] for r in results} == {"success", "not_found"}
+    assert fake_ai.max_in_flight <= 3
+    assert fake_ai.calls == 11  # the speaker with an email is never hunted
+
+    with Session(engine) as session:
+        person = session.get(Speaker, ids[0])
+        assert person.hunted_email == "person.0@example.com"
+        assert session.get(Speaker, ids[-2]).hunted_email is None
+
+
+def test_repeat_hunts_are_served_from_cache(fake_ai):
+    first = ai_utils.hunt_email("Grace Hopper", "Computing")
+    again = asyncio.run(ai_utils.hunt_email_async("Grace Hopper", "Computing"))
+    assert first == again == "grace.hopper@example.com"
+    assert fake_ai.calls == 1
+
+    ai_utils.hunt_email("Grace Hopper", "Computing", refresh=True)
+    assert fake_ai.calls == 2
+    stats = ai_utils.ai_cache.stats()
+    assert stats["memory_hits"] >= 1 and stats["bypassed"] >= 1
+
+
+def test_identical_in_flight_calls_share_one_request(fake_ai):
+    fake_ai.delay = 0.3
+
+    async def burst():
+        return await asyncio.gather(*[ai_utils.hunt_email_async("Alan Turing", refresh=True) for _ in range(5)])
+
+    assert set(asyncio.run(burst())) == {"alan.turing@example.com"}
+    assert fake_ai.calls == 1
+
+    threads = [threading.Thread(target=ai_utils.hunt_email, args=("Katherine Johnson",), kwargs={"refresh": True})
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert fake_ai.calls == 2
+
+
+def test_batched_hunt_packs_speakers_and_retries_unparsed_rows(fake_ai, client):
+    test_client, engine = client
+    with Session(engine) as session:
+        speakers = [Speaker(name=f"Person {i}") for i in range(9)]
+        speakers.append(Speaker(name="Ghost Writer"))
+        speakers.append(Speaker(name="Shy Guy"))
+        session.add_all(speakers)
+        session.commit()
+        ids = [s.id for s in speakers]
+
+    response = test_client.post("/bulk-hunt-emails", json={"ids": ids, "batch_size": 5})
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    results, summary = lines[:-1], lines[-1]
+    assert summary == {"done": True, "found": 10, "total": 11}
+    assert sorted(r["id"] for r in results) == sorted(ids)
+    # 3 batch prompts plus one single hunt for the row missing from its batch reply
+    assert fake_ai.calls == 4
+
+    with Session(engine) as session:
+        assert session.get(Speaker, ids[-1]).hunted_email == "shy.guy@example.com"
+        assert session.get(Speaker, ids[-2]).hunted_email is None
+
+
+def test_parse_batch_hunt_rejects_bad_rows():
+    raw = """```json
+    [{"id": 1, "email": "a@b.com"}, {"id": 2, "email": null}, {"id": 3, "email": "not an email"},
+     {"id": 4, "email": "x@y.org"}, {"id": 4, "email": "z@y.org"}, {"id": 99, "email": "q@r.io"}]
+    ```"""
+    assert ai_utils.parse_batch_hunt(raw, [1, 2, 3, 4, 5]) == {1: "a@b.com", 2: None}
+    assert ai_utils.parse_batch_hunt("I could not find anything.", [1]) == {}
@@ -0,0 +1,81 @@
+"""
+Audit log writes: same transaction by default, buffered multi-row inserts on request.
+"""
+import asyncio
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+import audit
+from models import AuditLog, Speaker
+
+
+def count_commits(engine):
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    return commits
+
+
+def logged(engine):
+    with Session(engine) as session:
+        return session.exec(select(AuditLog.action).order_by(AuditLog.id)).all()
+
+
+def test_writes_and_their_log_share_one_commit(client):
+    test_client, engine = client
+    commits = count_commits(engine)
+    created = test_client.post("/speakers", json={"name": "Shital Mahajan", "email": "s@example.com"})
+    assert created.status_code == 200
+    assert test_client.post(f"/speakers/{created.json()['id']}/assign", params={"assigned_to": "b25002"}).status_code == 200
+    assert test_client.post("/sponsors", json={"company_name": "Tata Steel"}).status_code == 200
+    assert test_client.post("/admin/users", json={"roll_number": "b25003", "name": "Kabir Rao"}).status_code == 200
+    assert len(commits) == 4
+    assert logged(engine) == ["ADD", "ASSIGN_SPEAKER", "ADD_SPONSOR", "ADD_USER"]
+    with Session(engine) as session:
+        assert session.exec(select(AuditLog.speaker_id).where(AuditLog.action == "ADD")).one() == created.json()["id"]
+
+
+def test_buffered_entries_are_flushed_in_batches_and_dropped_on_rollback(client, monkeypatch):
+    test_client, engine = client
+    writer = audit.AuditWriter(durability="buffered", buffer_size=5)
+    writer.task = object()  # stands in for the background task started by the lifespan hook
+    monkeypatch.setattr(audit, "writer", writer)
+
+    for i in range(3):
+        assert test_client.post("/speakers", json={"name": f"Speaker {i}"}).status_code == 200
+    assert logged(engine) == [] and len(writer.buffer) == 3
+
+    with Session(engine) as session:
+        session.add(Speaker(name="Never saved"))
+        audit.record(session, "Admin", "ADD", "Added speaker Never saved")
+        session.rollback()
+    assert len(writer.buffer) == 3
+
+    inserts = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT INTO auditlog") else None)
+    assert writer.flush() == 3
+    assert logged(engine) == ["ADD"] * 3 and len(inserts) == 1
+
+    # A full buffer is written by the request that filled it
+    ids = [test_client.post("/speakers", json={"name": f"More {i}"}).json()["id"] for i in range(5)]
+    assert len(logged(engine)) == 8 and writer.buffer == []
+    assert writer.stats["inline_flushes"] == 1
+
+    # Shutdown writes whatever is left
+    assert test_client.post(f"/speakers/{ids[0]}/unassign").status_code == 200
+    writer.task = None
+    asyncio.run(writer.stop())
+    assert logged(engine)[-1] == "UNASSIGN_SPEAKER"
+
+
+def test_buffered_mode_without_a_flusher_logs_in_the_callers_transaction(client, monkeypatch):
+    test_client, engine = client
+    writer = audit.AuditWriter(durability="buffered")  # as in a process that never started the flusher
+    monkeypatch.setattr(audit, "writer", writer)
+    commits = count_commits(engine)
+
+    assert test_client.post("/speakers", json={"name": "Shital Mahajan"}).status_code == 200
+    assert test_client.patch("/speakers/bulk", json={"ids": [1], "is_bounty": True}).status_code == 200
+    assert len(commits) == 2
+    assert logged(engine) == ["ADD", "BULK_UPDATE", "BULK_UPDATE"]
+    assert writer.stats["buffered"] == 0 and not writer.buffering
@@ -0,0 +1,102 @@
+"""
+Authentication: cached user checks, revocation and login lookups.
+"""
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from auth_utils import create_access_token
+from models import AuthorizedUser, Speaker, OutreachStatus
+from routers import auth
+
+
+pytestmark = pytest.mark.parametrize("client", ["tokens"], indirect=True)
+
+
+@pytest.fixture
+def client(client):
+    _, engine = client
+    with Session(engine) as session:
+        session.add(Speaker(name="Shital Mahajan", email="shital@example.com", status=OutreachStatus.EMAIL_ADDED))
+        session.commit()
+    return client
+
+
+def bearer(roll, name, is_admin=False):
+    return {"Authorization": f"Bearer {create_access_token({'sub': roll, 'name': name, 'is_admin': is_admin})}"}
+
+
+def test_cached_users_skip_lookups_and_removal_revokes_tokens(client):
+    test_client, engine = client
+    member, admin = bearer("b25002", "Riya"), bearer("b25001", "Admin", True)
+
+    user_lookups = []
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, *args):
+        if "FROM authorizeduser" in statement:
+            user_lookups.append(statement)
+
+    for _ in range(3):
+        assert test_client.get("/logs", headers=member).status_code == 200
+    assert len(user_lookups) == 1
+
+    # XP is awarded without reading the user row
+    moved = test_client.patch("/speakers/1", json={"status": "CONTACT_INITIATED"}, headers=member)
+    assert moved.status_code == 200
+    assert test_client.get("/users/me", headers=member).json()["xp"] == 50
+
+    assert test_client.delete("/admin/users/b25002", headers=admin).status_code == 200
+    revoked = test_client.get("/logs", headers=member)
+    assert revoked.status_code == 401 and revoked.json()["detail"] == "Access revoked"
+
+    # Tokens for rolls that were never authorized are rejected too
+    assert test_client.get("/logs", headers=bearer("b99999", "Nobody")).status_code == 401
+    with Session(engine) as session:
+        assert session.exec(select(AuthorizedUser.roll_number)).all() == ["b25001"]
+
+
+@pytest.fixture
+def limiter():
+    auth.limiter.reset()
+    yield auth.limiter
+    auth.limiter.reset()
+
+
+def test_login_by_roll_or_first_name_is_indexed_and_rate_limited(client, limiter, monkeypatch):
+    test_client, engine = client
+    monkeypatch.setattr(auth, "TRUSTED_PROXIES", 1)
+    headers = {"X-Forwarded-For": "203.0.113.9"}
+    assert test_client.post("/login", json={"roll_number": " B25002 "}, headers=headers).json()["user_name"] == "Riya Sharma"
+    assert test_client.post("/login", json={"roll_number": "RIYA"}, headers=headers).json()["roll_number"] == "b25002"
+    assert test_client.post("/login", json={"roll_number": "riya sharma"}, headers=headers).status_code == 401
+
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT * FROM authorizeduser WHERE first_name_key = 'riya'"
+        ).fetchall()
+    assert "ix_authorizeduser_first_name_key" in str(plan)
+
+    statuses = [test_client.post("/login", json={"roll_number": "nobody"}, headers=headers).status_code for _ in range(20)]
+    assert statuses[-1] == 429 and 401 in statuses
+    # Other clients aren't affected
+    assert test_client.post("/login", json={"roll_number": "riya"}, headers={"X-Forwarded-For": "203.0.113.10"}).status_code == 200
+
+
+def test_spoofed_forwarded_for_does_not_dodge_the_login_limit(client, limiter, monkeypatch, capsys):
+    test_client, _ = client
+    monkeypatch.setattr(auth, "_warned_forwarded", False)
+
+    def attempts(forwarded_for):
+        return [test_client.post("/login", json={"roll_number": "nobody"}, headers={"X-Forwarded-For": f}).status_code
+                for f in forwarded_for]
+
+    # No trusted proxy: the header is ignored and the connection address is limited
+    assert attempts(f"198.51.100.{i}" for i in range(25)).count(429) == 5
+    # ...and the likely missing TRUSTED_PROXIES setting is reported, once
+    assert capsys.readouterr().out.count("TRUSTED_PROXIES is 0") == 1
+
+    # Behind one proxy only the hop it appended counts, whatever the client sent before it
+    limiter.reset()
+    monkeypatch.setattr(auth, "TRUSTED_PROXIES", 1)
+    assert attempts(f"198.51.100.{i}, 203.0.113.20" for i in range(25)).count(429) == 5
+    assert attempts(["203.0.113.21"]) == [401]
@@ -0,0 +1,195 @@
+"""
+Streaming NDJSON backups.
+"""
+import gzip
+import hashlib
+import json
+from datetime import datetime
+
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, delete, func, select
+
+from backup import BACKUP_TABLES, replay
+from models import (
+    AuditLog, AuthorizedUser, CreativeRequest, RestoreProgress, Speaker, Sponsor, SprintDeadline, OutreachStatus, Tombstone
+)
+
+
+def test_stream_backup_covers_all_tables_with_manifest(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add_all(Speaker(name=f"Speaker {i}", status=OutreachStatus.IN_TALKS) for i in range(5))
+        session.add(Sponsor(company_name="Tata Steel", target_amount=250000.5))
+        session.add(CreativeRequest(title="Poster", description="Main stage", requested_by="b25002"))
+        session.add(SprintDeadline(deadline=datetime(2026, 11, 1, 18, 30), created_by="b25001"))
+        session.add_all(AuditLog(user_name="Admin", action="UPDATE", details=f"change {i}") for i in range(30))
+        session.commit()
+
+    response = test_client.get("/admin/backup/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert ".ndjson.gz" in response.headers["content-disposition"]
+
+    lines = gzip.decompress(response.content).decode().splitlines()
+    header, manifest = json.loads(lines[0]), json.loads(lines[-1])
+    assert header["format"] == "tedx-backup" and header["tables"] == list(BACKUP_TABLES)
+    assert manifest["type"] == "manifest"
+
+    rows, digests = {}, {name: hashlib.sha256() for name in BACKUP_TABLES}
+    for line in lines[1:-1]:
+        entry = json.loads(line)
+        rows.setdefault(entry["table"], []).append(entry["row"])
+        digests[entry["table"]].update((line + "\n").encode())
+
+    counts = {name: entry["rows"] for name, entry in manifest["tables"].items()}
+    assert counts == {
+        "authorizeduser": 2, "speaker": 5, "sponsor": 1, "creativeasset": 0,
+        "creativerequest": 1, "sprintdeadline": 1, "auditlog": 30,
+    }
+    assert all(manifest["tables"][name]["sha256"] == digests[name].hexdigest() for name in BACKUP_TABLES)
+
+    assert [r["id"] for r in rows["auditlog"]] == list(range(1, 31))
+    assert rows["speaker"][0]["status"] == "IN_TALKS"
+    assert rows["sprintdeadline"][0]["deadline"] == "2026-11-01T18:30:00"
+    assert rows["sponsor"][0]["target_amount"] == 250000.5
+
+
+@pytest.mark.parametrize("client", ["member"], indirect=True)
+def test_backups_are_admin_only(client):
+    test_client, _ = client
+    assert test_client.get("/admin/backup/stream").status_code == 403
+    assert test_client.post("/admin/restore/stream", files={"file": ("backup.ndjson.gz", b"", "application/gzip")}).status_code == 403
+
+
+def seed_board(engine):
+    before = datetime(2026, 1, 1)
+    with Session(engine) as session:
+        session.add_all(Speaker(name=f"Speaker {i}", status=OutreachStatus.LOCKED, due_date=datetime(2026, 12, i + 1),
+                                last_updated=before) for i in range(8))
+        session.add_all(AuditLog(user_name="Admin", action="UPDATE", details=f"change {i}", timestamp=before)
+                        for i in range(25))
+        session.commit()
+
+
+def restore(test_client, content, **params):
+    return test_client.post("/admin/restore/stream", params=params,
+                            files={"file": ("backup.ndjson.gz", content, "application/gzip")})
+
+
+def test_restore_round_trip_replaces_data_and_rolls_back_bad_files(client):
+    test_client, engine = client
+    seed_board(engine)
+    backup = test_client.get("/admin/backup/stream").content
+
+    synced = test_client.get("/sync", params={"since": datetime(2026, 1, 1).isoformat()}).json()["watermark"]
+    with Session(engine) as session:
+        session.add(Speaker(name="Added after backup"))
+        session.delete(session.get(Speaker, 1))
+        session.commit()
+
+    assert restore(test_client, backup, verify_only=True).json()["ok"]
+    report = restore(test_client, backup, batch_size=100).json()
+    assert report["tables"]["speaker"] == {"restored": 8, "skipped": 0}
+    assert report["tables"]["auditlog"]["restored"] == 25
+
+    with Session(engine) as session:
+        speakers = session.exec(select(Speaker).order_by(Speaker.id)).all()
+        assert [s.name for s in speakers] == [f"Speaker {i}" for i in range(8)]
+        assert speakers[2].status == OutreachStatus.LOCKED and speakers[2].due_date == datetime(2026, 12, 3)
+        # 25 restored rows plus the audit entry for the restore itself
+        assert session.exec(select(func.count()).select_from(AuditLog)).one() == 26
+        # Speaker 1 is back, so its tombstone must not reach /sync clients; they refetch instead
+        assert session.exec(select(Tombstone)).first() is None
+    assert test_client.get("/sync", params={"since": synced}).json()["resync"]
+
+    # A line edited after export fails the checksum and nothing is touched
+    lines = gzip.decompress(backup).decode().splitlines(keepends=True)
+    edited = next(i for i, line in enumerate(lines) if '"Speaker 2"' in line)
+    lines[edited] = lines[edited].replace("Speaker 2", "Speaker Two")
+    tampered = restore(test_client, gzip.compress("".join(lines).encode()))
+    assert tampered.status_code == 400 and "speaker: checksum mismatch" in tampered.json()["detail"]
+    truncated = restore(test_client, gzip.compress("".join(lines[:-1]).encode()))
+    assert truncated.status_code == 400 and "Manifest missing" in truncated.json()["detail"]
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(AuditLog)).one() == 26
+
+
+def test_resume_continues_an_interrupted_restore_only(client):
+    test_client, engine = client
+    seed_board(engine)
+    backup = test_client.get("/admin/backup/stream").content
+
+    # Resuming onto live data would mix it with the backup: refused
+    with Session(engine) as session:
+        session.delete(session.get(Speaker, 8))
+        session.commit()
+    refused = restore(test_client, backup, resume=True)
+    assert refused.status_code == 409 and "already has data" in refused.json()["detail"]
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(Speaker)).one() == 7
+        assert session.exec(select(func.count()).select_from(Tombstone)).one() == 1
+
+    # A resumable restore into an empty database that dies part way through the speakers
+    with Session(engine) as session:
+        for model in (AuditLog, Speaker, AuthorizedUser):
+            session.exec(delete(model))
+        session.commit()
+    lines = gzip.decompress(backup).decode().splitlines(keepends=True)
+    cut = next(i for i, line in enumerate(lines) if '"Speaker 5"' in line)
+    assert restore(test_client, gzip.compress("".join(lines[:cut]).encode()), resume=True).status_code == 400
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(Speaker)).one() == 5
+        assert session.exec(select(RestoreProgress.rows_restored)).one() == 7
+        assert session.exec(select(func.count()).select_from(Tombstone)).one() == 0
+
+    report = restore(test_client, backup, resume=True, batch_size=100).json()
+    assert report["tables"]["authorizeduser"] == {"restored": 0, "skipped": 2}
+    assert report["tables"]["speaker"] == {"restored": 3, "skipped": 5}
+    assert report["tables"]["auditlog"] == {"restored": 25, "skipped": 0}
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(Speaker)).one() == 8
+        assert session.exec(select(RestoreProgress)).first() is None
+        assert session.exec(select(AuditLog.details).where(AuditLog.action == "RESTORE_BACKUP")).one() == \
+            "Restored 28 rows from backup.ndjson.gz (resumed)"
+
+    # Finished: a second resume finds live data again
+    assert restore(test_client, backup, resume=True).status_code == 409
+
+
+def test_delta_backup_replays_changes_and_deletes(client, tmp_path):
+    test_client, engine = client
+    seed_board(engine)
+    base = test_client.get("/admin/backup/stream").content
+    watermark = json.loads(gzip.decompress(base).splitlines()[0])["watermark"]
+
+    with Session(engine) as session:
+        speaker = session.get(Speaker, 2)
+        speaker.notes, speaker.last_updated = "Said yes", datetime.now()
+        session.delete(session.get(Speaker, 5))
+        session.add(AuditLog(user_name="Admin", action="UPDATE", details="late change"))
+        session.add(AuthorizedUser(roll_number="b25009", name="New Member"))
+        session.commit()
+    assert test_client.request("DELETE", "/speakers/bulk", json={"ids": [6, 7]}).json()["count"] == 2
+
+    delta = test_client.get("/admin/backup/delta", params={"since": watermark}).content
+    lines = [json.loads(line) for line in gzip.decompress(delta).splitlines()]
+    assert lines[0]["kind"] == "delta" and lines[0]["full_tables"] == ["authorizeduser", "creativerequest", "sprintdeadline"]
+    counts = {name: entry["rows"] for name, entry in lines[-1]["tables"].items()}
+    assert counts["speaker"] == 1 and counts["tombstone"] == 3 and counts["authorizeduser"] == 3
+    assert counts["auditlog"] == 4  # the late change and the bulk delete entries
+
+    (tmp_path / "base.ndjson.gz").write_bytes(base)
+    (tmp_path / "delta.ndjson.gz").write_bytes(delta)
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    SQLModel.metadata.create_all(replica)
+    replay(replica, str(tmp_path / "base.ndjson.gz"), [str(tmp_path / "delta.ndjson.gz")])
+
+    def snapshot(db):
+        with Session(db) as session:
+            return [
+                [row.model_dump() for row in session.exec(select(model).order_by(model.id))]
+                for model in (Speaker, AuditLog, AuthorizedUser)
+            ]
+    assert snapshot(replica) == snapshot(engine)
+    with Session(replica) as session:
+        assert [s.id for s in session.exec(select(Speaker))] == [1, 2, 3, 4, 8]
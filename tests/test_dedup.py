@@ -0,0 +1,34 @@
+"""
+Fuzzy speaker deduplication index.
+"""
+from dedup import DedupIndex, name_tokens, soundex
+
+
+def test_normalisation_and_phonetics():
+    assert name_tokens("Dr. Shítal  MAHAJAN") == ["mahajan", "shital"]
+    assert name_tokens("Prof. Mahajan, Shital") == ["mahajan", "shital"]
+    assert soundex("robert") == soundex("rupert") == "r163"
+
+
+def test_match_catches_variants_but_not_namesakes():
+    index = DedupIndex()
+    index.add(1, "Dr. Shital Mahajan")
+    index.add(2, "Arjun Mehta", email="arjun@venture.in")
+    index.add(3, "Kiran Rao", linkedin_url="https://www.linkedin.com/in/kiranrao/")
+    index.add(4, "Speaker 3")
+
+    assert index.match("Shital Mahajan Rane")[0][:1] == (1,)
+    assert index.match("MAHAJAN Shital")[0] == (1, 1.0, "name")
+    assert index.match("Arjun Mehtaa")[0][0] == 2
+    assert index.match("A. Mehta", email="Arjun@Venture.in")[0] == (2, 1.0, "email")
+    assert index.match("K. Rao", linkedin_url="linkedin.com/in/KiranRao")[0] == (3, 1.0, "linkedin")
+    assert index.match("Shital Kapoor") == []
+    assert index.match("Speaker 4") == []
+
+
+def test_duplicate_groups_cluster_transitively():
+    index = DedupIndex()
+    for i, name in enumerate(["Shital Mahajan", "Dr. Shital Mahajan", "Shital Mahajan Rane", "Arjun Mehta", "Kiran Rao"]):
+        index.add(i + 1, name)
+    groups = index.duplicate_groups()
+    assert [[s["id"] for s in g["speakers"]] for g in groups] == [[1, 2, 3]]
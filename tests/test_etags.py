@@ -0,0 +1,93 @@
+"""
+Conditional GETs on the list endpoints.
+"""
+import io
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from sqlmodel import Session
+
+from backup import restore_backup, stream_backup
+from models import CreativeAsset, Speaker, Sponsor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_unchanged_lists_revalidate_with_304(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add_all(Speaker(name=f"Speaker {i}") for i in range(3))
+        session.commit()
+
+    first = test_client.get("/speakers")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = test_client.get("/speakers", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+
+    # Another filter of the same table is a different representation
+    assert test_client.get("/speakers", params={"status": "IN_TALKS"}).headers["etag"] != etag
+
+    # Writes to other tables leave the speaker list's tag alone
+    with Session(engine) as session:
+        session.add(Sponsor(company_name="Tata Steel"))
+        session.commit()
+    assert test_client.get("/speakers", headers={"If-None-Match": etag}).status_code == 304
+
+    assert test_client.patch("/speakers/1", json={"notes": "Called back"}).status_code == 200
+    changed = test_client.get("/speakers", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert next(s for s in changed.json() if s["id"] == 1)["notes"] == "Called back"
+
+
+def test_writes_from_other_processes_change_the_tag(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add(Speaker(name="Shital Mahajan"))
+        session.commit()
+    etag = test_client.get("/speakers").headers["etag"]
+
+    # What the standalone job worker does: its own process, engine and session
+    worker = textwrap.dedent(f"""
+        import sys
+        sys.path[:0] = {[os.path.join(ROOT, "backend"), ROOT]!r}
+        from sqlmodel import Session, create_engine
+        import changes
+        from models import Speaker
+        with Session(create_engine({str(engine.url)!r})) as session:
+            speaker = session.get(Speaker, 1)
+            speaker.hunted_email = "shital@example.com"
+            session.add(speaker)
+            session.commit()
+    """)
+    subprocess.run([sys.executable, "-c", worker], check=True, cwd=ROOT)
+    changed = test_client.get("/speakers", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()[0]["hunted_email"] == "shital@example.com"
+
+    # Restores run on a bare connection (as the backup.py CLI does)
+    etag = changed.headers["etag"]
+    backup = io.BytesIO(b"".join(stream_backup(engine)))
+    restore_backup(engine, backup)
+    assert test_client.get("/speakers", headers={"If-None-Match": etag}).status_code == 200
+
+
+@pytest.mark.parametrize("client", ["tokens"], indirect=True)
+def test_etags_leave_each_lists_own_auth_alone(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add(CreativeAsset(title="Speaker reveal poster"))
+        session.commit()
+
+    # /creatives has always been public; its ETag doesn't change that
+    public = test_client.get("/creatives")
+    assert public.status_code == 200 and len(public.json()) == 1
+    assert test_client.get("/creatives", headers={"If-None-Match": public.headers["etag"]}).status_code == 304
+
+    for path in ("/speakers", "/sponsors", "/logs", "/creative-requests"):
+        assert test_client.get(path).status_code in (401, 403)
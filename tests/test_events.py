@@ -0,0 +1,79 @@
+"""
+Change feed: session hooks -> broadcast hub -> subscriber queues.
+"""
+import asyncio
+import json
+
+from sqlmodel import SQLModel, Session, create_engine
+
+import changes  # noqa: F401 - registers the session hooks
+from events import ChangeHub, hub
+from models import AuditLog, Speaker, OutreachStatus
+
+
+def drain(subscriber):
+    events = []
+    while not subscriber.queue.empty():
+        seq, data = subscriber.queue.get_nowait()
+        events.append(json.loads(data)["changes"])
+    return events
+
+
+def test_commits_publish_row_diffs_and_rollbacks_publish_nothing(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+
+    def write():
+        with Session(engine) as session:
+            speaker = Speaker(name="Shital Mahajan")
+            session.add(speaker)
+            session.commit()
+            speaker.status = OutreachStatus.IN_TALKS
+            session.add(AuditLog(user_name="Admin", action="UPDATE_STATUS", details="Moved", speaker_id=speaker.id))
+            session.commit()
+            speaker.notes = "never saved"
+            session.flush()
+            session.rollback()
+            session.delete(session.get(Speaker, speaker.id))
+            session.commit()
+
+    async def run():
+        subscriber = hub.subscribe()
+        try:
+            await asyncio.to_thread(write)
+            await asyncio.sleep(0.05)  # fan-out is scheduled onto the loop
+            return drain(subscriber)
+        finally:
+            hub.unsubscribe(subscriber)
+
+    inserted, updated, deleted = asyncio.run(run())
+    assert inserted[0]["op"] == "insert" and inserted[0]["row"]["name"] == "Shital Mahajan"
+    update = next(c for c in updated if c["op"] == "update")
+    assert update["values"] == {"status": "IN_TALKS"}
+    assert any(c["op"] == "insert" and c["table"] == "auditlog" for c in updated)
+    assert deleted == [{"op": "delete", "table": "speaker", "id": inserted[0]["id"]}]
+
+
+def test_slow_clients_get_a_resync_and_reconnects_replay_history():
+    async def run():
+        local = ChangeHub(queue_size=3, history=10)
+        slow = local.subscribe()
+        for i in range(5):
+            local.publish([{"op": "update", "table": "speaker", "id": i, "values": {}}])
+        await asyncio.sleep(0)
+        slow_events = drain(slow)
+
+        # Reconnecting after event 3 replays 4 and 5 only
+        resumed = local.subscribe(f"{local.epoch}:3")
+        replayed = [c[0]["id"] for c in drain(resumed)]
+
+        # Ids from another process (or too old for the history) force a refetch
+        stale = local.subscribe("0000:3")
+        return slow_events, replayed, drain(stale), local.metrics()
+
+    slow_events, replayed, stale_events, metrics = asyncio.run(run())
+    # The backlog is replaced by one resync; later events follow it
+    assert slow_events == [[{"op": "resync"}], [{"op": "update", "table": "speaker", "id": 4, "values": {}}]]
+    assert replayed == [3, 4]
+    assert stale_events == [[{"op": "resync"}]]
+    assert metrics["overflows"] >= 1 and metrics["subscribers"] == 3
@@ -0,0 +1,70 @@
+"""
+CSV/Excel speaker importer.
+"""
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from models import AuditLog, Speaker, OutreachStatus
+
+CSV = """Batch,ID,Name,Primary Domain,Location,Outreach Priority,Email,Favourite Colour
+SPORTS,1,Shital Mahajan Rane,Adventure Sports,National,Tier 1,shital@example.com,blue
+,,,,,,,
+SPORTS,2,  Sumit   Antil ,Para-Athletics,Haryana,,,
+ARTS,3,Purbayan Chatterjee,Music,Kolkata,Tier 2,not-an-email,
+ARTS,4,shital mahajan rane,Duplicate,Pune,Tier 2,,
+ARTS,5,,Nameless,Delhi,Tier 3,,
+"""
+
+
+def upload(test_client, content, **params):
+    return test_client.post("/admin/import", params=params, files={"file": ("speakers.csv", content, "text/csv")})
+
+
+def test_import_validates_maps_and_reports_rows(client):
+    test_client, engine = client
+
+    preview = upload(test_client, CSV, dry_run=True).json()
+    assert preview["inserted"] == 2 and preview["dry_run"]
+    with Session(engine) as session:
+        assert session.exec(select(Speaker)).first() is None
+
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    report = upload(test_client, CSV).json()
+    assert len(commits) == 1  # the speakers and their audit entry together
+    assert (report["total_rows"], report["inserted"], report["updated"], report["blank_rows"]) == (6, 2, 0, 1)
+    assert [(e["row"], e["error"]) for e in report["errors"]] == [
+        (5, "Invalid email"), (6, "Duplicate of line 2"), (7, "Missing name")
+    ]
+    assert report["unknown_columns"] == ["Favourite Colour"]
+
+    with Session(engine) as session:
+        shital = session.exec(select(Speaker).where(Speaker.original_id == "1")).one()
+        assert (shital.batch, shital.email, shital.outreach_priority) == ("SPORTS", "shital@example.com", "Tier 1")
+        sumit = session.exec(select(Speaker).where(Speaker.original_id == "2")).one()
+        assert (sumit.name, sumit.outreach_priority, sumit.status) == ("Sumit Antil", "Tier 3", OutreachStatus.SCOUTED)
+        logged = session.exec(select(AuditLog).where(AuditLog.action == "IMPORT_SPEAKERS")).one()
+        assert logged.details == "Imported speakers.csv: 2 new, 0 updated, 3 skipped"
+
+
+def test_reimport_upserts_without_blanking_fields(client):
+    test_client, engine = client
+    upload(test_client, CSV)
+    with Session(engine) as session:
+        shital = session.exec(select(Speaker).where(Speaker.original_id == "1")).one()
+        shital.status = OutreachStatus.IN_TALKS
+        session.add(shital)
+        session.commit()
+
+    report = upload(test_client, "Name,Location,Email\nSHITAL MAHAJAN RANE,Mumbai,\nNew Person,Goa,\n").json()
+    assert (report["inserted"], report["updated"]) == (1, 1)
+    with Session(engine) as session:
+        shital = session.exec(select(Speaker).where(Speaker.original_id == "1")).one()
+        assert (shital.location, shital.email, shital.status) == ("Mumbai", "shital@example.com", OutreachStatus.IN_TALKS)
+        assert len(session.exec(select(Speaker)).all()) == 3
+
+
+def test_missing_name_column_is_rejected(client):
+    test_client, _ = client
+    response = upload(test_client, "Batch,Domain\nX,Y\n")
+    assert response.status_code == 400
@@ -0,0 +1,71 @@
+"""
+Chunked AI ingestion: splitting, cross-chunk merging and set-based dedup.
+"""
+import asyncio
+import json
+import re
+
+from sqlmodel import Session, select
+
+import ingest
+from models import Speaker
+
+USER = {"roll_number": "b25001", "username": "Tester", "is_admin": True}
+
+
+def dump(n):
+    return "\n\n".join(
+        f"Name: Person {i}\nRole: Founder of Venture {i}, based in Pune. Email: person{i}@example.com"
+        for i in range(n)
+    )
+
+
+def test_split_chunks_overlap_and_cover_text():
+    text = dump(200)
+    chunks = ingest.split_chunks(text, size=2000, overlap=300)
+    assert len(chunks) > 1
+    assert all(len(c) <= 2000 for c in chunks)
+    for name in re.findall(r"Name: (Person \d+)", text):
+        assert any(f"Name: {name}\n" in c for c in chunks)
+    # consecutive chunks share text
+    assert all(a[-100:].split()[-1] in b for a, b in zip(chunks, chunks[1:]))
+    assert ingest.split_chunks("short text") == ["short text"]
+    assert ingest.split_chunks("   ") == []
+
+
+def test_run_ingest_merges_chunks_and_skips_existing(engine, monkeypatch):
+    calls = []
+
+    async def fake_call_ai_async(prompt, **kwargs):
+        calls.append(prompt)
+        body = prompt.split("Raw Text:")[1]
+        people = re.findall(r"Name: (Person \d+)\nRole: ([^,]+)", body)
+        return "```json\n" + json.dumps([
+            {"name": name, "primary_domain": role, "email": f"{name.lower().replace(' ', '')}@example.com"}
+            for name, role in people
+        ]) + "\n```"
+
+    monkeypatch.setattr(ingest, "call_ai_async", fake_call_ai_async)
+    monkeypatch.setattr(ingest, "INGEST_CHUNK_CHARS", 3000)
+
+    with Session(engine) as session:
+        session.add(Speaker(name="person 3"))
+        session.add(Speaker(name="Someone Else", email="person7@example.com"))
+        session.commit()
+
+    updates = []
+    with Session(engine) as session:
+        result = asyncio.run(ingest.run_ingest(session, dump(120), USER, updates.append))
+
+    assert result["chunks"] == len(calls) > 1
+    assert result["count"] == 118
+    assert {d["name"]: d["reason"] for d in result["duplicates"]} == {"Person 3": "name", "Person 7": "email"}
+    assert updates[-1]["stage"] == "saving"
+    assert updates[-2]["chunks_done"] == updates[-2]["chunks_total"] == len(calls)
+
+    with Session(engine) as session:
+        names = session.exec(select(Speaker.name)).all()
+        assert len(names) == len(set(n.lower() for n in names)) == 120
+        person = session.exec(select(Speaker).where(Speaker.name == "Person 42")).one()
+        assert person.primary_domain == "Founder of Venture 42"
+        assert person.assigned_by == "b25001"
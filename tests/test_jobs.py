@@ -0,0 +1,162 @@
+"""
+Background job queue: claiming, running and recovering orphaned jobs.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+import jobs
+from models import Job, JobStatus, Speaker
+
+USER = {"roll_number": "b25001", "username": "Tester", "is_admin": False}
+
+
+@jobs.job_handler("test_echo")
+def echo_job(session, payload, user, progress):
+    progress({"step": 1})
+    if payload.get("fail"):
+        raise HTTPException(status_code=429, detail="AI Rate Limit exceeded")
+    return {"echo": payload["value"], "by": user["roll_number"]}
+
+
+def run_once(engine):
+    job = jobs.claim_next(engine)
+    assert job is not None
+    asyncio.run(jobs.run_job(job, engine))
+    with Session(engine) as session:
+        return jobs.job_to_dict(session.get(Job, job.id))
+
+
+def test_job_runs_and_records_result(engine):
+    with Session(engine) as session:
+        ok = jobs.enqueue(session, "test_echo", {"value": 42}, USER)
+        bad = jobs.enqueue(session, "test_echo", {"value": 0, "fail": True}, USER)
+        assert ok.status == JobStatus.QUEUED
+
+    done = run_once(engine)
+    assert done["id"] == ok.id
+    assert done["status"] == JobStatus.SUCCEEDED
+    assert done["result"] == {"echo": 42, "by": "b25001"}
+    assert done["progress"] == {"step": 1}
+
+    failed = run_once(engine)
+    assert failed["id"] == bad.id
+    assert failed["status"] == JobStatus.FAILED
+    assert failed["error"] == "AI Rate Limit exceeded"
+    assert jobs.claim_next(engine) is None
+
+
+def test_unknown_kind_is_rejected(engine):
+    with Session(engine) as session:
+        with pytest.raises(HTTPException):
+            jobs.enqueue(session, "does_not_exist", {}, USER)
+
+
+def test_orphaned_job_is_requeued_after_restart(engine):
+    with Session(engine) as session:
+        job = jobs.enqueue(session, "test_echo", {"value": 7}, USER)
+
+    # A worker claims the job and the process dies before finishing it
+    claimed = jobs.claim_next(engine)
+    assert claimed.id == job.id
+    assert jobs.claim_next(engine) is None
+
+    stale = datetime.now() - timedelta(seconds=jobs.JOB_LEASE_SECONDS + 5)
+    with Session(engine) as session:
+        session.exec(update(Job).where(Job.id == job.id).values(heartbeat_at=stale))
+        session.commit()
+
+    assert jobs.requeue_orphans(engine) == 1
+    done = run_once(engine)
+    assert done["status"] == JobStatus.SUCCEEDED
+    assert done["attempts"] == 2
+
+
+def test_dedupe_key_reuses_active_job(engine):
+    with Session(engine) as session:
+        first = jobs.enqueue(session, "test_echo", {"value": 1}, USER, dedupe_key="test_echo:7")
+        again = jobs.enqueue(session, "test_echo", {"value": 1}, USER, dedupe_key="test_echo:7")
+        other = jobs.enqueue(session, "test_echo", {"value": 2}, USER, dedupe_key="test_echo:8")
+        assert again.id == first.id
+        assert other.id != first.id
+
+    run_once(engine)
+    with Session(engine) as session:
+        fresh = jobs.enqueue(session, "test_echo", {"value": 1}, USER, dedupe_key="test_echo:7")
+        assert fresh.id not in (first.id, other.id)
+
+
+def test_racing_enqueues_share_one_job(engine, monkeypatch):
+    with Session(engine) as session:
+        first = jobs.enqueue(session, "test_echo", {"value": 1}, USER, dedupe_key="test_echo:7")
+
+    # A second click whose check ran before the first insert committed
+    real_find_active, checks = jobs.find_active, []
+    def raced(session, dedupe_key):
+        checks.append(dedupe_key)
+        return None if len(checks) == 1 else real_find_active(session, dedupe_key)
+    monkeypatch.setattr(jobs, "find_active", raced)
+
+    with Session(engine) as session:
+        again = jobs.enqueue(session, "test_echo", {"value": 1}, USER, dedupe_key="test_echo:7")
+        assert again.id == first.id and len(checks) == 2
+        assert len(session.exec(select(Job)).all()) == 1
+
+
+@pytest.mark.parametrize("client", ["member"], indirect=True)
+def test_jobs_are_visible_to_their_requester_only(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        theirs = jobs.enqueue(session, "test_echo", {"value": 1}, USER).id
+        mine = jobs.enqueue(session, "test_echo", {"value": 2}, {"roll_number": "b25002"}).id
+
+    assert test_client.get(f"/jobs/{theirs}").status_code == 403
+    # A per-speaker job is shared with everyone whose click was deduplicated into it
+    with Session(engine) as session:
+        shared = jobs.enqueue(session, "test_echo", {"value": 3}, USER, dedupe_key="test_echo:9").id
+    assert test_client.get(f"/jobs/{shared}").status_code == 200
+    assert test_client.get(f"/jobs/{mine}").json()["created_by"] == "b25002"
+    assert test_client.get("/jobs/999").status_code == 404
+
+
+def test_admins_can_view_any_job(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        job = jobs.enqueue(session, "test_echo", {"value": 1}, {"roll_number": "b25002"})
+    assert test_client.get(f"/jobs/{job.id}").status_code == 200
+
+
+def test_posted_jobs_get_the_payload_checks_and_dedupe_of_their_route(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add(Speaker(name="Shital Mahajan"))
+        session.commit()
+
+    assert test_client.post("/jobs", json={"kind": "hunt_email", "payload": {}}).status_code == 400
+    bad = test_client.post("/jobs", json={"kind": "generate_email", "payload": {"speaker_id": "first"}})
+    assert bad.status_code == 400 and bad.json()["detail"].startswith("Invalid generate_email payload: speaker_id")
+
+    routed = test_client.post("/hunt-email", params={"speaker_id": 1}).json()["job_id"]
+    posted = test_client.post("/jobs", json={"kind": "hunt_email", "payload": {"speaker_id": 1}})
+    assert posted.status_code == 202 and posted.json()["id"] == routed
+    with Session(engine) as session:
+        assert session.exec(select(Job.dedupe_key)).all() == ["hunt_email:1"]
+
+
+@pytest.mark.parametrize("client", ["member"], indirect=True)
+def test_repeated_job_posts_for_one_speaker_share_a_job(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add_all([Speaker(name="Shital Mahajan"), Speaker(name="Sumit Antil")])
+        session.commit()
+
+    first, again, other = (
+        test_client.post("/jobs", json={"kind": "hunt_email", "payload": {"speaker_id": sid}}).json()["id"]
+        for sid in (1, 1, 2)
+    )
+    assert again == first and other != first
+    assert test_client.get(f"/jobs/{first}").status_code == 200
@@ -0,0 +1,167 @@
+"""
+Query-plan regression suite for the board and activity-log queries.
+
+Seeds a realistic volume of speakers and audit rows into a throwaway SQLite
+database, runs the real endpoint functions, captures the SQL they emit and
+checks EXPLAIN QUERY PLAN to make sure every access path is index-driven.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+
+from models import OutreachStatus
+from routers.speakers import read_speakers, get_speaker_logs
+
+SPEAKER_ROWS = 100_000
+AUDIT_ROWS = 1_000_000
+ASSIGNEES = [f"b25{n:03d}" for n in range(40)]
+USER = {"roll_number": "b25001", "username": "Tester", "is_admin": True}
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("plans") / "plans.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+
+    rng = random.Random(42)
+    start = datetime(2025, 6, 1)
+    statuses = [s.name for s in OutreachStatus]
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.executemany(
+            "INSERT INTO speaker (name, status, assigned_to, last_updated, is_bounty, priority) "
+            "VALUES (?, ?, ?, ?, 0, 'MEDIUM')",
+            (
+                (
+                    f"Speaker {i}",
+                    rng.choice(statuses),
+                    rng.choice(ASSIGNEES) if rng.random() < 0.6 else None,
+                    (start + timedelta(seconds=rng.randrange(20_000_000))).isoformat(sep=" "),
+                )
+                for i in range(SPEAKER_ROWS)
+            ),
+        )
+        cur.executemany(
+            "INSERT INTO auditlog (user_name, action, details, speaker_id, timestamp) VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    "Tester",
+                    "UPDATE",
+                    "seed",
+                    rng.randrange(1, SPEAKER_ROWS + 1),
+                    (start + timedelta(seconds=i * 20)).isoformat(sep=" "),
+                )
+                for i in range(AUDIT_ROWS)
+            ),
+        )
+        cur.execute("ANALYZE")
+        raw.commit()
+    finally:
+        raw.close()
+    return engine
+
+
+def capture_plans(engine, fn, **kwargs):
+    """Runs an endpoint function and returns the query plan of every SELECT it issued."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as session:
+            fn(session=session, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert statements, "endpoint issued no SELECT"
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plans.append([row[-1] for row in rows])
+    return plans
+
+
+def assert_index_driven(plans, seek=True):
+    """
+    "SCAN t" on its own is a full table scan and a TEMP B-TREE means a sort.
+    Unfiltered listings may walk an index in order ("SCAN t USING INDEX", cut
+    short by LIMIT); filtered ones must seek into an index ("SEARCH").
+    """
+    for plan in plans:
+        for step in plan:
+            assert not (step.startswith("SCAN") and "USING" not in step), plan
+            assert "TEMP B-TREE" not in step, plan
+            if seek:
+                assert not step.startswith("SCAN"), plan
+
+
+BOARD_QUERIES = {
+    "status": {"status": OutreachStatus.DRAFTED.value},
+    "assigned_to": {"assigned_to": "b25007"},
+    "assigned_to_me": {"assigned_to_me": True},
+    "unassigned": {"unassigned": True},
+}
+UNFILTERED_QUERIES = {
+    "default": {},
+    "card_projection": {"fields": "card"},
+}
+
+
+@pytest.mark.parametrize("name", list(BOARD_QUERIES))
+def test_board_queries_use_indexes(engine, name):
+    plans = capture_plans(
+        engine, read_speakers, response=Response(), user=USER, limit=300, **BOARD_QUERIES[name]
+    )
+    assert_index_driven(plans)
+
+
+@pytest.mark.parametrize("name", list(UNFILTERED_QUERIES))
+def test_unfiltered_board_queries_walk_index(engine, name):
+    plans = capture_plans(
+        engine, read_speakers, response=Response(), user=USER, limit=300, **UNFILTERED_QUERIES[name]
+    )
+    assert_index_driven(plans, seek=False)
+
+
+def test_board_cursor_page_uses_index(engine):
+    response = Response()
+    with Session(engine) as session:
+        read_speakers(response=response, session=session, user=USER, limit=300)
+    cursor = response.headers["X-Next-Cursor"]
+
+    plans = capture_plans(engine, read_speakers, response=Response(), user=USER, limit=300, cursor=cursor)
+    assert_index_driven(plans)
+
+
+def test_global_logs_use_index(engine):
+    from main import get_global_logs
+
+    plans = capture_plans(engine, get_global_logs, user=USER, limit=50)
+    assert_index_driven(plans, seek=False)
+
+
+def test_speaker_logs_use_index(engine):
+    plans = capture_plans(engine, get_speaker_logs, speaker_id=1234, user=USER)
+    assert_index_driven(plans)
+
+
+def test_search_uses_fulltext_index(engine):
+    import search
+
+    search.setup_search_index(engine)
+    plans = capture_plans(engine, read_speakers, response=Response(), user=USER, limit=300, search="speaker 123")
+    steps = [step for plan in plans for step in plan]
+    assert any("speaker_fts VIRTUAL TABLE" in step for step in steps), steps
+    # Matches are fetched from the speaker table by primary key, never scanned
+    assert not any(step.startswith("SCAN speaker ") or step == "SCAN speaker" for step in steps), steps
@@ -0,0 +1,67 @@
+"""
+Speaker search: prefix and multi-word matching, ranking, FTS5 trigger sync.
+"""
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, update
+
+from models import Speaker
+from search import setup_search_index
+
+
+@pytest.fixture
+def client(client):
+    _, engine = client
+    with Session(engine) as session:
+        session.add(Speaker(name="Shital Mahajan Rane", primary_domain="Adventure Sports", location="Pune"))
+        session.add(Speaker(name="Sumit Antil", primary_domain="Para-Athletics", location="Haryana"))
+        session.add(Speaker(name="Purbayan Chatterjee", primary_domain="Music", remarks="Met Shital at a sports summit"))
+        session.commit()
+    setup_search_index(engine)
+    return client
+
+
+def names(test_client, term):
+    response = test_client.get("/speakers", params={"search": term})
+    assert response.status_code == 200
+    return [s["name"] for s in response.json()]
+
+
+def fts_consistent(engine):
+    with engine.connect() as conn:
+        conn.execute(text("INSERT INTO speaker_fts(speaker_fts) VALUES ('integrity-check')"))
+
+
+def test_prefix_and_every_word_must_match(client):
+    test_client, _ = client
+    assert names(test_client, "shi") == ["Shital Mahajan Rane", "Purbayan Chatterjee"]
+    assert names(test_client, "Mahajan sho") == []
+    assert names(test_client, "shital ran") == ["Shital Mahajan Rane"]
+    assert names(test_client, "para athletics") == ["Sumit Antil"]
+    assert len(names(test_client, "\"'*")) == 3  # nothing searchable: the plain board
+
+
+def test_name_matches_rank_above_remarks(client):
+    test_client, _ = client
+    # "sports" is a domain for Shital and only a remark for Purbayan
+    assert names(test_client, "sports") == ["Shital Mahajan Rane", "Purbayan Chatterjee"]
+    assert names(test_client, "summit") == ["Purbayan Chatterjee"]
+    assert names(test_client, "sumit") == ["Sumit Antil"]
+
+
+def test_index_follows_updates_and_deletes(client):
+    test_client, engine = client
+    assert test_client.patch("/speakers/2", json={"primary_domain": "Javelin"}).status_code == 200
+    assert names(test_client, "athletics") == []
+    assert names(test_client, "javel") == ["Sumit Antil"]
+
+    # Core bulk writes go through the triggers too
+    with Session(engine) as session:
+        session.exec(update(Speaker).where(Speaker.id == 1).values(location="Mumbai"))
+        session.commit()
+    assert names(test_client, "mumbai") == ["Shital Mahajan Rane"]
+    assert names(test_client, "pune") == []
+
+    assert test_client.request("DELETE", "/speakers/bulk", json={"ids": [1]}).status_code == 200
+    assert names(test_client, "shital") == ["Purbayan Chatterjee"]
+    fts_consistent(engine)
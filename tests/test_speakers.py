@@ -0,0 +1,92 @@
+"""
+Speaker list (keyset pagination, field projection) and bulk updates/deletes.
+"""
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, select
+
+from models import AuditLog, OutreachStatus, Speaker, Tombstone
+
+
+@pytest.fixture
+def client(client):
+    _, engine = client
+    same_time = datetime(2026, 3, 1, 12, 0)
+    with Session(engine) as session:
+        # Ten speakers sharing one last_updated: only the id tiebreak orders them
+        session.add_all(Speaker(name=f"Speaker {i}", email_draft="{}", search_details="notes", last_updated=same_time)
+                        for i in range(10))
+        session.add(Speaker(name="Latest", last_updated=datetime(2026, 3, 2)))
+        session.commit()
+    return client
+
+
+def test_cursor_pages_are_stable_across_equal_timestamps(client):
+    test_client, _ = client
+    seen, cursor = [], None
+    while True:
+        response = test_client.get("/speakers", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [s["id"] for s in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == [11] + list(range(10, 0, -1))
+
+    assert test_client.get("/speakers", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_fields_project_columns(client):
+    test_client, _ = client
+    cards = test_client.get("/speakers", params={"fields": "card"}).json()
+    assert len(cards) == 11
+    assert "email_draft" not in cards[0] and "search_details" not in cards[0] and cards[0]["name"] == "Latest"
+
+    picked = test_client.get("/speakers", params={"fields": "name,status", "limit": 2})
+    assert set(picked.json()[0]) == {"id", "last_updated", "name", "status"}
+    assert picked.headers["x-next-cursor"]
+
+    unknown = test_client.get("/speakers", params={"fields": "name,salary"})
+    assert unknown.status_code == 400 and unknown.json()["detail"] == "Unknown fields: salary"
+
+
+def test_bulk_update_skips_speakers_without_contact_details(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add(Speaker(name="Phone Only", phone="9800000000"))
+        session.add(Speaker(name="Blank Email", email=""))
+        session.get(Speaker, 1).email = "one@example.com"
+        session.commit()
+    ids = [1, 2, 12, 13]
+
+    moved = test_client.patch("/speakers/bulk", json={"ids": ids, "status": "EMAIL_ADDED"}).json()
+    assert (moved["count"], moved["skipped"]) == (2, 2)
+    with Session(engine) as session:
+        statuses = {s.id: s.status for s in session.exec(select(Speaker).where(Speaker.id.in_(ids)))}
+        assert statuses == {1: OutreachStatus.EMAIL_ADDED, 2: OutreachStatus.SCOUTED,
+                            12: OutreachStatus.EMAIL_ADDED, 13: OutreachStatus.SCOUTED}
+        logged = session.exec(select(AuditLog.speaker_id, AuditLog.details).where(AuditLog.action == "BULK_UPDATE")).all()
+    assert logged == [
+        (1, "Bulk moved to EMAIL_ADDED: Speaker 0"),
+        (12, "Bulk moved to EMAIL_ADDED: Phone Only"),
+        (None, "Updated 2 speakers (Skipped 2 due to missing email)"),
+    ]
+
+    # An explicit null is "no change", not a crash
+    unchanged = test_client.patch("/speakers/bulk", json={"ids": ids, "status": None, "is_bounty": None})
+    assert unchanged.status_code == 200 and unchanged.json()["count"] == 0
+    bounty = test_client.patch("/speakers/bulk", json={"ids": [2, 13], "status": None, "is_bounty": True}).json()
+    assert (bounty["count"], bounty["skipped"]) == (2, 0)
+
+
+def test_bulk_delete_leaves_tombstones_and_log_entries(client):
+    test_client, engine = client
+    deleted = test_client.request("DELETE", "/speakers/bulk", json={"ids": [3, 4, 999]})
+    assert deleted.json()["count"] == 2
+    with Session(engine) as session:
+        assert session.get(Speaker, 3) is None and session.get(Speaker, 4) is None
+        tombstones = session.exec(select(Tombstone.table_name, Tombstone.row_id).order_by(Tombstone.row_id)).all()
+        assert tombstones == [("speaker", 3), ("speaker", 4)]
+        logged = session.exec(select(AuditLog.speaker_id).where(AuditLog.action == "BULK_DELETE")).all()
+        assert sorted(logged, key=lambda sid: sid or 0) == [None, 3, 4]
@@ -0,0 +1,52 @@
+"""
+Pipeline counters: incremental updates must match a fresh count.
+"""
+from sqlmodel import Session, delete
+
+import pipeline_stats
+from models import Speaker, Sponsor, OutreachStatus, SponsorStatus
+
+
+def test_counters_follow_orm_and_bulk_writes(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add_all(Speaker(name=f"Speaker {i}", batch="2026", email=f"s{i}@example.com") for i in range(6))
+        session.add(Sponsor(company_name="Tata Steel", target_amount=250000, status=SponsorStatus.PITCHED))
+        session.add(Sponsor(company_name="Zomato", target_amount=80000, actual_amount=50000, status=SponsorStatus.SIGNED))
+        session.commit()
+
+    assert test_client.patch("/speakers/1", json={"status": "LOCKED"}).status_code == 200
+    assert test_client.patch("/speakers/bulk", json={"ids": [2, 3, 4], "assigned_to": "b25002"}).json()["count"] == 3
+    assert test_client.patch("/speakers/bulk", json={"ids": [3], "status": "IN_TALKS"}).json()["count"] == 1
+    assert test_client.request("DELETE", "/speakers/bulk", json={"ids": [4, 5]}).json()["count"] == 2
+    assert test_client.patch("/sponsors/1", json={"status": "SIGNED", "actual_amount": 200000}).status_code == 200
+
+    stats = test_client.get("/stats").json()
+    speakers, sponsors = stats["speakers"], stats["sponsors"]
+    assert speakers["total"] == 4
+    assert speakers["by_status"] == {"IN_TALKS": 1, "LOCKED": 1, "SCOUTED": 2}
+    assert speakers["by_assignee"] == {"NONE": 2, "b25002": 2}
+    assert speakers["by_assignee_status"]["b25002"] == {"IN_TALKS": 1, "SCOUTED": 1}
+    assert speakers["by_batch"] == {"2026": 4}
+    assert sponsors["by_status"] == {"SIGNED": {"count": 2, "target_amount": 330000, "actual_amount": 250000}}
+    assert test_client.get("/stats/check").json() == {"ok": True, "problems": []}
+
+
+def test_unaccounted_bulk_writes_rebuild_and_check_reports_drift(client):
+    test_client, engine = client
+    with Session(engine) as session:
+        session.add_all(Speaker(name=f"Speaker {i}", status=OutreachStatus.CONNECTED) for i in range(4))
+        session.commit()
+        # A Core delete nobody noted: counters are rebuilt at commit
+        session.exec(delete(Speaker).where(Speaker.id > 2))
+        session.commit()
+    assert test_client.get("/stats").json()["speakers"]["by_status"] == {"CONNECTED": 2}
+
+    # Writes behind the app's back show up in the checker until a rebuild
+    with engine.begin() as conn:
+        conn.execute(delete(Speaker.__table__).where(Speaker.__table__.c.id == 1))
+    report = test_client.get("/stats/check").json()
+    assert not report["ok"] and {"dimension": "speaker_status", "key": "CONNECTED", "stored": [2, 0, 0], "actual": [1, 0, 0]} in report["problems"]
+    assert test_client.post("/stats/rebuild").status_code == 200
+    with engine.connect() as conn:
+        assert pipeline_stats.check(conn) == []
@@ -0,0 +1,41 @@
+"""
+Delta sync: rows changed since a watermark, deletes from tombstones.
+"""
+from datetime import datetime
+
+from sqlmodel import Session
+
+import changes  # noqa: F401 - tombstones for ORM deletes
+from models import AuditLog, CreativeRequest, Speaker, Sponsor
+
+
+def test_sync_returns_only_changed_and_deleted_rows(client):
+    test_client, engine = client
+    before = datetime(2026, 1, 1)
+    with Session(engine) as session:
+        session.add_all(Speaker(name=f"Speaker {i}", last_updated=before) for i in range(10))
+        session.add(Sponsor(company_name="Tata Steel", last_updated=before))
+        session.add(CreativeRequest(title="Poster", description="Main stage", requested_by="b25002", last_updated=before))
+        session.commit()
+
+    start = test_client.get("/sync").json()
+    assert not any(t["rows"] or t["deleted"] for t in start["tables"].values())
+    since = "2026-06-01T00:00:00"
+
+    assert test_client.patch("/speakers/3", json={"notes": "Said yes"}).status_code == 200
+    assert test_client.request("DELETE", "/speakers/bulk", json={"ids": [7, 8]}).json()["count"] == 2
+    assert test_client.patch("/creative-requests/1", json={"status": "IN_PROGRESS"}).status_code == 200
+
+    delta = test_client.get("/sync", params={"since": since}).json()
+    assert not delta["resync"] and delta["watermark"] > since
+    speakers = delta["tables"]["speaker"]
+    assert [s["id"] for s in speakers["rows"]] == [3] and speakers["rows"][0]["notes"] == "Said yes"
+    assert sorted(speakers["deleted"]) == [7, 8]
+    assert [r["status"] for r in delta["tables"]["creativerequest"]["rows"]] == ["IN_PROGRESS"]
+    assert delta["tables"]["sponsor"] == {"rows": [], "deleted": []}
+
+    # After a restore the timestamps can't be trusted: clients refetch
+    with Session(engine) as session:
+        session.add(AuditLog(user_name="Admin", action="RESTORE_BACKUP", details="Restored"))
+        session.commit()
+    assert test_client.get("/sync", params={"since": since}).json()["resync"]
@@ -0,0 +1,111 @@
+"""
+XP ledger: awards as events, rollup into the user rows, in-memory leaderboard.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from auth_utils import create_access_token
+from models import AuthorizedUser, Speaker, OutreachStatus, XpEvent
+import xp
+
+
+pytestmark = pytest.mark.parametrize("client", ["tokens"], indirect=True)
+
+
+@pytest.fixture
+def client(client):
+    _, engine = client
+    with Session(engine) as session:
+        for user in session.exec(select(AuthorizedUser)):
+            user.xp = {"b25001": 100, "b25002": 40}[user.roll_number]
+            session.add(user)
+        session.add(AuthorizedUser(roll_number="b25003", name="Kabir Rao"))
+        session.add_all(Speaker(name=f"Speaker {i}", email=f"s{i}@example.com", status=OutreachStatus.EMAIL_ADDED) for i in range(3))
+        session.commit()
+    return client
+
+
+def bearer(roll, name):
+    return {"Authorization": f"Bearer {create_access_token({'sub': roll, 'name': name, 'is_admin': False})}"}
+
+
+def test_awards_go_through_the_ledger_and_leaderboard(client):
+    test_client, engine = client
+    riya, kabir = bearer("b25002", "Riya"), bearer("b25003", "Kabir")
+    assert [u["name"] for u in test_client.get("/leaderboard", headers=riya).json()["leaders"]] == ["Admin", "Riya Sharma"]
+
+    user_writes = []
+    @event.listens_for(engine, "before_cursor_execute")
+    def watch(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE authorizeduser"):
+            user_writes.append(statement)
+
+    # Two moves worth 50 + 100: appended to the ledger, the user row isn't rewritten
+    assert test_client.patch("/speakers/1", json={"status": "CONTACT_INITIATED"}, headers=riya).status_code == 200
+    assert test_client.patch("/speakers/2", json={"status": "CONNECTED"}, headers=riya).status_code == 200
+    assert test_client.patch("/speakers/3", json={"status": "CONTACT_INITIATED"}, headers=kabir).status_code == 200
+    assert user_writes == []
+    assert test_client.get("/users/me", headers=riya).json()["xp"] == 190
+
+    board = test_client.get("/leaderboard", params={"k": 2}, headers=kabir).json()
+    assert [(u["rank"], u["roll_number"], u["xp"]) for u in board["leaders"]] == [(1, "b25002", 190), (2, "b25001", 100)]
+    assert board["me"] == {"rank": 3, "xp": 50}
+
+    # The rollup folds events into the rows with one increment per user
+    assert xp.rollup(engine) == {"events": 3, "users": 2}
+    assert len(user_writes) == 2 and all("xp=(authorizeduser.xp +" in s for s in user_writes)
+    assert xp.rollup(engine) == {"events": 0, "users": 0}
+    with Session(engine) as session:
+        assert session.exec(select(AuthorizedUser.xp).order_by(AuthorizedUser.id)).all() == [100, 190, 50]
+        assert all(e.rolled_up for e in session.exec(select(XpEvent)))
+    assert test_client.get("/users/me", headers=riya).json()["xp"] == 190
+
+    # Reloading from the tables gives the same ranking
+    xp.leaderboard.invalidate()
+    assert test_client.get("/leaderboard", params={"k": 2}, headers=kabir).json() == board
+
+
+def test_an_award_committed_during_a_load_counts_once(client, monkeypatch):
+    _, engine = client
+    xp.leaderboard.load(engine)
+    apply_awards = xp.awards.on_commit
+
+    def load_first(session, committed):
+        # The leaderboard reloads between the award's commit and its arrival
+        xp.leaderboard.load(engine)
+        apply_awards(session, committed)
+
+    monkeypatch.setattr(xp.awards, "on_commit", load_first)
+    with Session(engine) as session:
+        xp.award(session, 3, 30, "MOVE")
+        session.commit()
+    assert xp.leaderboard.standing(3) == (3, 30)
+
+    # Awards committed after the load still move the board
+    monkeypatch.setattr(xp.awards, "on_commit", apply_awards)
+    with Session(engine) as session:
+        xp.award(session, 3, 80, "MOVE")
+        session.commit()
+    assert xp.leaderboard.top(3) == [(3, 110), (1, 100), (2, 40)]
+
+def test_clients_cannot_set_xp_and_streaks_follow_login_dates(client):
+    test_client, engine = client
+    riya = bearer("b25002", "Riya")
+    fmt = "%a %b %d %Y"
+    today, yesterday = datetime.now(), datetime.now() - timedelta(days=1)
+    with Session(engine) as session:
+        user = session.exec(select(AuthorizedUser).where(AuthorizedUser.roll_number == "b25002")).one()
+        user.streak, user.last_login_date = 4, yesterday.strftime(fmt)
+        session.add(user)
+        session.commit()
+
+    me = test_client.patch("/users/me/gamification", json={"xp": 99999, "streak": 500, "last_login_date": today.strftime(fmt)}, headers=riya).json()
+    assert (me["xp"], me["streak"], me["last_login_date"]) == (40, 5, today.strftime(fmt))
+    # A second tab the same day doesn't count twice
+    assert test_client.patch("/users/me/gamification", json={"last_login_date": today.strftime(fmt)}, headers=riya).json()["streak"] == 5
+
+    far = (today + timedelta(days=10)).strftime(fmt)
+    assert test_client.patch("/users/me/gamification", json={"last_login_date": far}, headers=riya).status_code == 400